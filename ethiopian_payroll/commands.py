@@ -0,0 +1,147 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("explain-payroll-reports")
+@click.option("--company", help="Company to run the reports for, defaults to the default company")
+@click.option("--from-date", help="Period start, defaults to twelve months before --to-date")
+@click.option("--to-date", help="Period end, defaults to today")
+@click.option(
+	"--min-rows",
+	type=int,
+	help="Only warn about full scans of at least this many estimated rows (default 10000)",
+)
+@pass_context
+def explain_payroll_reports(context, company=None, from_date=None, to_date=None, min_rows=None):
+	"""Run EXPLAIN on the queries of every payroll report and warn about full table scans."""
+	import frappe
+
+	from ethiopian_payroll.ethiopian_payroll.report.indexes import FULL_SCAN_ROWS, explain_reports
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		full_scans = explain_reports(company, from_date, to_date, min_rows or FULL_SCAN_ROWS)
+	finally:
+		frappe.destroy()
+
+	if full_scans:
+		raise SystemExit(1)
+
+
+@click.command("close-payroll-period")
+@click.argument("period")
+@click.option("--company", required=True, help="Company whose payroll period to close")
+@pass_context
+def close_payroll_period(context, period, company):
+	"""Freeze the submitted Salary Slips of PERIOD (YYYY-MM) into an immutable snapshot."""
+	import frappe
+
+	from ethiopian_payroll.ethiopian_payroll.api.snapshot import close_period
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		frappe.set_user("Administrator")
+		result = close_period(company, period)
+	finally:
+		frappe.destroy()
+
+	click.echo(f"Closed {result['period']} of {company}: {result['rows']} salary slips")
+
+
+@click.command("inspect-salary-slips")
+@click.option("--company", help="Company of the slips")
+@click.option("--employee", help="Employee of the slips")
+@click.option("--from-date", help="Slips starting on or after this date")
+@click.option("--to-date", help="Slips ending on or before this date")
+@click.option(
+	"--status", type=click.Choice(["Draft", "Submitted", "Cancelled"]), help="Slip status, defaults to all"
+)
+@click.option("--slip", "slips", multiple=True, help="Salary Slip name, can be repeated")
+@click.option(
+	"--component",
+	"components",
+	multiple=True,
+	help="Only components matching this pattern, e.g. '*rent*'; can be repeated",
+)
+@click.option("--format", "output_format", type=click.Choice(["json", "csv"]), default="json")
+@click.option(
+	"--output", type=click.Path(dir_okay=False, writable=True), help="File to write, defaults to stdout"
+)
+@pass_context
+def inspect_salary_slips(
+	context,
+	company=None,
+	employee=None,
+	from_date=None,
+	to_date=None,
+	status=None,
+	slips=None,
+	components=None,
+	output_format="json",
+	output=None,
+):
+	"""Dump the earnings and deductions of every matching Salary Slip as JSON or CSV."""
+	import sys
+
+	import frappe
+
+	from ethiopian_payroll.ethiopian_payroll.report.slip_inspection import (
+		iter_slip_breakdowns,
+		write_csv,
+		write_json,
+	)
+
+	if not (company or employee or from_date or to_date or slips):
+		raise click.UsageError("Pass at least one of --company, --employee, --from-date, --to-date or --slip")
+
+	filters = frappe._dict(
+		company=company, employee=employee, from_date=from_date, to_date=to_date, docstatus=status
+	)
+	write = write_csv if output_format == "csv" else write_json
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		out = open(output, "w", newline="") if output else sys.stdout
+		try:
+			write(iter_slip_breakdowns(filters, slips, components), out)
+		finally:
+			if output:
+				out.close()
+	finally:
+		frappe.destroy()
+
+
+@click.command("warm-payroll-reports")
+@click.option("--company", required=True, help="Company to warm the reports for")
+@click.option("--from-date", required=True, help="Period start")
+@click.option("--to-date", required=True, help="Period end")
+@click.option("--report", "reports", multiple=True, help="Report to warm, can be repeated; defaults to all")
+@pass_context
+def warm_payroll_reports(context, company, from_date, to_date, reports=None):
+	"""Precompute the standard payroll reports of a period into the result cache."""
+	import frappe
+
+	from ethiopian_payroll.ethiopian_payroll.report.warm import warm_reports
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+	try:
+		warmed = warm_reports(company, from_date, to_date, reports or None)
+		frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+	click.echo(f"Warmed {len(warmed)} reports: {', '.join(warmed)}")
+
+
+commands = [explain_payroll_reports, close_payroll_period, inspect_salary_slips, warm_payroll_reports]
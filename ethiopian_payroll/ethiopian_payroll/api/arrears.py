@@ -0,0 +1,236 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Retroactive arrears for a backdated Pay Matrix revision.
+
+For every submitted Salary Slip since the effective date, the employee's step is
+found by matching the base of the Salary Structure Assignment in force for that
+month against the old matrix, on the grade of that assignment (the current
+Employee grade when the assignment has none). The basic that should have been paid is the same step on
+the revised matrix, prorated the same way the paid basic was (paid / base), so the
+monthly arrear is `paid_basic * revised_amount / base - paid_basic`.
+
+`get_arrears` is the preview; `create_arrears_bulk_additional_salary` saves one
+Bulk Additional Salary with one arrear row per employee through a normal, validated
+insert, which writes the rows one by one.
+"""
+
+from bisect import bisect_right
+
+import frappe
+from frappe import _
+from frappe.query_builder.functions import Sum
+from frappe.utils import flt, getdate, nowdate
+
+from ethiopian_payroll.ethiopian_payroll.api.matrix_utils import find_scale_index, get_compiled_matrix
+
+salary_slip = frappe.qb.DocType("Salary Slip")
+salary_detail = frappe.qb.DocType("Salary Detail")
+salary_structure_assignment = frappe.qb.DocType("Salary Structure Assignment")
+employee = frappe.qb.DocType("Employee")
+
+
+def get_paid_basic(from_date, to_date, company=None, basic_component="Basic Salary"):
+	"""Paid basic per submitted slip in the period, summed in SQL."""
+	query = (
+		frappe.qb.from_(salary_slip)
+		.join(salary_detail)
+		.on(salary_detail.parent == salary_slip.name)
+		.select(
+			salary_slip.name,
+			salary_slip.employee,
+			salary_slip.employee_name,
+			salary_slip.start_date,
+			Sum(salary_detail.amount).as_("paid_basic"),
+		)
+		.where(salary_slip.docstatus == 1)
+		.where(salary_slip.start_date >= from_date)
+		.where(salary_slip.end_date <= to_date)
+		.where(salary_detail.parentfield == "earnings")
+		.where(salary_detail.salary_component == basic_component)
+		.groupby(salary_slip.name, salary_slip.employee, salary_slip.employee_name, salary_slip.start_date)
+		.orderby(salary_slip.employee)
+		.orderby(salary_slip.start_date)
+	)
+
+	if company:
+		query = query.where(salary_slip.company == company)
+
+	return query.run(as_dict=1)
+
+
+def get_assignment_history(employees, to_date):
+	"""{employee: ([from_date, ...], [base, ...], [grade, ...])} of submitted assignments, oldest first."""
+	if not employees:
+		return {}
+
+	rows = (
+		frappe.qb.from_(salary_structure_assignment)
+		.select(
+			salary_structure_assignment.employee,
+			salary_structure_assignment.from_date,
+			salary_structure_assignment.base,
+			salary_structure_assignment.grade,
+		)
+		.where(salary_structure_assignment.docstatus == 1)
+		.where(salary_structure_assignment.from_date <= to_date)
+		.where(salary_structure_assignment.employee.isin(employees))
+		.orderby(salary_structure_assignment.employee)
+		.orderby(salary_structure_assignment.from_date)
+	).run(as_dict=1)
+
+	history = {}
+	for d in rows:
+		dates, bases, grades = history.setdefault(d.employee, ([], [], []))
+		dates.append(getdate(d.from_date))
+		bases.append(flt(d.base))
+		grades.append(d.grade)
+
+	return history
+
+
+def get_assignment_on(history, on_date):
+	"""(base, grade) of the assignment in force on `on_date`; (0.0, None) without one."""
+	if not history:
+		return 0.0, None
+	dates, bases, grades = history
+	idx = bisect_right(dates, getdate(on_date)) - 1
+	return (bases[idx], grades[idx]) if idx >= 0 else (0.0, None)
+
+
+def compute_arrears(slips, grades, history, old_matrix, revised_matrix):
+	"""Arrear per slip. Rows that cannot be placed on the old matrix come back with a status.
+
+	`grades` are the current Employee grades, used for assignments without a grade.
+	"""
+	rows = []
+	for ss in slips:
+		base, grade = get_assignment_on(history.get(ss.employee), ss.start_date)
+		grade = grade or grades.get(ss.employee)
+		row = frappe._dict(
+			{
+				"salary_slip": ss.name,
+				"employee": ss.employee,
+				"employee_name": ss.employee_name,
+				"month": getdate(ss.start_date).strftime("%Y-%m"),
+				"grade": grade,
+				"base": base,
+				"paid_basic": flt(ss.paid_basic),
+				"revised_amount": 0.0,
+				"status": "OK",
+			}
+		)
+		rows.append(row)
+
+		old_level = old_matrix.get(grade)
+		new_level = revised_matrix.get(grade)
+		if not old_level or not new_level:
+			row.status = "Grade Not On Matrix"
+			continue
+
+		idx = find_scale_index(old_level["amounts"], base)
+		if idx is None or idx >= len(new_level["amounts"]):
+			row.status = "Off Matrix"
+			continue
+
+		row.revised_amount = new_level["amounts"][idx]
+
+	# arrears for all placed slips in one pass over the paid / base / revised columns
+	placed = [row for row in rows if row.status == "OK"]
+	arrears = [
+		flt(row.paid_basic * row.revised_amount / row.base - row.paid_basic, 2) if row.base else 0.0
+		for row in placed
+	]
+	for row, arrear in zip(placed, arrears, strict=True):
+		row.arrear = arrear
+
+	for row in rows:
+		row.setdefault("arrear", 0.0)
+
+	return rows
+
+
+@frappe.whitelist()
+def get_arrears(
+	old_matrix: str,
+	revised_matrix: str,
+	from_date: str,
+	to_date: str | None = None,
+	company: str | None = None,
+	basic_component: str = "Basic Salary",
+):
+	"""Preview the month by month arrears and the total per employee."""
+	frappe.has_permission("Salary Slip", "read", throw=True)
+
+	to_date = to_date or nowdate()
+	old_compiled = get_compiled_matrix(old_matrix)
+	revised_compiled = get_compiled_matrix(revised_matrix)
+	if not old_compiled or not revised_compiled:
+		frappe.throw(_("Both Pay Matrices must have levels"))
+
+	slips = get_paid_basic(from_date, to_date, company, basic_component)
+	employees = list({ss.employee for ss in slips})
+	grades = frappe._dict(
+		(
+			frappe.qb.from_(employee)
+			.select(employee.name, employee.grade)
+			.where(employee.name.isin(employees))
+		).run()
+		if employees
+		else []
+	)
+	history = get_assignment_history(employees, to_date)
+
+	rows = compute_arrears(slips, grades, history, old_compiled, revised_compiled)
+
+	totals = {}
+	for row in rows:
+		if row.arrear:
+			totals[row.employee] = flt(totals.get(row.employee, 0.0) + row.arrear, 2)
+
+	return {
+		"rows": rows,
+		"employee_totals": totals,
+		"total": flt(sum(totals.values()), 2),
+		"skipped": [row for row in rows if row.status != "OK"],
+	}
+
+
+@frappe.whitelist()
+def create_arrears_bulk_additional_salary(
+	old_matrix: str,
+	revised_matrix: str,
+	from_date: str,
+	arrears_component: str,
+	payroll_date: str,
+	company: str,
+	to_date: str | None = None,
+	basic_component: str = "Basic Salary",
+):
+	"""Create a Bulk Additional Salary holding one arrear row per employee."""
+	frappe.has_permission("Bulk Additional Salary", "create", throw=True)
+
+	result = get_arrears(old_matrix, revised_matrix, from_date, to_date, company, basic_component)
+	totals = {emp: amount for emp, amount in result["employee_totals"].items() if amount > 0}
+	if not totals:
+		frappe.throw(_("No arrears found for the given period"))
+
+	doc = frappe.get_doc(
+		{"doctype": "Bulk Additional Salary", "company": company, "payroll_date": payroll_date}
+	)
+	doc.extend(
+		"charges",
+		[
+			{"employee": emp, "salary_component": arrears_component, "amount": amount}
+			for emp, amount in sorted(totals.items())
+		],
+	)
+	doc.insert()
+
+	return {
+		"success": True,
+		"name": doc.name,
+		"employees": len(doc.charges),
+		"total": flt(sum(totals.values()), 2),
+	}
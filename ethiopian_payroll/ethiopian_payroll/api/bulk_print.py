@@ -0,0 +1,198 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Bulk PDFs of per-employee Annual Statements and Salary Slips.
+
+`enqueue_bulk_print` starts a background job. Annual Statements are fetched once
+through the report and rendered per employee from a compiled Jinja template
+(templates/print/annual_statement.html); Salary Slips are printed with their print
+format. The HTML of a chunk is rendered only when the chunk is due, converted to
+PDF in a pool of worker processes ("ethiopian_payroll_bulk_print_workers", default
+half the CPUs) and every PDF is written to the zip as soon as it is ready, so only one
+chunk of HTML and PDFs is held in memory. A merged PDF keeps every page in memory
+until it is written, so runs of more than MAX_MERGED_PDFS documents are written as a
+zip instead. Progress is published to the user; the result is a private File.
+"""
+
+import io
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import frappe
+from frappe import _
+from frappe.utils import cint, now_datetime
+
+from ethiopian_payroll.ethiopian_payroll.report.sharding import init_worker
+from ethiopian_payroll.ethiopian_payroll.report.utils import (
+	get_report_module,
+	get_salary_slip_query,
+	get_salary_slips,
+)
+
+ANNUAL_STATEMENT_TEMPLATE = "ethiopian_payroll/templates/print/annual_statement.html"
+KINDS = ("Annual Statement", "Salary Slip")
+OUTPUTS = ("zip", "pdf")
+PRINT_CHUNK_SIZE = 50
+# a merged PDF is built in memory; larger runs are zipped
+MAX_MERGED_PDFS = 500
+
+
+@frappe.whitelist()
+def enqueue_bulk_print(kind: str, filters: str | dict, output: str = "zip", print_format: str | None = None):
+	"""Queue the bulk PDFs of `kind` for the employees matching the report filters."""
+	frappe.has_permission("Salary Slip", "print", throw=True)
+	if kind not in KINDS or output not in OUTPUTS:
+		frappe.throw(_("Cannot print {0} as {1}").format(kind, output))
+	# the statements are built by running the report, so its roles apply
+	if kind == "Annual Statement" and not frappe.get_doc("Report", kind).is_permitted():
+		frappe.throw(_("You are not permitted to run the {0} report").format(_(kind)), frappe.PermissionError)
+
+	job = frappe.enqueue(
+		"ethiopian_payroll.ethiopian_payroll.api.bulk_print.make_bulk_print",
+		queue="long",
+		timeout=4 * 3600,
+		kind=kind,
+		filters=frappe.parse_json(filters),
+		output=output,
+		print_format=print_format,
+	)
+	return job.id if job else None
+
+
+def get_annual_statement_documents(filters):
+	"""File names of every employee's statement, and a generator of their tasks.
+
+	The statement HTML is rendered from the compiled template as the tasks are consumed.
+	"""
+	data = get_report_module("Annual Statement").execute(frappe._dict(filters))[1]
+	template = frappe.get_jenv().get_template(ANNUAL_STATEMENT_TEMPLATE)
+	tasks = (("html", template.render({"row": row, "filters": filters})) for row in data)
+	return [f"{row['employee']}.pdf" for row in data], tasks
+
+
+def get_salary_slip_documents(filters, print_format=None):
+	"""File names of every slip the user can read, and a generator of their tasks.
+
+	The slip is printed by the worker.
+	"""
+	from_date, to_date = filters.get("from_date"), filters.get("to_date")
+	if filters.get("fiscal_year") and not from_date:
+		from_date, to_date = frappe.get_cached_value(
+			"Fiscal Year", filters.fiscal_year, ["year_start_date", "year_end_date"]
+		)
+	query = get_salary_slip_query(filters, from_date, to_date)
+	salary_slips = get_salary_slips(query, ("name", "employee"))
+	if salary_slips:
+		# one slip the user cannot read would fail the whole job in its worker
+		permitted = set(
+			frappe.get_list(
+				"Salary Slip",
+				filters={"name": ("in", [ss.name for ss in salary_slips])},
+				pluck="name",
+				limit_page_length=0,
+			)
+		)
+		salary_slips = [ss for ss in salary_slips if ss.name in permitted]
+	tasks = (("doc", ss.name, print_format) for ss in salary_slips)
+	return [f"{ss.employee}-{ss.name}.pdf" for ss in salary_slips], tasks
+
+
+def render_pdf(task):
+	"""PDF bytes of an ("html", html) or ("doc", salary slip, print format) task."""
+	from frappe.utils.pdf import get_pdf
+
+	if task[0] == "html":
+		return get_pdf(task[1])
+	return frappe.get_print("Salary Slip", task[1], task[2], as_pdf=True)
+
+
+def get_print_workers():
+	workers = frappe.conf.get("ethiopian_payroll_bulk_print_workers")
+	return cint(workers) if workers is not None else max((os.cpu_count() or 2) // 2, 1)
+
+
+def iter_chunks(tasks):
+	tasks = iter(tasks)
+	while chunk := list(islice(tasks, PRINT_CHUNK_SIZE)):
+		yield chunk
+
+
+def iter_pdfs(tasks, workers):
+	"""Yield the PDF of every task in order, taking one chunk of tasks at a time."""
+	if workers < 2:
+		for task in tasks:
+			yield render_pdf(task)
+		return
+
+	# spawn, not fork: a forked worker would share the parent's DB connection
+	with ProcessPoolExecutor(
+		max_workers=workers,
+		mp_context=multiprocessing.get_context("spawn"),
+		initializer=init_worker,
+		initargs=(frappe.local.site, frappe.local.sites_path, frappe.session.user),
+	) as pool:
+		for chunk in iter_chunks(tasks):
+			yield from pool.map(render_pdf, chunk)
+
+
+def make_bulk_print(kind, filters, output="zip", print_format=None):
+	"""Background job of `enqueue_bulk_print`; returns the url of the private File created."""
+	filters = frappe._dict(filters)
+	if kind == "Annual Statement":
+		file_names, tasks = get_annual_statement_documents(filters)
+	else:
+		file_names, tasks = get_salary_slip_documents(filters, print_format)
+
+	if not file_names:
+		frappe.publish_realtime("msgprint", _("There is nothing to print"), user=frappe.session.user)
+		return None
+
+	if output == "pdf" and len(file_names) > MAX_MERGED_PDFS:
+		output = "zip"
+
+	file_name = f"{frappe.scrub(kind)}-{now_datetime():%Y%m%d-%H%M%S}.{output}"
+	path = frappe.get_site_path("private", "files", file_name)
+	pdfs = iter_pdfs(tasks, get_print_workers())
+	title = _("Printing {0}").format(_(kind))
+
+	if output == "zip":
+		with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+			for i, pdf in enumerate(pdfs):
+				archive.writestr(file_names[i], pdf)
+				publish_progress(i + 1, len(file_names), title)
+	else:
+		from pypdf import PdfReader, PdfWriter
+
+		writer = PdfWriter()
+		for i, pdf in enumerate(pdfs):
+			writer.append(PdfReader(io.BytesIO(pdf)))
+			publish_progress(i + 1, len(file_names), title)
+		with open(path, "wb") as f:
+			writer.write(f)
+
+	file_doc = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": f"/private/files/{file_name}",
+			"is_private": 1,
+		}
+	).insert(ignore_permissions=True)
+	frappe.db.commit()
+
+	frappe.publish_realtime(
+		"msgprint",
+		_("{0} is ready: {1}").format(title, f'<a href="{file_doc.file_url}">{file_name}</a>'),
+		user=frappe.session.user,
+	)
+	return file_doc.file_url
+
+
+def publish_progress(done, total, title):
+	# every chunk and at the end; one message per PDF would flood the socket
+	if done % PRINT_CHUNK_SIZE == 0 or done == total:
+		frappe.publish_progress(done * 100 / total, title=title, description=f"{done} / {total}")
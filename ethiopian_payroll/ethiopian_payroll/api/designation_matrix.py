@@ -0,0 +1,151 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Designation -> Pay Matrix Level resolution.
+
+Designations carry a Designation Matrix Level table (pay_matrix, level). The index
+built here maps every designation to its levels together with the grade and the
+scale / amount range of each level, so callers can place employees without loading
+Designation or Pay Matrix Level documents one by one.
+"""
+
+import json
+
+import frappe
+from frappe.query_builder.functions import Max, Min
+from frappe.utils import flt
+
+DESIGNATION_INDEX_CACHE_KEY = "ethiopian_payroll:designation_matrix_index"
+
+designation_matrix_level = frappe.qb.DocType("Designation Matrix Level")
+pay_matrix_level = frappe.qb.DocType("Pay Matrix Level")
+pay_matrix_scale_items = frappe.qb.DocType("Pay Matrix Scale Items")
+employee = frappe.qb.DocType("Employee")
+
+
+def get_designation_index():
+	"""Cached {designation: [level placement, ...]} for all designations with matrix levels."""
+	return frappe.cache.get_value(DESIGNATION_INDEX_CACHE_KEY, generator=build_designation_index)
+
+
+def build_designation_index():
+	rows = (
+		frappe.qb.from_(designation_matrix_level)
+		.join(pay_matrix_level)
+		.on(pay_matrix_level.name == designation_matrix_level.level)
+		.left_join(pay_matrix_scale_items)
+		.on(
+			(pay_matrix_scale_items.parent == pay_matrix_level.name)
+			& (pay_matrix_scale_items.parenttype == "Pay Matrix Level")
+		)
+		.select(
+			designation_matrix_level.parent.as_("designation"),
+			designation_matrix_level.idx,
+			designation_matrix_level.pay_matrix,
+			designation_matrix_level.level,
+			pay_matrix_level.grade,
+			pay_matrix_level.pay_matrix_link,
+			Min(pay_matrix_scale_items.scale).as_("min_scale"),
+			Max(pay_matrix_scale_items.scale).as_("max_scale"),
+			Min(pay_matrix_scale_items.amount).as_("min_amount"),
+			Max(pay_matrix_scale_items.amount).as_("max_amount"),
+		)
+		.where(designation_matrix_level.parenttype == "Designation")
+		.groupby(
+			designation_matrix_level.parent,
+			designation_matrix_level.idx,
+			designation_matrix_level.pay_matrix,
+			designation_matrix_level.level,
+			pay_matrix_level.grade,
+			pay_matrix_level.pay_matrix_link,
+		)
+		.orderby(designation_matrix_level.parent)
+		.orderby(designation_matrix_level.idx)
+	).run(as_dict=1)
+
+	index = {}
+	for d in rows:
+		index.setdefault(d.designation, []).append(
+			{
+				"pay_matrix": d.pay_matrix or d.pay_matrix_link,
+				"level": d.level,
+				"grade": d.grade,
+				"min_scale": d.min_scale,
+				"max_scale": d.max_scale,
+				"min_amount": flt(d.min_amount),
+				"max_amount": flt(d.max_amount),
+			}
+		)
+
+	return index
+
+
+def clear_designation_index(doc=None, method=None):
+	"""Doc event handler for Designation, Pay Matrix and Pay Matrix Level changes."""
+	frappe.cache.delete_value(DESIGNATION_INDEX_CACHE_KEY)
+
+
+def get_matrix_designations(pay_matrix, index=None):
+	"""Designations with a level on `pay_matrix`, from the designation index."""
+	index = get_designation_index() if index is None else index
+	return sorted(
+		designation
+		for designation, placements in index.items()
+		if any(p["pay_matrix"] == pay_matrix for p in placements)
+	)
+
+
+def pick_placement(placements, grade=None, pay_matrix=None):
+	"""Choose the level for an employee: matching grade first, then matching matrix, then the first row."""
+	if not placements:
+		return None
+
+	candidates = [p for p in placements if not pay_matrix or p["pay_matrix"] == pay_matrix] or placements
+	for placement in candidates:
+		if grade and placement["grade"] == grade:
+			return placement
+
+	return candidates[0]
+
+
+@frappe.whitelist()
+def resolve_employee_placements(employees, pay_matrix: str | None = None):
+	"""Return the matrix placement of each employee, keyed by employee, in one call.
+
+	`employees` is a list (or JSON list) of Employee IDs. Employees whose designation has
+	no matrix levels are returned with `placement` set to None.
+	"""
+	frappe.has_permission("Employee", "read", throw=True)
+
+	if isinstance(employees, str):
+		employees = json.loads(employees)
+	if not employees:
+		return {}
+
+	index = get_designation_index()
+	rows = (
+		frappe.qb.from_(employee)
+		.select(employee.name, employee.employee_name, employee.designation, employee.grade)
+		.where(employee.name.isin(list(employees)))
+	).run(as_dict=1)
+
+	result = {}
+	for d in rows:
+		placements = index.get(d.designation) or []
+		result[d.name] = {
+			"employee_name": d.employee_name,
+			"designation": d.designation,
+			"grade": d.grade,
+			"placement": pick_placement(placements, d.grade, pay_matrix),
+			"levels": placements,
+		}
+
+	return result
+
+
+@frappe.whitelist()
+def get_designation_placement(designation: str):
+	"""All Pay Matrix Levels linked to a designation."""
+	frappe.has_permission("Designation", "read", throw=True)
+	return get_designation_index().get(designation) or []
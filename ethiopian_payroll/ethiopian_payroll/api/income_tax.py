@@ -0,0 +1,172 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Employment income tax computed in bulk from cached bracket tables.
+
+The brackets come from the submitted, enabled Income Tax Slabs (annual amounts),
+per company and effective date. Slabs with a condition on any bracket depend on
+the employee and are skipped as a whole, so the slab in effect before them applies;
+without a slab for the company the statutory schedule of Proclamation 979/2016 applies. Every table is compiled once into
+ascending bracket floors, their rates and the tax due at each floor, so the tax of
+an income is one bisect and one multiplication; `get_annual_tax` and
+`get_monthly_tax` take the taxable incomes of a whole payroll run at once.
+
+The compiled tables are cached in redis and cleared from the Income Tax Slab doc
+events.
+"""
+
+from bisect import bisect_right
+
+import frappe
+from frappe.utils import cint, flt, getdate
+
+TAX_TABLES_CACHE_KEY = "ethiopian_payroll:income_tax_tables"
+
+# Proclamation 979/2016, monthly (from amount, rate %); applied to annualized income
+STATUTORY_EFFECTIVE_FROM = "2016-07-08"
+STATUTORY_MONTHLY_BRACKETS = (
+	(0, 0),
+	(600, 10),
+	(1650, 15),
+	(3200, 20),
+	(5250, 25),
+	(7800, 30),
+	(10900, 35),
+)
+
+# cap on the savings (insurance, provident fund) deducted from taxable income
+SAVINGS_LIMIT = 150000.0
+
+income_tax_slab = frappe.qb.DocType("Income Tax Slab")
+taxable_salary_slab = frappe.qb.DocType("Taxable Salary Slab")
+
+
+def compile_tax_table(effective_from, brackets, standard_exemption=0.0):
+	"""Compile [(annual from amount, rate %), ...] into a table for `get_annual_tax`."""
+	floors, rates, base_tax = [], [], []
+	tax = 0.0
+	for floor, rate in sorted((flt(floor), flt(rate) / 100) for floor, rate in brackets):
+		if floors:
+			tax += (floor - floors[-1]) * rates[-1]
+		floors.append(floor)
+		rates.append(rate)
+		base_tax.append(tax)
+
+	if not floors or floors[0] > 0:
+		# income below the first slab is not taxed
+		floors.insert(0, 0.0)
+		rates.insert(0, 0.0)
+		base_tax.insert(0, 0.0)
+
+	return frappe._dict(
+		{
+			"effective_from": getdate(effective_from),
+			"floors": floors,
+			"rates": rates,
+			"base_tax": base_tax,
+			"standard_exemption": flt(standard_exemption),
+		}
+	)
+
+
+def get_statutory_table():
+	return compile_tax_table(
+		STATUTORY_EFFECTIVE_FROM, [(floor * 12, rate) for floor, rate in STATUTORY_MONTHLY_BRACKETS]
+	)
+
+
+def build_tax_tables():
+	"""{company: [table, ...]} of all submitted, enabled Income Tax Slabs, by effective date."""
+	rows = (
+		frappe.qb.from_(income_tax_slab)
+		.join(taxable_salary_slab)
+		.on(
+			(taxable_salary_slab.parent == income_tax_slab.name)
+			& (taxable_salary_slab.parenttype == "Income Tax Slab")
+		)
+		.select(
+			income_tax_slab.name,
+			income_tax_slab.company,
+			income_tax_slab.effective_from,
+			income_tax_slab.standard_tax_exemption_amount,
+			taxable_salary_slab.from_amount,
+			taxable_salary_slab.percent_deduction,
+			taxable_salary_slab.condition,
+		)
+		.where((income_tax_slab.docstatus == 1) & (income_tax_slab.disabled == 0))
+		.orderby(income_tax_slab.effective_from)
+		.orderby(income_tax_slab.name)
+	).run(as_dict=1)
+
+	return compile_slabs(rows)
+
+
+def compile_slabs(rows):
+	"""{company: [table, ...]} of the slab bracket rows, in their order.
+
+	A slab with a condition on any bracket depends on the employee and cannot be applied
+	in bulk; it is left out entirely rather than compiled with gaps.
+	"""
+	slabs = {}
+	for d in rows:
+		slab = slabs.setdefault(d.name, frappe._dict(d, brackets=[], conditional=False))
+		slab.brackets.append((d.from_amount, d.percent_deduction))
+		if (d.condition or "").strip():
+			slab.conditional = True
+
+	tables = {}
+	for slab in slabs.values():
+		if slab.conditional:
+			continue
+		tables.setdefault(slab.company, []).append(
+			compile_tax_table(slab.effective_from, slab.brackets, slab.standard_tax_exemption_amount)
+		)
+
+	return tables
+
+
+def get_tax_tables():
+	return frappe.cache.get_value(TAX_TABLES_CACHE_KEY, generator=build_tax_tables)
+
+
+def clear_tax_table_cache(doc=None, method=None):
+	"""Doc event handler for Income Tax Slab."""
+	frappe.cache.delete_value(TAX_TABLES_CACHE_KEY)
+
+
+def get_tax_table(on_date, company=None):
+	"""The bracket table of `company` in effect on `on_date`."""
+	on_date = getdate(on_date)
+	tables = [table for table in get_tax_tables().get(company, []) if table.effective_from <= on_date]
+	return tables[-1] if tables else get_statutory_table()
+
+
+def get_savings_limit():
+	limit = frappe.conf.get("ethiopian_payroll_tax_savings_limit")
+	return SAVINGS_LIMIT if limit is None else flt(limit)
+
+
+def compute_tax(taxable_incomes, table):
+	"""Tax of every income in `taxable_incomes` with a compiled table; incomes below zero pay none."""
+	floors, rates, base_tax = table.floors, table.rates, table.base_tax
+	taxes = []
+	for income in taxable_incomes:
+		income = flt(income)
+		if income <= 0:
+			taxes.append(0.0)
+			continue
+		i = bisect_right(floors, income) - 1
+		taxes.append(flt(base_tax[i] + (income - floors[i]) * rates[i], 2))
+	return taxes
+
+
+def get_annual_tax(annual_taxable_incomes, on_date, company=None):
+	"""Annual tax of every annual taxable income of a payroll run."""
+	return compute_tax(annual_taxable_incomes, get_tax_table(on_date, company))
+
+
+def get_monthly_tax(monthly_taxable_incomes, on_date, company=None, precision=2):
+	"""Monthly tax of every monthly taxable income of a payroll run, computed on the annualized income."""
+	annual_taxes = get_annual_tax([flt(income) * 12 for income in monthly_taxable_incomes], on_date, company)
+	return [flt(tax / 12, cint(precision)) for tax in annual_taxes]
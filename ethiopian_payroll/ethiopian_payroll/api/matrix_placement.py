@@ -0,0 +1,115 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Reverse placement: find the (grade, scale) of a Pay Matrix closest to an existing salary.
+
+Used when onboarding a company or migrating legacy salaries onto a matrix. Every
+salary is placed by bisecting the sorted scale amounts of the compiled matrix, so a
+whole workforce is placed in one pass without per-employee queries.
+"""
+
+import json
+
+import frappe
+from frappe import _
+from frappe.utils import flt, nowdate
+
+from ethiopian_payroll.ethiopian_payroll.api.matrix_utils import find_nearest_scale, get_compiled_matrix
+from ethiopian_payroll.ethiopian_payroll.api.step_increment import get_latest_assignments
+
+
+def place_salary(compiled_matrix, amount, grade=None):
+	"""Place one amount on the matrix.
+
+	With a grade on the matrix only that grade is searched, otherwise every grade is
+	searched and the closest step wins. Status is one of Exact, Between Steps,
+	Below Matrix or Above Matrix.
+	"""
+	grades = [grade] if grade in compiled_matrix else list(compiled_matrix)
+
+	best = None
+	for g in grades:
+		amounts = compiled_matrix[g]["amounts"]
+		if not amounts:
+			continue
+		idx, delta = find_nearest_scale(amounts, amount)
+		if best is None or abs(delta) < abs(best[2]):
+			best = (g, idx, delta)
+
+	if best is None:
+		return {"grade": None, "scale": None, "scale_amount": None, "delta": None, "status": "Off Matrix"}
+
+	g, idx, delta = best
+	amounts = compiled_matrix[g]["amounts"]
+	if delta == 0:
+		status = "Exact"
+	elif amount < amounts[0]:
+		status = "Below Matrix"
+	elif amount > amounts[-1]:
+		status = "Above Matrix"
+	else:
+		status = "Between Steps"
+
+	return {
+		"grade": g,
+		"scale": compiled_matrix[g]["scales"][idx],
+		"scale_amount": amounts[idx],
+		"delta": delta,
+		"status": status,
+	}
+
+
+def place_salaries(compiled_matrix, salaries):
+	"""Place a list of {"employee", "amount", "grade"} dicts; returns rows and a status summary."""
+	rows, summary = [], {}
+	for salary in salaries:
+		placement = place_salary(compiled_matrix, flt(salary.get("amount")), salary.get("grade"))
+		rows.append(
+			{
+				"employee": salary.get("employee"),
+				"employee_name": salary.get("employee_name"),
+				"current_grade": salary.get("grade"),
+				"amount": flt(salary.get("amount")),
+				**placement,
+			}
+		)
+		summary[placement["status"]] = summary.get(placement["status"], 0) + 1
+
+	return rows, summary
+
+
+@frappe.whitelist()
+def get_matrix_placements(
+	pay_matrix: str, salaries=None, company: str | None = None, on_date: str | None = None
+):
+	"""Placement report for many salaries against a Pay Matrix.
+
+	`salaries` is an optional list (or JSON list) of {"employee", "amount", "grade"}.
+	Without it, the base of each active employee's latest Salary Structure Assignment
+	on `on_date` is used.
+	"""
+	frappe.has_permission("Pay Matrix", "read", throw=True)
+
+	compiled_matrix = get_compiled_matrix(pay_matrix)
+	if not compiled_matrix:
+		frappe.throw(_("Pay Matrix {0} has no levels").format(pay_matrix))
+
+	if isinstance(salaries, str):
+		salaries = json.loads(salaries)
+
+	if not salaries:
+		salaries = [
+			{"employee": d.employee, "employee_name": d.employee_name, "grade": d.grade, "amount": d.base}
+			for d in get_latest_assignments(on_date or nowdate(), company)
+		]
+
+	rows, summary = place_salaries(compiled_matrix, salaries)
+	return {
+		"pay_matrix": pay_matrix,
+		"summary": summary,
+		"rows": rows,
+		"off_matrix": [
+			row for row in rows if row["status"] in ("Below Matrix", "Above Matrix", "Off Matrix")
+		],
+	}
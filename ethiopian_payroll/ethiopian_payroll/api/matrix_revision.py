@@ -0,0 +1,192 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Generate a revised Pay Matrix from an existing one by applying an uplift rule.
+
+An uplift rule looks like:
+
+	{
+		"uplift_type": "Percentage",  # or "Flat"
+		"value": 10,
+		"grade_overrides": {"14": {"uplift_type": "Flat", "value": 2500}},
+		"rounding": "Nearest",  # "Nearest", "Up", "Down" or "None"
+		"round_to": 1,
+	}
+
+Use `preview_matrix_revision` to inspect the changes and `create_matrix_revision`
+to write the new matrix.
+"""
+
+import json
+import math
+
+import frappe
+from frappe import _
+from frappe.utils import flt
+
+from ethiopian_payroll.ethiopian_payroll.api.matrix_utils import bulk_insert_matrix_levels, get_matrix_grid
+
+UPLIFT_TYPES = ("Percentage", "Flat")
+ROUNDING_METHODS = ("Nearest", "Up", "Down", "None")
+
+
+def parse_uplift_rule(rule):
+	"""Validate an uplift rule (dict or JSON string) and fill in defaults."""
+	if isinstance(rule, str):
+		rule = json.loads(rule)
+	rule = frappe._dict(rule or {})
+
+	uplift_type = rule.get("uplift_type") or "Percentage"
+	if uplift_type not in UPLIFT_TYPES:
+		frappe.throw(_("Uplift Type must be one of {0}").format(", ".join(UPLIFT_TYPES)))
+
+	rounding = rule.get("rounding") or "Nearest"
+	if rounding not in ROUNDING_METHODS:
+		frappe.throw(_("Rounding must be one of {0}").format(", ".join(ROUNDING_METHODS)))
+
+	grade_overrides = {}
+	for grade, override in (rule.get("grade_overrides") or {}).items():
+		override_type = override.get("uplift_type") or uplift_type
+		if override_type not in UPLIFT_TYPES:
+			frappe.throw(_("Invalid Uplift Type {0} for grade {1}").format(override_type, grade))
+		grade_overrides[str(grade)] = (override_type, flt(override.get("value")))
+
+	return frappe._dict(
+		{
+			"uplift_type": uplift_type,
+			"value": flt(rule.get("value")),
+			"grade_overrides": grade_overrides,
+			"rounding": rounding,
+			"round_to": flt(rule.get("round_to")) or 1.0,
+		}
+	)
+
+
+def round_amounts(amounts, rounding, round_to):
+	"""Round every amount to a multiple of `round_to` using the given method."""
+	if rounding == "None":
+		return [flt(amount, 2) for amount in amounts]
+
+	round_fn = {
+		"Nearest": lambda x: math.floor(x + 0.5),
+		"Up": math.ceil,
+		"Down": math.floor,
+	}[rounding]
+	# round the quotient first so float noise (5880.0000001) does not push Up/Down a step
+	return [flt(round_fn(flt(amount / round_to, 6)) * round_to, 2) for amount in amounts]
+
+
+def compute_revision(grid, rule):
+	"""Return a new grid with the uplift rule applied to every grade x scale cell.
+
+	The grid is flattened into parallel columns (amount, percentage, flat addition)
+	so that all cells are revised in one pass, including per-grade overrides.
+	"""
+	rule = parse_uplift_rule(rule)
+
+	grades, scales, amounts, percentages, additions = [], [], [], [], []
+	for grade, cells in grid.items():
+		uplift_type, value = rule.grade_overrides.get(str(grade), (rule.uplift_type, rule.value))
+		for scale, amount in cells:
+			grades.append(grade)
+			scales.append(scale)
+			amounts.append(flt(amount))
+			percentages.append(value if uplift_type == "Percentage" else 0.0)
+			additions.append(value if uplift_type == "Flat" else 0.0)
+
+	revised = round_amounts(
+		[
+			amount * (1 + pct / 100.0) + add
+			for amount, pct, add in zip(amounts, percentages, additions, strict=True)
+		],
+		rule.rounding,
+		rule.round_to,
+	)
+
+	revised_grid = {}
+	for grade, scale, amount in zip(grades, scales, revised, strict=True):
+		revised_grid.setdefault(grade, []).append((scale, amount))
+
+	return revised_grid
+
+
+def get_revision_diff(grid, revised_grid):
+	"""Cell by cell comparison of two grids with the same shape."""
+	diff = []
+	for grade, cells in grid.items():
+		revised_cells = dict(revised_grid.get(grade) or [])
+		for scale, amount in cells:
+			revised = revised_cells.get(scale, 0.0)
+			diff.append(
+				{
+					"grade": grade,
+					"scale": scale,
+					"current_amount": amount,
+					"revised_amount": revised,
+					"difference": flt(revised - amount, 2),
+					"percent_change": flt((revised - amount) * 100.0 / amount, 2) if amount else 0.0,
+				}
+			)
+	return diff
+
+
+def get_source_grid(source_matrix):
+	if not frappe.db.exists("Pay Matrix", source_matrix):
+		frappe.throw(_("Pay Matrix {0} does not exist").format(source_matrix))
+
+	grid = get_matrix_grid(source_matrix)
+	if not grid:
+		frappe.throw(_("Pay Matrix {0} has no levels to revise").format(source_matrix))
+
+	return grid
+
+
+@frappe.whitelist()
+def preview_matrix_revision(source_matrix: str, rule):
+	"""Return the cell level diff the uplift rule would produce, without writing anything."""
+	frappe.has_permission("Pay Matrix", "read", throw=True)
+
+	grid = get_source_grid(source_matrix)
+	revised_grid = compute_revision(grid, rule)
+	diff = get_revision_diff(grid, revised_grid)
+
+	return {
+		"source_matrix": source_matrix,
+		"grades": len(grid),
+		"cells": len(diff),
+		"total_current": flt(sum(d["current_amount"] for d in diff), 2),
+		"total_revised": flt(sum(d["revised_amount"] for d in diff), 2),
+		"diff": diff,
+	}
+
+
+@frappe.whitelist()
+def create_matrix_revision(source_matrix: str, new_matrix: str, rule):
+	"""Create `new_matrix` from `source_matrix` with the uplift rule applied."""
+	frappe.has_permission("Pay Matrix", "create", throw=True)
+
+	new_matrix = (new_matrix or "").strip()
+	if not new_matrix:
+		frappe.throw(_("New Pay Matrix name is required"))
+
+	if frappe.db.exists("Pay Matrix", new_matrix):
+		frappe.throw(_("Pay Matrix {0} already exists").format(new_matrix))
+
+	grid = get_source_grid(source_matrix)
+	revised_grid = compute_revision(grid, rule)
+
+	pay_matrix = frappe.get_doc({"doctype": "Pay Matrix", "pm": new_matrix})
+	pay_matrix.insert()
+
+	result = bulk_insert_matrix_levels(pay_matrix.name, revised_grid)
+
+	return {
+		"success": True,
+		"matrix_name": pay_matrix.name,
+		"grades": result["grades"],
+		"scales": result["scales"],
+		"message": _("Pay Matrix {0} created with {1} grade levels").format(
+			pay_matrix.name, result["grades"]
+		),
+	}
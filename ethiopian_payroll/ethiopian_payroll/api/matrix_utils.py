@@ -0,0 +1,169 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Shared helpers for reading and writing Pay Matrix data in bulk.
+
+A matrix is handled as a "grid": an ordered dict of grade -> list of (scale, amount)
+tuples sorted by scale, loaded with a single query instead of one get_doc per level.
+"""
+
+from bisect import bisect_left
+
+import frappe
+from frappe.utils import flt, now_datetime
+
+COMPILED_MATRIX_CACHE_KEY = "ethiopian_payroll:compiled_pay_matrix"
+
+pay_matrix_level = frappe.qb.DocType("Pay Matrix Level")
+pay_matrix_scale_items = frappe.qb.DocType("Pay Matrix Scale Items")
+
+LEVEL_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"grade",
+	"pay_matrix_link",
+)
+SCALE_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"parent",
+	"parentfield",
+	"parenttype",
+	"idx",
+	"scale",
+	"amount",
+)
+
+
+def grade_sort_key(grade):
+	"""Sort grades numerically, handling both "1" and "Grade 1" style names."""
+	digits = "".join(ch for ch in (grade or "") if ch.isdigit())
+	return (int(digits) if digits else 999, grade or "")
+
+
+def get_matrix_grid(pay_matrix):
+	"""Return {grade: [(scale, amount), ...]} for a Pay Matrix using one query."""
+	rows = (
+		frappe.qb.from_(pay_matrix_level)
+		.join(pay_matrix_scale_items)
+		.on(
+			(pay_matrix_scale_items.parent == pay_matrix_level.name)
+			& (pay_matrix_scale_items.parenttype == "Pay Matrix Level")
+		)
+		.select(pay_matrix_level.grade, pay_matrix_scale_items.scale, pay_matrix_scale_items.amount)
+		.where(pay_matrix_level.pay_matrix_link == pay_matrix)
+		.orderby(pay_matrix_level.grade)
+		.orderby(pay_matrix_scale_items.scale)
+	).run(as_dict=1)
+
+	grid = {}
+	for d in rows:
+		grid.setdefault(d.grade, []).append((int(d.scale), flt(d.amount)))
+
+	return {grade: grid[grade] for grade in sorted(grid, key=grade_sort_key)}
+
+
+def get_compiled_matrix(pay_matrix):
+	"""Cached {grade: {"scales": [...], "amounts": [...]}} for a Pay Matrix.
+
+	Scales are sorted ascending, so `amounts` can be searched with bisect. The cache
+	is cleared from the Pay Matrix / Pay Matrix Level doc events.
+	"""
+	return frappe.cache.hget(
+		COMPILED_MATRIX_CACHE_KEY, pay_matrix, generator=lambda: compile_matrix(get_matrix_grid(pay_matrix))
+	)
+
+
+def compile_matrix(grid):
+	return {
+		grade: {
+			"scales": [scale for scale, _amount in cells],
+			"amounts": [amount for _scale, amount in cells],
+		}
+		for grade, cells in grid.items()
+	}
+
+
+def clear_matrix_cache(doc=None, method=None):
+	"""Doc event handler: drop the compiled copy of the affected Pay Matrix."""
+	if doc is None:
+		frappe.cache.delete_value(COMPILED_MATRIX_CACHE_KEY)
+	elif doc.doctype == "Pay Matrix":
+		frappe.cache.hdel(COMPILED_MATRIX_CACHE_KEY, doc.name)
+	elif doc.get("pay_matrix_link"):
+		frappe.cache.hdel(COMPILED_MATRIX_CACHE_KEY, doc.pay_matrix_link)
+		previous = doc.get_doc_before_save() if method == "on_update" else None
+		if previous and previous.pay_matrix_link != doc.pay_matrix_link:
+			frappe.cache.hdel(COMPILED_MATRIX_CACHE_KEY, previous.pay_matrix_link)
+
+
+def find_scale_index(amounts, amount, precision=2):
+	"""Index of `amount` in the ascending `amounts` list, or None if it is not a step."""
+	amount = flt(amount, precision)
+	idx = bisect_left(amounts, amount)
+	for candidate in (idx, idx - 1):
+		if 0 <= candidate < len(amounts) and flt(amounts[candidate], precision) == amount:
+			return candidate
+	return None
+
+
+def find_nearest_scale(amounts, amount):
+	"""(index, amount - step amount) of the step closest to `amount`; the lower step wins a tie."""
+	amount = flt(amount)
+	idx = bisect_left(amounts, amount)
+	candidates = [i for i in (idx - 1, idx) if 0 <= i < len(amounts)]
+	best = min(candidates, key=lambda i: (abs(amounts[i] - amount), i))
+	return best, flt(amount - amounts[best], 2)
+
+
+def get_level_name(pay_matrix, grade):
+	"""Name of a Pay Matrix Level as produced by its autoname `{pay_matrix_link} - {grade}`."""
+	return f"{pay_matrix} - {grade}"
+
+
+def bulk_insert_matrix_levels(pay_matrix, grid):
+	"""Insert Pay Matrix Levels and their scale rows for `grid` with two bulk inserts.
+
+	The caller is responsible for creating the parent Pay Matrix and for making sure
+	the grades in `grid` exist as Employee Grades.
+	"""
+	now = now_datetime()
+	user = frappe.session.user
+
+	level_values = []
+	scale_values = []
+	for grade, scales in grid.items():
+		level_name = get_level_name(pay_matrix, grade)
+		level_values.append((level_name, now, now, user, user, 0, grade, pay_matrix))
+		for idx, (scale, amount) in enumerate(scales, start=1):
+			scale_values.append(
+				(
+					frappe.generate_hash(length=10),
+					now,
+					now,
+					user,
+					user,
+					0,
+					level_name,
+					"scales",
+					"Pay Matrix Level",
+					idx,
+					scale,
+					amount,
+				)
+			)
+
+	frappe.db.bulk_insert("Pay Matrix Level", LEVEL_FIELDS, level_values)
+	frappe.db.bulk_insert("Pay Matrix Scale Items", SCALE_FIELDS, scale_values)
+	frappe.cache.hdel(COMPILED_MATRIX_CACHE_KEY, pay_matrix)
+
+	return {"grades": len(level_values), "scales": len(scale_values)}
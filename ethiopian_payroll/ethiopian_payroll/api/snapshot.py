@@ -0,0 +1,373 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Immutable monthly snapshots of closed payroll periods.
+
+Closing a period (`close_period`, or `bench close-payroll-period`) freezes the
+submitted Salary Slips of a company's month into one read-only file under
+private/payroll_snapshots/<company>/<YYYY-MM>.snap:
+
+	magic, header length      16 bytes
+	header                    zlib-compressed JSON: period, the slip attributes as text
+	                          columns, the numeric column names, the component totals
+	columns                   one little-endian float64 array per numeric column and per
+	                          earning/deduction component, 8-byte aligned, slips in
+	                          employee, start date, name order; NaN where a slip does
+	                          not have the component, so zero amounts on it are kept
+	sha256                    32 bytes, over everything before it
+
+The file is memory-mapped on read and the checksum verified once per process;
+`PayrollSnapshot.column` returns a view on the mapped file without copying it.
+Salary Slips of a closed period can no longer be submitted or cancelled, so
+reports over closed periods read the snapshots instead of the live tables.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import date
+from heapq import merge
+from itertools import groupby
+
+import frappe
+from frappe import _
+from frappe.utils import add_months, flt, get_first_day, get_last_day, getdate, now
+
+from ethiopian_payroll.ethiopian_payroll.report.utils import get_salary_slip_query, iter_batches
+
+MAGIC = b"EPSNAP02"
+# earlier snapshots stored 0 for components a slip does not have
+LEGACY_MAGIC = b"EPSNAP01"
+MISSING = float("nan")
+PREAMBLE = struct.Struct("<8sQ")
+CHECKSUM_SIZE = 32
+
+# slip attributes kept as text, and as float64 columns
+TEXT_FIELDS = (
+	"name",
+	"employee",
+	"employee_name",
+	"department",
+	"designation",
+	"branch",
+	"start_date",
+	"end_date",
+	"posting_date",
+	"currency",
+	"bank_name",
+	"bank_account_no",
+)
+NUMERIC_FIELDS = (
+	"exchange_rate",
+	"payment_days",
+	"total_working_days",
+	"gross_pay",
+	"total_deduction",
+	"net_pay",
+	"rounded_total",
+	"current_month_income_tax",
+)
+FILTER_FIELDS = ("employee", "department", "designation", "branch")
+
+salary_slip = frappe.qb.DocType("Salary Slip")
+salary_detail = frappe.qb.DocType("Salary Detail")
+
+# path: (mtime, PayrollSnapshot); snapshots never change once written
+_snapshots = {}
+
+
+class PayrollSnapshot:
+	"""A memory-mapped snapshot file, checked against its checksum when opened."""
+
+	def __init__(self, path):
+		self.path = path
+		with open(path, "rb") as f:
+			self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+		buffer = memoryview(self._mmap)
+		if len(buffer) < PREAMBLE.size + CHECKSUM_SIZE:
+			frappe.throw(_("Payroll snapshot {0} is truncated").format(path))
+		magic, header_length = PREAMBLE.unpack_from(buffer)
+		if magic not in (MAGIC, LEGACY_MAGIC):
+			frappe.throw(_("{0} is not a payroll snapshot").format(path))
+		if hashlib.sha256(buffer[:-CHECKSUM_SIZE]).digest() != buffer[-CHECKSUM_SIZE:]:
+			frappe.throw(_("Payroll snapshot {0} is corrupt, its checksum does not match").format(path))
+
+		self.keeps_zeros = magic == MAGIC
+
+		header_end = PREAMBLE.size + header_length
+		self.header = frappe._dict(json.loads(zlib.decompress(buffer[PREAMBLE.size : header_end])))
+		self.rows = self.header.rows
+		self.text = self.header.text
+
+		data = buffer[align(header_end) : -CHECKSUM_SIZE]
+		size = self.rows * 8
+		self._columns = {
+			column: data[i * size : (i + 1) * size] for i, column in enumerate(self.header.columns)
+		}
+
+	def column(self, name):
+		"""The values of a numeric field or "earnings:<component>" column, without copying them.
+
+		A component column holds NaN for the slips that do not have the component.
+		"""
+		values = self._columns[name]
+		if sys.byteorder == "little":
+			return values.cast("d")
+		values = array("d", values)
+		values.byteswap()
+		return values
+
+	def component_names(self, parentfield):
+		return self.header[parentfield]
+
+	def slips(self, filters=None, from_date=None, to_date=None):
+		"""Yield every slip matching the report filters, with `earnings` and `deductions` maps.
+
+		Like the live report query, only slips starting on or after `from_date` and ending
+		on or before `to_date` are included.
+		"""
+		filters = {f: filters.get(f) for f in FILTER_FIELDS if filters and filters.get(f)}
+		from_date = str(getdate(from_date)) if from_date else None
+		to_date = str(getdate(to_date)) if to_date else None
+		text = self.text
+		rows = [
+			i
+			for i in range(self.rows)
+			if all(text[f][i] == v for f, v in filters.items())
+			and (not from_date or text["start_date"][i] >= from_date)
+			and (not to_date or text["end_date"][i] <= to_date)
+		]
+		if not rows:
+			return
+
+		numeric = {field: self.column(field) for field in NUMERIC_FIELDS}
+		components = {
+			parentfield: [(c, self.column(f"{parentfield}:{c}")) for c in self.header[parentfield]]
+			for parentfield in ("earnings", "deductions")
+		}
+		for i in rows:
+			slip = frappe._dict({field: values[i] for field, values in self.text.items()})
+			slip.update({field: values[i] for field, values in numeric.items()})
+			for parentfield, columns in components.items():
+				slip[parentfield] = frappe._dict(
+					{c: values[i] for c, values in columns if has_component(values[i], self.keeps_zeros)}
+				)
+			yield slip
+
+
+def has_component(value, keeps_zeros=True):
+	# NaN marks a component the slip does not have; legacy snapshots only kept non-zero amounts
+	return value == value if keeps_zeros else bool(value)
+
+
+def align(offset):
+	return (offset + 7) & ~7
+
+
+def write_snapshot(path, header, columns):
+	"""Write the float64 `columns` {name: values} and `header` to a new read-only snapshot file."""
+	header = {**header, "columns": list(columns)}
+	header_bytes = zlib.compress(json.dumps(header, default=str).encode(), 9)
+
+	body = bytearray(PREAMBLE.pack(MAGIC, len(header_bytes)))
+	body += header_bytes
+	body += bytes(align(len(body)) - len(body))
+	for values in columns.values():
+		values = array("d", values)
+		if sys.byteorder != "little":
+			values.byteswap()
+		body += values.tobytes()
+
+	tmp_path = f"{path}.tmp"
+	with open(tmp_path, "wb") as f:
+		f.write(body)
+		f.write(hashlib.sha256(body).digest())
+		f.flush()
+		os.fsync(f.fileno())
+	os.chmod(tmp_path, 0o444)
+	os.replace(tmp_path, path)
+
+
+def get_snapshot_path(company, period):
+	return frappe.get_site_path("private", "payroll_snapshots", frappe.scrub(company), f"{period}.snap")
+
+
+def get_period(on_date):
+	"""The "YYYY-MM" period of a date."""
+	return f"{getdate(on_date):%Y-%m}"
+
+
+def get_periods(from_date, to_date):
+	"""Every period overlapping `from_date` to `to_date`."""
+	periods = []
+	month = get_first_day(from_date)
+	while month <= getdate(to_date):
+		periods.append(get_period(month))
+		month = add_months(month, 1)
+	return periods
+
+
+def is_period_closed(company, on_date):
+	return os.path.exists(get_snapshot_path(company, get_period(on_date)))
+
+
+def load_snapshot(company, period):
+	"""The snapshot of a closed period, or None when it is open."""
+	path = get_snapshot_path(company, period)
+	try:
+		mtime = os.stat(path).st_mtime
+	except FileNotFoundError:
+		return None
+
+	cached = _snapshots.get(path)
+	if not cached or cached[0] != mtime:
+		cached = _snapshots[path] = (mtime, PayrollSnapshot(path))
+	return cached[1]
+
+
+def get_snapshots(company, from_date, to_date, filters=None):
+	"""Snapshots of every period from `from_date` to `to_date`, or None unless all are closed.
+
+	Snapshots only hold submitted slips, so None is returned for any other Status filter.
+	"""
+	if filters and filters.get("docstatus") not in (None, "", "Submitted"):
+		return None
+
+	periods = get_periods(from_date, to_date)
+	snapshots = []
+	for period in periods:
+		snapshot = load_snapshot(company, period)
+		if not snapshot:
+			return None
+		snapshots.append(snapshot)
+	return snapshots or None
+
+
+def iter_employee_snapshot_slips(snapshots, filters=None, from_date=None, to_date=None):
+	"""Yield (employee, slips) from the snapshots in employee, start date, slip order."""
+	slips = merge(
+		*(snapshot.slips(filters, from_date, to_date) for snapshot in snapshots),
+		key=lambda ss: (ss.employee, ss.start_date, ss.name),
+	)
+	for employee, employee_slips in groupby(slips, key=lambda ss: ss.employee):
+		yield employee, list(employee_slips)
+
+
+def get_snapshot_component_names(snapshots):
+	"""Earning and deduction component names of the snapshots, like the live report lookup."""
+	earnings, deductions = set(), set()
+	for snapshot in snapshots:
+		earnings.update(snapshot.component_names("earnings"))
+		deductions.update(snapshot.component_names("deductions"))
+	return earnings, deductions
+
+
+def build_snapshot(company, period):
+	"""Header and columns of a period's submitted slips, read with one streamed query."""
+	from_date = get_first_day(f"{period}-01")
+	to_date = get_last_day(from_date)
+	# a slip belongs to the period it starts in
+	query = get_salary_slip_query(frappe._dict(company=company), from_date).where(
+		salary_slip.start_date <= to_date
+	)
+
+	components = {"earnings": [], "deductions": []}
+	for component, parentfield in (
+		query.join(salary_detail)
+		.on(salary_detail.parent == salary_slip.name)
+		.select(salary_detail.salary_component, salary_detail.parentfield)
+		.distinct()
+		.orderby(salary_detail.salary_component)
+	).run():
+		if parentfield in components:
+			components[parentfield].append(component)
+
+	text = {field: [] for field in TEXT_FIELDS}
+	columns = {field: array("d") for field in NUMERIC_FIELDS}
+	component_columns = [f"{pf}:{c}" for pf, names in components.items() for c in names]
+	columns.update((column, array("d")) for column in component_columns)
+
+	rows = (
+		query.left_join(salary_detail)
+		.on(salary_detail.parent == salary_slip.name)
+		.select(
+			*(salary_slip[f] for f in TEXT_FIELDS + NUMERIC_FIELDS),
+			salary_detail.parentfield,
+			salary_detail.salary_component,
+			salary_detail.amount,
+		)
+		.orderby(salary_slip.employee)
+		.orderby(salary_slip.start_date)
+		.orderby(salary_slip.name)
+	)
+	stream = (d for batch in iter_batches(rows) for d in batch)
+	for _name, details in groupby(stream, key=lambda d: d.name):
+		amounts = dict.fromkeys(component_columns, MISSING)
+		for i, d in enumerate(details):
+			if not i:
+				for field in TEXT_FIELDS:
+					value = d[field]
+					text[field].append(value.isoformat() if isinstance(value, date) else value)
+				for field in NUMERIC_FIELDS:
+					columns[field].append(flt(d[field]))
+			if d.parentfield in components:
+				column = f"{d.parentfield}:{d.salary_component}"
+				amount = amounts[column]
+				amounts[column] = (amount if has_component(amount) else 0.0) + flt(d.amount)
+		for column, amount in amounts.items():
+			columns[column].append(amount)
+
+	# the database collation may order names differently; readers merge periods in python order
+	order = sorted(
+		range(len(text["name"])), key=lambda i: (text["employee"][i], text["start_date"][i], text["name"][i])
+	)
+	text = {field: [values[i] for i in order] for field, values in text.items()}
+	columns = {column: array("d", (values[i] for i in order)) for column, values in columns.items()}
+
+	header = {
+		"company": company,
+		"period": period,
+		"from_date": from_date,
+		"to_date": to_date,
+		"closed_on": now(),
+		"closed_by": frappe.session.user,
+		"rows": len(text["name"]),
+		"text": text,
+		**components,
+		"totals": {
+			column: flt(sum(value for value in values if has_component(value)), 2)
+			for column, values in columns.items()
+		},
+	}
+	return header, columns
+
+
+@frappe.whitelist()
+def close_period(company: str, period: str):
+	"""Freeze the submitted Salary Slips of `company` in `period` ("YYYY-MM") into a snapshot."""
+	frappe.has_permission("Salary Slip", "cancel", throw=True)
+	period = get_period(f"{period}-01")
+	path = get_snapshot_path(company, period)
+	if os.path.exists(path):
+		frappe.throw(_("Payroll period {0} of {1} is already closed").format(period, company))
+
+	header, columns = build_snapshot(company, period)
+	if not header["rows"]:
+		frappe.throw(_("There are no submitted Salary Slips of {0} in {1}").format(company, period))
+
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	write_snapshot(path, header, columns)
+	return {"period": period, "rows": header["rows"], "totals": header["totals"]}
+
+
+def validate_period_open(doc, method=None):
+	"""Salary Slip doc event: slips of a closed period cannot be submitted or cancelled."""
+	if is_period_closed(doc.company, doc.start_date):
+		frappe.throw(_("Payroll period {0} of {1} is closed").format(get_period(doc.start_date), doc.company))
@@ -0,0 +1,164 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Ethiopian statutory contributions of a payroll run, computed in one pass.
+
+`get_statutory_schedule` reads the slips of a filtered Salary Slip query together
+with their earnings in a single streamed query and computes, per slip:
+
+	pension_employee / pension_employer   % of the basic salary (Proclamation 715/2011),
+	                                      the earning the PF Report resolves as "basic"
+	income_tax                            PAYE on the taxable earnings (api.income_tax)
+	cost_sharing                          % of the gross pay, for employees with the
+	                                      Employee "Cost Sharing" check set (created by
+	                                      a patch, `create_cost_sharing_field`)
+
+The rates are looked up once per run by effective date and can be overridden per site.
+Proclamation 715/2011 phased the pension rates in yearly until 2015-07-08; those
+rates are not tabulated, so periods before that date are not supported:
+
+	"ethiopian_payroll_statutory_rates": {"pension_employee": 7, "pension_employer": 11, "cost_sharing": 10}
+"""
+
+from bisect import bisect_right
+from itertools import groupby
+
+import frappe
+from frappe import _
+from frappe.utils import flt, formatdate, getdate
+
+from ethiopian_payroll.ethiopian_payroll.api.income_tax import get_monthly_tax
+from ethiopian_payroll.ethiopian_payroll.report.pf_report.pf_report import resolve_role
+from ethiopian_payroll.ethiopian_payroll.report.utils import iter_batches
+
+# (effective from, rates in %), oldest first; the first row is the earliest supported date
+STATUTORY_RATES = (("2015-07-08", {"pension_employee": 7, "pension_employer": 11, "cost_sharing": 10}),)
+
+# Employee check of the employees who pay cost-sharing
+COST_SHARING_FIELD = "custom_cost_sharing"
+
+salary_slip = frappe.qb.DocType("Salary Slip")
+salary_detail = frappe.qb.DocType("Salary Detail")
+salary_component = frappe.qb.DocType("Salary Component")
+employee = frappe.qb.DocType("Employee")
+
+
+def create_cost_sharing_field():
+	"""Add the Employee check that makes an employee pay cost-sharing."""
+	from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+	create_custom_fields(
+		{
+			"Employee": [
+				{
+					"fieldname": COST_SHARING_FIELD,
+					"fieldtype": "Check",
+					"label": "Cost Sharing",
+					"insert_after": "salary_mode",
+					"description": "Pays cost-sharing on the gross pay (higher education graduates)",
+				}
+			]
+		},
+		update=True,
+	)
+
+
+def get_statutory_rates(on_date):
+	"""Rates in % in effect on `on_date`, with the site overrides applied."""
+	dates = [getdate(effective_from) for effective_from, _rates in STATUTORY_RATES]
+	i = bisect_right(dates, getdate(on_date)) - 1
+	if i < 0:
+		frappe.throw(
+			_("Statutory contributions are only supported for periods from {0}").format(formatdate(dates[0]))
+		)
+	rates = frappe._dict(STATUTORY_RATES[i][1])
+	rates.update(frappe.conf.get("ethiopian_payroll_statutory_rates") or {})
+	return rates
+
+
+def iter_slip_earnings(query):
+	"""Yield every slip of the query with its basic salary and taxable earnings, from one streamed query."""
+	# the field is missing until the patch has run
+	cost_sharing = frappe.db.has_column("Employee", COST_SHARING_FIELD)
+	rows = (
+		query.left_join(salary_detail)
+		.on((salary_detail.parent == salary_slip.name) & (salary_detail.parentfield == "earnings"))
+		.left_join(salary_component)
+		.on(salary_component.name == salary_detail.salary_component)
+		.select(
+			salary_slip.name,
+			salary_slip.employee,
+			salary_slip.employee_name,
+			salary_slip.gross_pay,
+			salary_detail.salary_component,
+			salary_detail.amount,
+			salary_component.is_tax_applicable,
+		)
+		.orderby(salary_slip.employee)
+		.orderby(salary_slip.name)
+	)
+	if cost_sharing:
+		rows = (
+			rows.join(employee)
+			.on(employee.name == salary_slip.employee)
+			.select(employee[COST_SHARING_FIELD].as_("cost_sharing_applicable"))
+		)
+
+	roles = {}
+	stream = (d for batch in iter_batches(rows) for d in batch)
+	for name, details in groupby(stream, key=lambda d: d.name):
+		slip = None
+		basic_preference = None
+		for d in details:
+			if not slip:
+				slip = frappe._dict(
+					{
+						"salary_slip": name,
+						"employee": d.employee,
+						"employee_name": d.employee_name,
+						"gross_pay": flt(d.gross_pay),
+						"cost_sharing_applicable": bool(d.get("cost_sharing_applicable")),
+						"basic": 0.0,
+						"taxable_income": 0.0,
+					}
+				)
+			if d.salary_component not in roles:
+				roles[d.salary_component] = d.salary_component and resolve_role(
+					"earnings", d.salary_component
+				)
+			role = roles[d.salary_component]
+			# the most preferred non-zero basic component, as in the PF Report
+			if role and role[0] == "basic" and flt(d.amount):
+				if basic_preference is None or role[1] < basic_preference:
+					slip.basic, basic_preference = flt(d.amount), role[1]
+			if d.is_tax_applicable:
+				slip.taxable_income += flt(d.amount)
+		yield slip
+
+
+def get_statutory_schedule(query, on_date, company=None):
+	"""Statutory contributions of every slip of a filtered Salary Slip query, and their totals.
+
+	Returns {"slips": [...], "totals": {...}}. The contributions are computed column by
+	column over the whole run; income tax in one call of the tax engine.
+	"""
+	rates = get_statutory_rates(on_date)
+	slips = list(iter_slip_earnings(query))
+
+	income_tax = get_monthly_tax([slip.taxable_income for slip in slips], on_date, company)
+	for slip, tax in zip(slips, income_tax, strict=True):
+		slip.pension_employee = flt(slip.basic * flt(rates.pension_employee) / 100, 2)
+		slip.pension_employer = flt(slip.basic * flt(rates.pension_employer) / 100, 2)
+		slip.income_tax = tax
+		slip.cost_sharing = (
+			flt(slip.gross_pay * flt(rates.cost_sharing) / 100, 2) if slip.cost_sharing_applicable else 0.0
+		)
+
+	totals = frappe._dict(
+		{
+			field: flt(sum(slip[field] for slip in slips), 2)
+			for field in ("pension_employee", "pension_employer", "income_tax", "cost_sharing")
+		}
+	)
+	return frappe._dict({"slips": slips, "totals": totals, "rates": rates})
@@ -0,0 +1,242 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Annual step increment for employees paid on a Pay Matrix.
+
+An employee is due for an increment when their latest submitted Salary Structure
+Assignment started at least a year before the increment date. Their current step is
+the scale of their grade whose amount equals the assignment base; the increment moves
+them one scale up and creates a new Salary Structure Assignment with that amount.
+
+Only employees whose designation has a level on the matrix are considered, so that
+employees on another matrix are not priced against this one; when no designation is
+linked to the matrix at all, every employee is. `get_due_increments` is the dry run;
+`run_step_increment` creates the assignments in background jobs of
+INCREMENT_CHUNK_SIZE employees each, skipping employees that already have an
+assignment from the increment date.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import add_months, cint, flt, getdate
+
+from ethiopian_payroll.ethiopian_payroll.api.designation_matrix import get_matrix_designations
+from ethiopian_payroll.ethiopian_payroll.api.matrix_utils import find_scale_index, get_compiled_matrix
+
+INCREMENT_CHUNK_SIZE = 500
+
+employee = frappe.qb.DocType("Employee")
+salary_structure_assignment = frappe.qb.DocType("Salary Structure Assignment")
+
+# fields copied from the current assignment to the new one
+ASSIGNMENT_FIELDS = (
+	"company",
+	"salary_structure",
+	"currency",
+	"variable",
+	"income_tax_slab",
+	"payroll_payable_account",
+)
+
+
+def get_latest_assignments(on_date, company=None, designations=None):
+	"""Latest submitted assignment on or before `on_date` for every active employee, in one query.
+
+	With `designations` only the employees holding one of them are read.
+	"""
+	query = (
+		frappe.qb.from_(salary_structure_assignment)
+		.join(employee)
+		.on(employee.name == salary_structure_assignment.employee)
+		.select(
+			salary_structure_assignment.name,
+			salary_structure_assignment.employee,
+			employee.employee_name,
+			employee.grade,
+			salary_structure_assignment.from_date,
+			salary_structure_assignment.base,
+			*[salary_structure_assignment.field(field) for field in ASSIGNMENT_FIELDS],
+		)
+		.where(salary_structure_assignment.docstatus == 1)
+		.where(salary_structure_assignment.from_date <= on_date)
+		.where(employee.status == "Active")
+		.orderby(salary_structure_assignment.employee)
+		.orderby(salary_structure_assignment.from_date, order=frappe.qb.desc)
+	)
+
+	if company:
+		query = query.where(salary_structure_assignment.company == company)
+
+	if designations:
+		query = query.where(employee.designation.isin(designations))
+
+	latest = {}
+	for d in query.run(as_dict=1):
+		latest.setdefault(d.employee, d)
+
+	return list(latest.values())
+
+
+def compute_increments(assignments, compiled_matrix, on_date):
+	"""Work out the next step for each assignment. Returns one row per employee with a status."""
+	on_date = getdate(on_date)
+	rows = []
+
+	for ssa in assignments:
+		row = frappe._dict(
+			{
+				"employee": ssa.employee,
+				"employee_name": ssa.employee_name,
+				"grade": ssa.grade,
+				"current_assignment": ssa.name,
+				"current_from_date": ssa.from_date,
+				"current_amount": flt(ssa.base),
+				"current_scale": None,
+				"new_scale": None,
+				"new_amount": None,
+			}
+		)
+		rows.append(row)
+
+		level = compiled_matrix.get(ssa.grade)
+		if not level:
+			row.status = "Grade Not On Matrix"
+			continue
+
+		if getdate(add_months(ssa.from_date, 12)) > on_date:
+			row.status = "Not Due"
+			continue
+
+		idx = find_scale_index(level["amounts"], ssa.base)
+		if idx is None:
+			row.status = "Off Matrix"
+			continue
+
+		row.current_scale = level["scales"][idx]
+		if idx + 1 >= len(level["amounts"]):
+			row.status = "At Top Of Scale"
+			continue
+
+		row.new_scale = level["scales"][idx + 1]
+		row.new_amount = level["amounts"][idx + 1]
+		row.status = "Due"
+
+	return rows
+
+
+@frappe.whitelist()
+def get_due_increments(pay_matrix: str, on_date: str, company: str | None = None):
+	"""Dry run: the step increment outcome for every active employee on the matrix, nothing is created.
+
+	Employees on the matrix whose grade has no level on it are listed as "Grade Not On Matrix".
+	"""
+	frappe.has_permission("Salary Structure Assignment", "read", throw=True)
+
+	compiled_matrix = get_compiled_matrix(pay_matrix)
+	if not compiled_matrix:
+		frappe.throw(_("Pay Matrix {0} has no levels").format(pay_matrix))
+
+	assignments = get_latest_assignments(on_date, company, get_matrix_designations(pay_matrix))
+	rows = compute_increments(assignments, compiled_matrix, on_date)
+
+	summary = {}
+	for row in rows:
+		summary[row.status] = summary.get(row.status, 0) + 1
+
+	return {"pay_matrix": pay_matrix, "on_date": on_date, "summary": summary, "rows": rows}
+
+
+@frappe.whitelist()
+def run_step_increment(pay_matrix: str, on_date: str, company: str | None = None, submit: int = 0):
+	"""Create the increment assignments for all due employees in background chunks."""
+	frappe.has_permission("Salary Structure Assignment", "create", throw=True)
+
+	result = get_due_increments(pay_matrix, on_date, company)
+	due = [row for row in result["rows"] if row.status == "Due"]
+	if not due:
+		return {"success": True, "due": 0, "jobs": 0, "message": _("No employees are due for an increment")}
+
+	jobs = 0
+	for start in range(0, len(due), INCREMENT_CHUNK_SIZE):
+		frappe.enqueue(
+			"ethiopian_payroll.ethiopian_payroll.api.step_increment.create_increment_assignments",
+			queue="long",
+			timeout=3600,
+			rows=due[start : start + INCREMENT_CHUNK_SIZE],
+			on_date=on_date,
+			submit=submit,
+		)
+		jobs += 1
+
+	return {
+		"success": True,
+		"due": len(due),
+		"jobs": jobs,
+		"message": _("Queued {0} step increments in {1} background jobs").format(len(due), jobs),
+	}
+
+
+def create_increment_assignments(rows, on_date, submit=0):
+	"""Background job: create (and optionally submit) one Salary Structure Assignment per row.
+
+	Employees that already have an assignment from `on_date`, e.g. from an earlier run,
+	are skipped.
+	"""
+	existing = set(
+		frappe.get_all(
+			"Salary Structure Assignment",
+			filters={
+				"employee": ["in", [row["employee"] for row in rows]],
+				"from_date": on_date,
+				"docstatus": ["<", 2],
+			},
+			pluck="employee",
+		)
+	)
+	assignments = {
+		d.name: d
+		for d in frappe.get_all(
+			"Salary Structure Assignment",
+			filters={"name": ["in", [row["current_assignment"] for row in rows]]},
+			fields=["name", *ASSIGNMENT_FIELDS],
+		)
+	}
+
+	created, failed, skipped = [], [], []
+	for row in rows:
+		row = frappe._dict(row)
+		if row.employee in existing:
+			skipped.append(row.employee)
+			continue
+
+		current = assignments.get(row.current_assignment)
+		if not current:
+			failed.append(row.employee)
+			continue
+
+		try:
+			doc = frappe.new_doc("Salary Structure Assignment")
+			doc.update({field: current.get(field) for field in ASSIGNMENT_FIELDS})
+			doc.employee = row.employee
+			doc.from_date = on_date
+			doc.base = row.new_amount
+			doc.insert()
+			if cint(submit):
+				doc.submit()
+			created.append(doc.name)
+		except Exception:
+			frappe.db.rollback()
+			failed.append(row.employee)
+			frappe.log_error(title=f"Step increment failed for {row.employee}")
+			continue
+
+		frappe.db.commit()
+
+	if failed:
+		frappe.log_error(
+			title="Step increment: employees skipped",
+			message=frappe.as_json({"on_date": on_date, "employees": failed}),
+		)
+
+	return {"created": created, "failed": failed, "skipped": skipped}
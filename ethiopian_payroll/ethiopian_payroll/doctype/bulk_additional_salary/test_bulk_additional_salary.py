@@ -1,9 +1,56 @@
 # Copyright (c) 2025, Samuael Ketema and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from ethiopian_payroll.ethiopian_payroll.api.arrears import compute_arrears
 
 
 class TestBulkAdditionalSalary(FrappeTestCase):
-	pass
+	def test_arrears_follow_proration_of_paid_basic(self):
+		old_matrix = {"1": {"scales": [1, 2], "amounts": [4905.0, 5346.0]}}
+		revised_matrix = {"1": {"scales": [1, 2], "amounts": [5400.0, 5880.0]}}
+		history = {"EMP-1": ([getdate("2025-01-01")], [4905.0], [None])}
+		slips = [
+			frappe._dict(
+				name="SS-1", employee="EMP-1", employee_name="A", start_date="2026-01-01", paid_basic=4905
+			),
+			frappe._dict(
+				name="SS-2", employee="EMP-1", employee_name="A", start_date="2026-02-01", paid_basic=2452.5
+			),
+			frappe._dict(
+				name="SS-3", employee="EMP-2", employee_name="B", start_date="2026-01-01", paid_basic=100
+			),
+		]
+
+		rows = compute_arrears(slips, {"EMP-1": "1", "EMP-2": "1"}, history, old_matrix, revised_matrix)
+
+		self.assertEqual([row.arrear for row in rows], [495.0, 247.5, 0.0])
+		self.assertEqual(rows[2].status, "Off Matrix")
+
+	def test_arrears_use_the_grade_of_each_month(self):
+		old_matrix = {
+			"1": {"scales": [1, 2], "amounts": [4905.0, 5346.0]},
+			"2": {"scales": [1, 2], "amounts": [5690.0, 6202.0]},
+		}
+		revised_matrix = {
+			"1": {"scales": [1, 2], "amounts": [5400.0, 5880.0]},
+			"2": {"scales": [1, 2], "amounts": [6260.0, 6820.0]},
+		}
+		# promoted from grade 1 to grade 2 in February
+		history = {"EMP-1": ([getdate("2025-01-01"), getdate("2026-02-01")], [4905.0, 5690.0], ["1", "2"])}
+		slips = [
+			frappe._dict(
+				name="SS-1", employee="EMP-1", employee_name="A", start_date="2026-01-01", paid_basic=4905
+			),
+			frappe._dict(
+				name="SS-2", employee="EMP-1", employee_name="A", start_date="2026-02-01", paid_basic=5690
+			),
+		]
+
+		rows = compute_arrears(slips, {"EMP-1": "2"}, history, old_matrix, revised_matrix)
+
+		self.assertEqual([row.grade for row in rows], ["1", "2"])
+		self.assertEqual([row.arrear for row in rows], [495.0, 570.0])
@@ -40,6 +40,12 @@ frappe.ui.form.on("Pay Matrix", {
 				);
 			}, __("Actions"));
 		}
+
+		if (!frm.is_new()) {
+			frm.add_custom_button(__("Create Revision"), function() {
+				create_matrix_revision(frm);
+			}, __("Actions"));
+		}
 	},
 	add_level(frm) {
 		create_pay_matrix_level(frm);
@@ -588,3 +594,82 @@ function edit_pay_matrix_level(frm, level_doc) {
 
 	d.show();
 }
+
+function create_matrix_revision(frm) {
+	const d = new frappe.ui.Dialog({
+		title: __("Create Pay Matrix Revision"),
+		fields: [
+			{
+				fieldname: "new_matrix",
+				fieldtype: "Data",
+				label: __("New Pay Matrix Name"),
+				reqd: 1,
+			},
+			{
+				fieldname: "uplift_type",
+				fieldtype: "Select",
+				label: __("Uplift Type"),
+				options: ["Percentage", "Flat"],
+				default: "Percentage",
+				reqd: 1,
+			},
+			{
+				fieldname: "value",
+				fieldtype: "Float",
+				label: __("Uplift Value"),
+				reqd: 1,
+			},
+			{
+				fieldname: "column_break_rounding",
+				fieldtype: "Column Break",
+			},
+			{
+				fieldname: "rounding",
+				fieldtype: "Select",
+				label: __("Rounding"),
+				options: ["Nearest", "Up", "Down", "None"],
+				default: "Nearest",
+			},
+			{
+				fieldname: "round_to",
+				fieldtype: "Float",
+				label: __("Round To"),
+				default: 1,
+			},
+		],
+		primary_action_label: __("Preview"),
+		primary_action: async (values) => {
+			const rule = {
+				uplift_type: values.uplift_type,
+				value: values.value,
+				rounding: values.rounding,
+				round_to: values.round_to,
+			};
+			const r = await frappe.call({
+				method: "ethiopian_payroll.ethiopian_payroll.api.matrix_revision.preview_matrix_revision",
+				args: { source_matrix: frm.doc.name, rule: rule },
+				freeze: true,
+			});
+			const preview = r.message;
+			const message = __("{0} cells across {1} grades. Total of all cells goes from {2} to {3}. Create {4}?", [
+				preview.cells,
+				preview.grades,
+				format_currency(preview.total_current),
+				format_currency(preview.total_revised),
+				values.new_matrix.bold(),
+			]);
+			frappe.confirm(message, async () => {
+				const res = await frappe.call({
+					method: "ethiopian_payroll.ethiopian_payroll.api.matrix_revision.create_matrix_revision",
+					args: { source_matrix: frm.doc.name, new_matrix: values.new_matrix, rule: rule },
+					freeze: true,
+					freeze_message: __("Creating Pay Matrix..."),
+				});
+				d.hide();
+				frappe.show_alert({ message: res.message.message, indicator: "green" });
+				frappe.set_route("Form", "Pay Matrix", res.message.matrix_name);
+			});
+		},
+	});
+	d.show();
+}
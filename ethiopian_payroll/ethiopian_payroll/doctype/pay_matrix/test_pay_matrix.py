@@ -4,6 +4,33 @@
 # import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from ethiopian_payroll.ethiopian_payroll.api.matrix_revision import compute_revision, get_revision_diff
+
+GRID = {
+	"1": [(1, 4905.0), (2, 5346.0)],
+	"2": [(1, 5690.0), (2, 6202.0)],
+}
+
 
 class TestPayMatrix(FrappeTestCase):
-	pass
+	def test_percentage_revision_with_rounding(self):
+		revised = compute_revision(GRID, {"uplift_type": "Percentage", "value": 10, "round_to": 10})
+		self.assertEqual(revised["1"], [(1, 5400.0), (2, 5880.0)])
+		self.assertEqual(revised["2"], [(1, 6260.0), (2, 6820.0)])
+
+	def test_grade_override_and_round_up(self):
+		rule = {
+			"uplift_type": "Percentage",
+			"value": 5,
+			"rounding": "Up",
+			"grade_overrides": {"2": {"uplift_type": "Flat", "value": 300}},
+		}
+		revised = compute_revision(GRID, rule)
+		self.assertEqual(revised["1"], [(1, 5151.0), (2, 5614.0)])
+		self.assertEqual(revised["2"], [(1, 5990.0), (2, 6502.0)])
+
+	def test_revision_diff(self):
+		revised = compute_revision(GRID, {"uplift_type": "Flat", "value": 100})
+		diff = get_revision_diff(GRID, revised)
+		self.assertEqual(len(diff), 4)
+		self.assertTrue(all(d["difference"] == 100 for d in diff))
@@ -1,9 +1,71 @@
 # Copyright (c) 2025, Samuael Ketema and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from ethiopian_payroll.ethiopian_payroll.api.designation_matrix import get_matrix_designations
+from ethiopian_payroll.ethiopian_payroll.api.matrix_placement import place_salary
+from ethiopian_payroll.ethiopian_payroll.api.step_increment import compute_increments
+
+COMPILED_MATRIX = {
+	"1": {"scales": [1, 2, 3], "amounts": [4905.0, 5346.0, 5828.0]},
+	"2": {"scales": [1, 2, 3], "amounts": [5690.0, 6202.0, 6760.0]},
+}
+
+
+def make_assignment(employee, grade, from_date, base):
+	return frappe._dict(
+		{
+			"name": f"SSA-{employee}",
+			"employee": employee,
+			"employee_name": employee,
+			"grade": grade,
+			"from_date": from_date,
+			"base": base,
+		}
+	)
+
 
 class TestPayMatrixLevel(FrappeTestCase):
-	pass
+	def test_step_increment_statuses(self):
+		assignments = [
+			make_assignment("EMP-1", "1", "2025-01-01", 4905),
+			make_assignment("EMP-2", "1", "2025-09-01", 4905),
+			make_assignment("EMP-3", "1", "2025-01-01", 5000),
+			make_assignment("EMP-4", "1", "2025-01-01", 5828),
+			make_assignment("EMP-5", "9", "2025-01-01", 5828),
+		]
+		rows = {row.employee: row for row in compute_increments(assignments, COMPILED_MATRIX, "2026-01-01")}
+
+		self.assertEqual(rows["EMP-1"].status, "Due")
+		self.assertEqual((rows["EMP-1"].new_scale, rows["EMP-1"].new_amount), (2, 5346.0))
+		self.assertEqual(rows["EMP-2"].status, "Not Due")
+		self.assertEqual(rows["EMP-3"].status, "Off Matrix")
+		self.assertEqual(rows["EMP-4"].status, "At Top Of Scale")
+		self.assertEqual(rows["EMP-5"].status, "Grade Not On Matrix")
+
+	def test_reverse_placement(self):
+		self.assertEqual(place_salary(COMPILED_MATRIX, 5346, "1")["status"], "Exact")
+
+		placement = place_salary(COMPILED_MATRIX, 5400, "1")
+		self.assertEqual(
+			(placement["scale"], placement["delta"], placement["status"]), (2, 54.0, "Between Steps")
+		)
+
+		self.assertEqual(place_salary(COMPILED_MATRIX, 7000, "1")["status"], "Above Matrix")
+		self.assertEqual(place_salary(COMPILED_MATRIX, 4000, "1")["status"], "Below Matrix")
+
+		# without a known grade every grade is searched
+		placement = place_salary(COMPILED_MATRIX, 6200)
+		self.assertEqual((placement["grade"], placement["scale"], placement["delta"]), ("2", 2, -2.0))
+
+	def test_matrix_designations(self):
+		index = {
+			"Engineer": [{"pay_matrix": "Project"}, {"pay_matrix": "Head Office"}],
+			"Accountant": [{"pay_matrix": "Head Office"}],
+			"Foreman": [{"pay_matrix": "Project"}],
+		}
+		self.assertEqual(get_matrix_designations("Project", index), ["Engineer", "Foreman"])
+		self.assertEqual(get_matrix_designations("Head Office", index), ["Accountant", "Engineer"])
+		self.assertEqual(get_matrix_designations("Other", index), [])
@@ -30,5 +30,27 @@ frappe.query_reports["Annual Statement"] = {
 			default: "Submitted",
 		},
 	],
+
+	onload: function (report) {
+		const bulk_print = (kind) => {
+			frappe.call({
+				method: "ethiopian_payroll.ethiopian_payroll.api.bulk_print.enqueue_bulk_print",
+				args: {
+					kind: kind,
+					filters: report.get_values(),
+					output: "zip",
+				},
+				callback: function () {
+					frappe.show_alert({
+						message: __("Printing {0} in the background", [__(kind)]),
+						indicator: "blue",
+					});
+				},
+			});
+		};
+
+		report.page.add_inner_button(__("Statements"), () => bulk_print("Annual Statement"), __("Bulk PDF"));
+		report.page.add_inner_button(__("Salary Slips"), () => bulk_print("Salary Slip"), __("Bulk PDF"));
+	},
 };
 
@@ -3,11 +3,37 @@ from frappe import _
 from frappe.utils import flt, getdate, formatdate
 from datetime import datetime, timedelta
 import calendar
+import heapq
+from itertools import groupby
+
+from ethiopian_payroll.ethiopian_payroll.api.income_tax import compute_tax, get_savings_limit, get_tax_table
+from ethiopian_payroll.ethiopian_payroll.api.snapshot import (
+	get_snapshot_component_names,
+	get_snapshots,
+	iter_employee_snapshot_slips,
+)
+from ethiopian_payroll.ethiopian_payroll.report.profiler import profile_report, set_phase
+from ethiopian_payroll.ethiopian_payroll.report.utils import (
+	enqueue_prepared_report,
+	get_execution_mode,
+	get_salary_slip_query,
+	iter_batches,
+)
+from ethiopian_payroll.ethiopian_payroll.report.sharding import run_sharded
 
 salary_slip = frappe.qb.DocType("Salary Slip")
 salary_detail = frappe.qb.DocType("Salary Detail")
 
+SALARY_SLIP_FIELDS = (
+	"name",
+	"employee",
+	"employee_name",
+	"start_date",
+	"current_month_income_tax",
+)
 
+
+@profile_report("Annual Statement")
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -30,35 +56,123 @@ def execute(filters=None):
 	# Get all months from April to March
 	months = get_financial_year_months(from_date, to_date)
 	
+	set_phase("fetch")
+	# a fiscal year whose payroll periods are all closed is read from their snapshots
+	snapshots = get_snapshots(company, from_date, to_date, filters)
+	if snapshots:
+		mode = "snapshot"
+	else:
+		query = get_salary_slip_query(filters, from_date, to_date)
+		mode = get_execution_mode(query)
+	if mode == "background":
+		return [], [], enqueue_prepared_report("Annual Statement", filters)
+
 	# Store months in filters for HTML template
 	filters["_months"] = months
 
-	salary_slips = get_salary_slips(filters, from_date, to_date)
-	if not salary_slips:
-		return [], []
+	set_phase("pivot")
+	# Get actual component names from salary slips
+	if mode == "snapshot":
+		component_names = get_snapshot_component_names(snapshots)
+	else:
+		component_names = get_component_names(query)
+	actual_components = get_actual_component_names(*component_names)
 
-	# Get salary slip details for earnings and deductions
-	ss_earning_map = get_salary_slip_details(salary_slips, "earnings")
-	ss_ded_map = get_salary_slip_details(salary_slips, "deductions")
+	set_phase("row_build")
+	columns = get_columns(months)
+	tax_table = get_tax_table(to_date, company)
+	if mode == "sharded":
+		shards = run_sharded(
+			"ethiopian_payroll.ethiopian_payroll.report.annual_statement.annual_statement.get_shard_rows",
+			filters,
+			query,
+			months,
+			from_date,
+			to_date,
+			actual_components,
+			tax_table,
+		)
+		# every shard is ordered by employee, so merging keeps the unsharded order
+		data = list(heapq.merge(*shards, key=lambda row: row["employee"]))
+	else:
+		if mode == "snapshot":
+			employee_slips = iter_employee_snapshot_slips(snapshots, filters, from_date, to_date)
+		else:
+			employee_slips = iter_employee_slips(query)
+		data = list(get_employee_rows(employee_slips, months, from_date, actual_components, tax_table))
+	if not data:
+		return [], []
 
-	# Get actual component names from salary slips
-	actual_components = get_actual_component_names(salary_slips, ss_earning_map, ss_ded_map)
+	apply_income_tax(data, tax_table)
 
-	# Group salary slips by employee
-	employee_slips = {}
-	for ss in salary_slips:
-		if ss.employee not in employee_slips:
-			employee_slips[ss.employee] = []
-		employee_slips[ss.employee].append(ss)
+	return columns, data
 
-	columns = get_columns(months)
 
-	data = []
+def iter_employee_slips(query):
+	"""Yield (employee, slips) one employee at a time.
 
-	for employee, slips in employee_slips.items():
+	Slips and their Salary Details are read with one query ordered by employee and
+	streamed from the server. Each slip carries `earnings` and `deductions` component
+	maps; only the current employee's slips are held in memory.
+	"""
+	rows = (
+		query.left_join(salary_detail)
+		.on(salary_detail.parent == salary_slip.name)
+		.select(
+			*(salary_slip[f] for f in SALARY_SLIP_FIELDS),
+			salary_detail.parentfield,
+			salary_detail.salary_component,
+			salary_detail.amount,
+		)
+		.orderby(salary_slip.employee)
+		.orderby(salary_slip.start_date)
+		.orderby(salary_slip.name)
+	)
+	stream = (d for batch in iter_batches(rows) for d in batch)
+
+	for employee, employee_rows in groupby(stream, key=lambda d: d.employee):
+		slips = {}
+		for d in employee_rows:
+			ss = slips.get(d.name)
+			if not ss:
+				ss = slips[d.name] = frappe._dict({f: d[f] for f in SALARY_SLIP_FIELDS})
+				ss.earnings = frappe._dict()
+				ss.deductions = frappe._dict()
+
+			if d.parentfield in ("earnings", "deductions"):
+				components = ss[d.parentfield]
+				components[d.salary_component] = components.get(d.salary_component, 0.0) + flt(d.amount)
+
+		yield employee, list(slips.values())
+
+
+def get_shard_rows(filters, months, from_date, to_date, actual_components, tax_table):
+	"""Statement rows of one shard of employees, run by a shard worker."""
+	query = get_salary_slip_query(filters, from_date, to_date)
+	employee_slips = iter_employee_slips(query)
+	return list(get_employee_rows(employee_slips, months, from_date, actual_components, tax_table))
+
+
+def apply_income_tax(data, tax_table):
+	"""Set the tax payable of all rows with one pass of the tax engine over their taxable incomes."""
+	taxes = compute_tax([row["taxable_income"] for row in data], tax_table)
+	for row, tax_payable in zip(data, taxes, strict=True):
+		row["tax_payable"] = tax_payable
+		# Bal to pay = tax payable - itax paid, spread over the remaining months of the FY
+		row["bal_to_pay"] = flt(tax_payable - row["itax_paid"], 2)
+		row["new_mly_dedn"] = flt(row["bal_to_pay"] / row.pop("_remaining_months"), 2)
+
+
+def get_employee_rows(employee_slips, months, from_date, actual_components, tax_table):
+	"""Yield the statement row of every (employee, slips), built from that employee's slips only.
+
+	Tax payable is left at 0 and set for all rows at once by `apply_income_tax`.
+	"""
+	savings_limit = get_savings_limit()
+	for employee, slips in employee_slips:
 		# Get employee name
 		employee_name = slips[0].employee_name if slips else ""
-		
+	
 		# Initialize monthly data
 		monthly_data = {}
 		for month_key in months.keys():
@@ -80,21 +194,9 @@ def execute(filters=None):
 			if month_key not in monthly_data:
 				continue
 
-			earnings_map = ss_earning_map.get(ss.name, {})
-			deductions_map = ss_ded_map.get(ss.name, {})
-			
-			# Debug: Check if maps are empty
-			if not earnings_map and not deductions_map:
-				frappe.log_error(
-					title="Annual Statement - Empty Maps Debug",
-					message=frappe.as_json({
-						"employee": employee,
-						"salary_slip_name": ss.name,
-						"available_keys_in_ss_ded_map": list(ss_ded_map.keys())[:10],  # First 10 keys
-						"available_keys_in_ss_earning_map": list(ss_earning_map.keys())[:10],  # First 10 keys
-					})
-				)
-
+			earnings_map = ss.earnings
+			deductions_map = ss.deductions
+		
 			# Basic - use actual component name if found
 			basic = 0.0
 			if actual_components.get("basic"):
@@ -122,16 +224,14 @@ def execute(filters=None):
 			# House Rent = House Rent + Water Charges + Garbage Maintainence + Servant Charge + Parking Charge
 			# Use exact component names from actual_components (found from database)
 			house_rent_total = 0.0
-			house_rent_breakup = {}
-			
+		
 			def add_component_total(key):
-				"""Add earnings + deductions for a component and store debug info."""
+				"""Add earnings + deductions for a component."""
 				if not key:
 					return 0.0
 				# Access maps directly - frappe._dict supports .get()
 				earn = flt(earnings_map.get(key, 0) if earnings_map else 0)
 				ded = flt(deductions_map.get(key, 0) if deductions_map else 0)
-				house_rent_breakup[key] = {"earnings": earn, "deductions": ded}
 				total = earn + ded
 				return total
 
@@ -140,51 +240,23 @@ def execute(filters=None):
 				comp_name = actual_components["house_rent"]
 				if "allowance" not in comp_name.lower():
 					house_rent_total += add_component_total(comp_name) or 0
-			
+		
 			# Water Charges
 			if actual_components.get("water"):
 				house_rent_total += add_component_total(actual_components["water"]) or 0
-			
+		
 			# Garbage Maintainence
 			if actual_components.get("garbage"):
 				house_rent_total += add_component_total(actual_components["garbage"]) or 0
-			
+		
 			# Servant Charge
 			if actual_components.get("servant"):
 				house_rent_total += add_component_total(actual_components["servant"]) or 0
-			
+		
 			# Parking Charge
 			if actual_components.get("parking"):
 				house_rent_total += add_component_total(actual_components["parking"]) or 0
 
-			# Log debug info to help diagnose mismatched components/values
-			frappe.log_error(
-				title="Annual Statement - House Rent Debug",
-				message=frappe.as_json({
-					"employee": employee,
-					"employee_name": employee_name,
-					"salary_slip": ss.name,
-					"month_key": month_key,
-					"actual_components_house": {
-						"house_rent": actual_components.get("house_rent"),
-						"water": actual_components.get("water"),
-						"garbage": actual_components.get("garbage"),
-						"servant": actual_components.get("servant"),
-						"parking": actual_components.get("parking"),
-					},
-					"house_rent_breakup": house_rent_breakup,
-					"house_rent_total": house_rent_total,
-					"earnings_map_type": str(type(earnings_map)),
-					"deductions_map_type": str(type(deductions_map)),
-					"earnings_keys": list(earnings_map.keys()) if earnings_map else [],
-					"deductions_keys": list(deductions_map.keys()) if deductions_map else [],
-					"direct_access_test": {
-						"House Rent in deductions": deductions_map.get("House Rent", "NOT_FOUND") if deductions_map else "MAP_EMPTY",
-						"Water Charges in deductions": deductions_map.get("Water Charges", "NOT_FOUND") if deductions_map else "MAP_EMPTY",
-					},
-				})
-			)
-
 			monthly_data[month_key]["house_rent"] += house_rent_total
 
 			# Grinsur = Group Insurance
@@ -228,7 +300,7 @@ def execute(filters=None):
 				if month_data["basic"] > 0:
 					source_month = month_key
 					break
-		
+	
 		# 3) Else any month with any data
 		if not source_month:
 			for month_key, month_data in monthly_data.items():
@@ -237,7 +309,7 @@ def execute(filters=None):
 					month_data["lic"] > 0 or month_data["mpf"] > 0):
 					source_month = month_key
 					break
-		
+	
 		# If we found a month with data, copy its data to ALL months
 		if source_month:
 			source_data = monthly_data[source_month]
@@ -249,7 +321,7 @@ def execute(filters=None):
 			source_data["savings_total"] = (
 				source_data["grinsur"] + source_data["lic"] + source_data["mpf"]
 			)
-			
+		
 			# Copy to ALL months (including source month to ensure consistency)
 			for month_key in monthly_data.keys():
 				monthly_data[month_key]["basic"] = source_data["basic"]
@@ -287,18 +359,18 @@ def execute(filters=None):
 			total_mpf = sum(m["mpf"] for m in monthly_data.values())
 
 		total_earnings = total_basic + total_da + total_fixall + total_ta + total_house_rent
-		
-		# Less Std Dedn = 50000 for all
-		less_std_dedn = 50000.0
-		
+	
+		# Less Std Dedn = standard exemption of the Income Tax Slab in effect
+		less_std_dedn = tax_table.standard_exemption
+	
 		# IncomeSal head = total - less std dedn
 		income_sal_head = total_earnings - less_std_dedn
 
 		# Total savings = Grinsur + LIC + MPF
 		total_savings = total_grinsur + total_lic + total_mpf
 
-		# Qualifying amount = total savings with limit of 150000
-		qualifying_amt = min(total_savings, 150000.0)
+		# Qualifying amount = total savings up to the savings limit
+		qualifying_amt = min(total_savings, savings_limit)
 
 		# Taxable income = IncomeSal head - Qualifying amount
 		taxable_income = income_sal_head - qualifying_amt
@@ -317,26 +389,19 @@ def execute(filters=None):
 		else:
 			months_passed = 12
 
-		# Tax payable = 12 * current_month_income_tax (from source month or last month with data)
-		# Get the tax from the source month (the one we found with data)
+		# Get the tax withheld in the source month (the one we found with data)
 		if source_month:
 			current_month_tax = monthly_data[source_month].get("current_month_income_tax", 0.0)
 		elif current_month_key:
 			current_month_tax = monthly_data[current_month_key].get("current_month_income_tax", 0.0)
 		else:
 			current_month_tax = 0.0
-		
-		tax_payable = flt(current_month_tax * 12, 2)
 
 		# Itax paid = months_passed (from April to current month) * current_month_income_tax
 		itax_paid = flt(months_passed * current_month_tax, 2)
 
-		# Bal to pay = tax payable - itax paid
-		bal_to_pay = flt(tax_payable - itax_paid, 2)
-
-		# New Mly Dedn = bal to pay / remaining months in FY
+		# New Mly Dedn is spread over the remaining months in FY
 		remaining_months = max(1, 12 - months_passed)
-		new_mly_dedn = flt(bal_to_pay / remaining_months, 2)
 
 		# Build row data
 		row = {
@@ -356,10 +421,11 @@ def execute(filters=None):
 			"total_savings": total_savings,
 			"qualifying_amt": qualifying_amt,
 			"taxable_income": taxable_income,
-			"tax_payable": tax_payable,
+			"tax_payable": 0.0,
 			"itax_paid": itax_paid,
-			"bal_to_pay": bal_to_pay,
-			"new_mly_dedn": new_mly_dedn,
+			"bal_to_pay": 0.0,
+			"new_mly_dedn": 0.0,
+			"_remaining_months": remaining_months,
 			"_months_data": monthly_data,  # Store monthly data for HTML template
 			"_months_keys": list(months.keys()),  # Store month keys in order
 		}
@@ -396,24 +462,32 @@ def execute(filters=None):
 					month_data.get("mpf", 0.0)
 				)
 
-		data.append(row)
+		yield row
 
-	return columns, data
 
+def get_component_names(query):
+	"""Unique earning and deduction component names used on the salary slips of the query."""
+	result = (
+		query.join(salary_detail)
+		.on(salary_detail.parent == salary_slip.name)
+		.select(salary_detail.salary_component, salary_detail.parentfield)
+		.distinct()
+	).run()
 
-def get_actual_component_names(salary_slips, ss_earning_map, ss_ded_map):
-	"""Get actual component names from salary slips by searching for keywords."""
-	actual_components = {}
-	
-	# Collect all unique component names from all salary slips
 	all_earnings = set()
 	all_deductions = set()
-	
-	for ss in salary_slips:
-		earnings_map = ss_earning_map.get(ss.name, {})
-		deductions_map = ss_ded_map.get(ss.name, {})
-		all_earnings.update(earnings_map.keys())
-		all_deductions.update(deductions_map.keys())
+	for component, parentfield in result:
+		if parentfield == "earnings":
+			all_earnings.add(component)
+		elif parentfield == "deductions":
+			all_deductions.add(component)
+
+	return all_earnings, all_deductions
+
+
+def get_actual_component_names(all_earnings, all_deductions):
+	"""Get actual component names from salary slips by searching for keywords."""
+	actual_components = {}
 	
 	# Find Basic - search for exact match first, then partial
 	for comp in all_earnings:
@@ -654,52 +728,3 @@ def get_columns(months):
 	columns.extend(summary_columns)
 
 	return columns
-
-
-def get_salary_slips(filters, from_date, to_date):
-	doc_status = {"Draft": 0, "Submitted": 1, "Cancelled": 2}
-
-	query = frappe.qb.from_(salary_slip).select(salary_slip.star)
-
-	if filters.get("docstatus"):
-		query = query.where(salary_slip.docstatus == doc_status[filters.get("docstatus")])
-	else:
-		query = query.where(salary_slip.docstatus == 1)
-
-	query = query.where(salary_slip.start_date >= from_date)
-	query = query.where(salary_slip.end_date <= to_date)
-
-	if filters.get("company"):
-		query = query.where(salary_slip.company == filters.get("company"))
-
-	if filters.get("employee"):
-		query = query.where(salary_slip.employee == filters.get("employee"))
-
-	return query.run(as_dict=1) or []
-
-
-def get_salary_slip_details(salary_slips, component_type):
-	salary_slips = [ss.name for ss in salary_slips]
-
-	result = (
-		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
-		.on(salary_slip.name == salary_detail.parent)
-		.where(
-			(salary_detail.parent.isin(salary_slips))
-			& (salary_detail.parentfield == component_type)
-		)
-		.select(
-			salary_detail.parent,
-			salary_detail.salary_component,
-			salary_detail.amount,
-		)
-	).run(as_dict=1)
-
-	ss_map = {}
-	for d in result:
-		ss_map.setdefault(d.parent, frappe._dict()).setdefault(d.salary_component, 0.0)
-		ss_map[d.parent][d.salary_component] += flt(d.amount)
-
-	return ss_map
-
@@ -2,10 +2,19 @@ import frappe
 from frappe import _
 from frappe.utils import flt
 
-salary_slip = frappe.qb.DocType("Salary Slip")
-salary_detail = frappe.qb.DocType("Salary Detail")
+from ethiopian_payroll.ethiopian_payroll.report.profiler import profile_report, set_phase
+from ethiopian_payroll.ethiopian_payroll.report.utils import get_salary_slip_query, get_salary_slips
 
+SALARY_SLIP_FIELDS = (
+	"name",
+	"employee",
+	"employee_name",
+	"rounded_total",
+	"net_pay",
+)
 
+
+@profile_report("Bank Cover Letter")
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -14,10 +23,12 @@ def execute(filters=None):
 	if not company:
 		frappe.throw(_("Company is required"))
 
-	salary_slips = get_salary_slips(filters)
+	set_phase("fetch")
+	salary_slips = get_salary_slips(get_salary_slip_query(filters), SALARY_SLIP_FIELDS)
 	if not salary_slips:
 		return [], []
 
+	set_phase("row_build")
 	columns = get_columns()
 
 	data = []
@@ -48,64 +59,3 @@ def get_columns():
 		{"label": _("Employee Name"), "fieldname": "employee_name", "fieldtype": "Data", "width": 200},
 		{"label": _("Amount"), "fieldname": "amount", "fieldtype": "Currency", "width": 120},
 	]
-
-
-def get_salary_slips(filters):
-	doc_status = {"Draft": 0, "Submitted": 1, "Cancelled": 2}
-
-	query = frappe.qb.from_(salary_slip).select(salary_slip.star)
-
-	if filters.get("docstatus"):
-		query = query.where(salary_slip.docstatus == doc_status[filters.get("docstatus")])
-	else:
-		query = query.where(salary_slip.docstatus == 1)
-
-	if filters.get("from_date"):
-		query = query.where(salary_slip.start_date >= filters.get("from_date"))
-
-	if filters.get("to_date"):
-		query = query.where(salary_slip.end_date <= filters.get("to_date"))
-
-	if filters.get("company"):
-		query = query.where(salary_slip.company == filters.get("company"))
-
-	if filters.get("employee"):
-		query = query.where(salary_slip.employee == filters.get("employee"))
-
-	if filters.get("department"):
-		query = query.where(salary_slip.department == filters["department"])
-
-	if filters.get("designation"):
-		query = query.where(salary_slip.designation == filters["designation"])
-
-	if filters.get("branch"):
-		query = query.where(salary_slip.branch == filters["branch"])
-
-	return query.run(as_dict=1) or []
-
-
-def get_salary_slip_details(salary_slips, component_type):
-	salary_slips = [ss.name for ss in salary_slips]
-
-	result = (
-		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
-		.on(salary_slip.name == salary_detail.parent)
-		.where(
-			(salary_detail.parent.isin(salary_slips))
-			& (salary_detail.parentfield == component_type)
-		)
-		.select(
-			salary_detail.parent,
-			salary_detail.salary_component,
-			salary_detail.amount,
-		)
-	).run(as_dict=1)
-
-	ss_map = {}
-	for d in result:
-		ss_map.setdefault(d.parent, frappe._dict()).setdefault(d.salary_component, 0.0)
-		ss_map[d.parent][d.salary_component] += flt(d.amount)
-
-	return ss_map
-
@@ -2,10 +2,32 @@ import frappe
 from frappe import _
 from frappe.utils import flt, getdate, nowdate
 
-salary_slip = frappe.qb.DocType("Salary Slip")
-salary_detail = frappe.qb.DocType("Salary Detail")
-
+from ethiopian_payroll.ethiopian_payroll.report.coalesce import coalesce_report
+from ethiopian_payroll.ethiopian_payroll.report.profiler import profile_report, set_phase
+from ethiopian_payroll.ethiopian_payroll.report.utils import (
+	get_salary_slip_details,
+	get_salary_slip_query,
+	get_salary_slips,
+)
 
+salary_detail = frappe.qb.DocType("Salary Detail")
+salary_component = frappe.qb.DocType("Salary Component")
+
+SALARY_SLIP_FIELDS = (
+	"name",
+	"employee",
+	"employee_name",
+	"bank_account_no",
+	"pan_number",
+	"gross_pay",
+	"total_deduction",
+	"total_loan_repayment",
+	"net_pay",
+)
+
+
+@coalesce_report("Bank Payment Sheet")
+@profile_report("Bank Payment Sheet")
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -14,16 +36,22 @@ def execute(filters=None):
 	if not company:
 		frappe.throw(_("Company is required"))
 
-	salary_slips = get_salary_slips(filters)
+	set_phase("fetch")
+	from_date = getdate(filters.get("from_date") or nowdate())
+	to_date = getdate(filters.get("to_date") or nowdate())
+	query = get_salary_slip_query(filters, from_date, to_date)
+	salary_slips = get_salary_slips(query, SALARY_SLIP_FIELDS)
 	if not salary_slips:
 		return [], []
 
 	earning_types, ded_types = get_earning_and_deduction_types(salary_slips)
 	columns = get_columns(earning_types, ded_types)
 
-	ss_earning_map = get_salary_slip_details(salary_slips, "earnings")
-	ss_ded_map = get_salary_slip_details(salary_slips, "deductions")
+	set_phase("pivot")
+	ss_earning_map = get_salary_slip_details(query, "earnings")
+	ss_ded_map = get_salary_slip_details(query, "deductions")
 
+	set_phase("row_build")
 	data = []
 	for idx, ss in enumerate(salary_slips, start=1):
 		row = {
@@ -59,9 +87,8 @@ def execute(filters=None):
 def get_earning_and_deduction_types(salary_slips):
 	salary_component_and_type = {_("Earning"): [], _("Deduction"): []}
 
-	for salary_component in get_salary_components(salary_slips):
-		component_type = get_salary_component_type(salary_component)
-		salary_component_and_type[_(component_type)].append(salary_component)
+	for component, component_type in get_salary_components(salary_slips):
+		salary_component_and_type[_(component_type)].append(component)
 
 	return sorted(salary_component_and_type[_("Earning")]), sorted(salary_component_and_type[_("Deduction")])
 
@@ -107,73 +134,12 @@ def get_columns(earning_types, ded_types):
 
 
 def get_salary_components(salary_slips):
+	"""Distinct (salary_component, type) pairs used by the slips, resolved in one query."""
 	return (
 		frappe.qb.from_(salary_detail)
+		.join(salary_component)
+		.on(salary_component.name == salary_detail.salary_component)
 		.where((salary_detail.amount != 0) & (salary_detail.parent.isin([d.name for d in salary_slips])))
-		.select(salary_detail.salary_component)
+		.select(salary_detail.salary_component, salary_component.type)
 		.distinct()
-	).run(pluck=True)
-
-
-def get_salary_component_type(salary_component):
-	return frappe.db.get_value("Salary Component", salary_component, "type", cache=True)
-
-
-def get_salary_slips(filters):
-	doc_status = {"Draft": 0, "Submitted": 1, "Cancelled": 2}
-
-	query = frappe.qb.from_(salary_slip).select(
-		salary_slip.star
-	)
-
-	if filters.get("docstatus"):
-		query = query.where(salary_slip.docstatus == doc_status[filters.get("docstatus")])
-	else:
-		query = query.where(salary_slip.docstatus == 1)
-
-	from_date = getdate(filters.get("from_date") or nowdate())
-	to_date = getdate(filters.get("to_date") or nowdate())
-
-	query = query.where(salary_slip.start_date >= from_date).where(salary_slip.end_date <= to_date)
-
-	if filters.get("company"):
-		query = query.where(salary_slip.company == filters.get("company"))
-
-	if filters.get("employee"):
-		query = query.where(salary_slip.employee == filters.get("employee"))
-
-	if filters.get("department"):
-		query = query.where(salary_slip.department == filters["department"])
-
-	if filters.get("designation"):
-		query = query.where(salary_slip.designation == filters["designation"])
-
-	if filters.get("branch"):
-		query = query.where(salary_slip.branch == filters["branch"])
-
-	return query.run(as_dict=1) or []
-
-
-def get_salary_slip_details(salary_slips, component_type):
-	salary_slips = [ss.name for ss in salary_slips]
-
-	result = (
-		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
-		.on(salary_slip.name == salary_detail.parent)
-		.where((salary_detail.parent.isin(salary_slips)) & (salary_detail.parentfield == component_type))
-		.select(
-			salary_detail.parent,
-			salary_detail.salary_component,
-			salary_detail.amount,
-		)
-	).run(as_dict=1)
-
-	ss_map = {}
-
-	for d in result:
-		ss_map.setdefault(d.parent, frappe._dict()).setdefault(d.salary_component, 0.0)
-		ss_map[d.parent][d.salary_component] += flt(d.amount)
-
-	return ss_map
-
+	).run()
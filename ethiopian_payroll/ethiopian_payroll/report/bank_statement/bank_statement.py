@@ -1,7 +1,10 @@
 import frappe
 from frappe.utils import getdate, nowdate
 
+from ethiopian_payroll.ethiopian_payroll.report.profiler import profile_report, set_phase
 
+
+@profile_report("Bank Statement")
 def execute(filters=None):
 	filters = filters or {}
 
@@ -22,6 +25,7 @@ def execute(filters=None):
 	if bank_name_filter:
 		slip_filters["bank_name"] = bank_name_filter
 
+	set_phase("fetch")
 	slips = frappe.get_all(
 		"Salary Slip",
 		fields=[
@@ -38,6 +42,7 @@ def execute(filters=None):
 		order_by="employee asc",
 	)
 
+	set_phase("row_build")
 	columns = [
 		{"label": "SL", "fieldname": "idx", "fieldtype": "Int", "width": 60},
 		{"label": "Pers No", "fieldname": "employee", "fieldtype": "Link", "options": "Employee", "width": 100},
@@ -0,0 +1,121 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Single-flight execution of identical concurrent report runs.
+
+Decorate a report's `execute` with `@coalesce_report("Report Name")`. The first run
+for a set of filters takes a short-lived lock in redis; runs with the same normalized
+filters that start while it is in progress wait for it and receive its result through
+the cache instead of repeating its queries. Only runs that overlap share a result: a
+run started after the first one finished executes again.
+
+If the running report fails or the wait exceeds the lock timeout, a waiting run
+executes the report itself.
+
+Results precomputed by the cache warmer (report/warm.py) are returned directly
+until a Salary Slip of the company is submitted or cancelled.
+
+Under `frappe.flags.in_report_explain` (report/indexes.py) the report always runs
+its own queries, so that they can be captured and explained.
+"""
+
+import functools
+import hashlib
+import time
+
+import frappe
+
+from ethiopian_payroll.ethiopian_payroll.report.warm import get_warm_key, set_warm_result
+
+LOCK_TIMEOUT = 120
+RESULT_TTL = 60
+POLL_INTERVAL = 0.2
+
+
+def get_run_key(report_name, filters):
+	"""Cache key of a report and its filters; empty filters and key order do not matter."""
+	normalized = {key: value for key, value in (filters or {}).items() if value not in (None, "", [])}
+	digest = hashlib.sha1(frappe.as_json(normalized, indent=None).encode()).hexdigest()
+	return f"ethiopian_payroll:report_run:{report_name}:{digest}"
+
+
+def get_result_key(run_key, token):
+	return f"{run_key}:{token}"
+
+
+def acquire(lock_key, token):
+	return frappe.cache.set(lock_key, token, ex=LOCK_TIMEOUT, nx=True)
+
+
+def release(lock_key, token):
+	# only the owner releases; an expired lock may already belong to another run
+	if frappe.cache.get(lock_key) == token.encode():
+		frappe.cache.delete(lock_key)
+
+
+def wait_for_result(lock_key, run_key):
+	"""Result of the run holding the lock, or None if it failed or did not finish in time."""
+	token = frappe.cache.get(lock_key)
+	if not token:
+		return None
+
+	result_key = get_result_key(run_key, token.decode())
+	deadline = time.monotonic() + LOCK_TIMEOUT
+	while time.monotonic() < deadline:
+		result = frappe.cache.get_value(result_key)
+		if result is not None:
+			return result
+		if frappe.cache.get(lock_key) != token:
+			# released: the result is either set by now or the run failed
+			return frappe.cache.get_value(result_key)
+		time.sleep(POLL_INTERVAL)
+
+	return None
+
+
+def coalesce_report(report_name):
+	"""Decorator for a script report `execute(filters)`."""
+
+	def decorator(execute):
+		@functools.wraps(execute)
+		def wrapper(filters=None):
+			if frappe.flags.in_report_explain:
+				return execute(filters)
+
+			run_key = get_run_key(report_name, filters)
+			# read before running: a slip submitted meanwhile makes this result stale
+			warm_key = get_warm_key(run_key, filters)
+			if frappe.flags.in_report_warm:
+				result = run_coalesced(execute, filters, run_key)
+				set_warm_result(warm_key, result)
+				return result
+
+			result = frappe.cache.get_value(warm_key)
+			if result is not None:
+				return result
+			return run_coalesced(execute, filters, run_key)
+
+		return wrapper
+
+	return decorator
+
+
+def run_coalesced(execute, filters, run_key):
+	"""Result of `execute`, shared with the identical runs that overlap it."""
+	lock_key = frappe.cache.make_key(f"{run_key}:lock")
+	token = frappe.generate_hash(length=12)
+
+	if not acquire(lock_key, token):
+		result = wait_for_result(lock_key, run_key)
+		if result is not None:
+			return result
+		return execute(filters)
+
+	try:
+		result = execute(filters)
+		frappe.cache.set_value(get_result_key(run_key, token), result, expires_in_sec=RESULT_TTL)
+	finally:
+		release(lock_key, token)
+
+	return result
@@ -80,5 +80,31 @@ frappe.query_reports["Consolidated Salary"] = {
 			options: "Branch",
 		},
 	],
+	onload: function (report) {
+		report.page.add_inner_button(__("Print Summary"), function () {
+			const data = frappe.query_report.data || [];
+			const meta = data.length ? data[0]._meta : null;
+			if (!meta) {
+				frappe.msgprint(__("Run the report before printing"));
+				return;
+			}
+
+			// only the handle of the cached run is sent, not the report data
+			frappe.call({
+				method: "ethiopian_payroll.ethiopian_payroll.report.consolidated_salary.consolidated_salary.get_print_format_html",
+				args: {
+					report_name: "Consolidated Salary",
+					filters: frappe.query_report.get_filter_values(),
+					result_id: meta.result_id,
+				},
+				callback: function (r) {
+					const print_window = window.open("", "_blank");
+					print_window.document.write(r.message);
+					print_window.document.close();
+					print_window.print();
+				},
+			});
+		});
+	},
 };
 
@@ -4,10 +4,23 @@ from frappe.utils import flt, getdate, formatdate
 from datetime import datetime
 import erpnext
 
+from ethiopian_payroll.ethiopian_payroll.report.profiler import profile_report, set_phase
+from ethiopian_payroll.ethiopian_payroll.report.sharding import run_sharded
+from ethiopian_payroll.ethiopian_payroll.report.utils import apply_shard, get_execution_mode, iter_batches
+
 salary_slip = frappe.qb.DocType("Salary Slip")
 salary_detail = frappe.qb.DocType("Salary Detail")
 
+PRINT_FORMAT = "Consolidated Salary Report"
+RESULT_CACHE_KEY = "ethiopian_payroll:consolidated_salary_result"
+# seconds a report result stays printable without running the report again
+RESULT_TTL = 3600
+
+# {(site, print format): (modified, compiled template, css)}
+_print_templates = {}
+
 
+@profile_report("Consolidated Salary")
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -19,13 +32,27 @@ def execute(filters=None):
 	currency = filters.get("currency")
 	company_currency = erpnext.get_company_currency(company)
 
-	salary_slips = get_salary_slips(filters)
-	if not salary_slips:
-		return [], []
+	set_phase("fetch")
+	query = get_salary_slip_query(filters)
+	mode = get_execution_mode(query)
 
+	set_phase("pivot")
 	# Aggregate earnings and deductions by component
-	earnings = aggregate_components(salary_slips, "earnings", currency, company_currency)
-	deductions = aggregate_components(salary_slips, "deductions", currency, company_currency)
+	if mode == "sharded":
+		earnings, deductions = merge_component_totals(
+			run_sharded(
+				"ethiopian_payroll.ethiopian_payroll.report.consolidated_salary.consolidated_salary.get_component_totals",
+				filters,
+				query,
+				currency,
+				company_currency,
+			)
+		)
+	else:
+		earnings = aggregate_components(query, "earnings", currency, company_currency)
+		deductions = aggregate_components(query, "deductions", currency, company_currency)
+	if not earnings and not deductions:
+		return [], []
 
 	# Sort components alphabetically
 	earnings_sorted = dict(sorted(earnings.items()))
@@ -49,6 +76,7 @@ def execute(filters=None):
 		from_date = getdate(filters["from_date"])
 		year = from_date.year
 
+	set_phase("row_build")
 	# Prepare data for table view - create rows with earnings and deductions side by side
 	earnings_list = list(earnings_sorted.items())
 	deductions_list = list(deductions_sorted.items())
@@ -80,65 +108,87 @@ def execute(filters=None):
 		"deduction_amount": net_pay,
 	})
 
-	# Store metadata for print format
-	for row in rows:
-		row["_meta"] = {
-			"company": company,
-			"month": month or "",
-			"year": year or "",
-			"currency": currency or company_currency,
-			"total_earnings": total_earnings,
-			"total_deductions": total_deductions,
-			"net_pay": net_pay,
-			"earnings": [{"name": k, "amount": v} for k, v in earnings_sorted.items()],
-			"deductions": [{"name": k, "amount": v} for k, v in deductions_sorted.items()],
-		}
+	# Print metadata goes on the first row only; the rows are cached so printing only sends back result_id
+	result_id = frappe.generate_hash(length=16)
+	rows[0]["_meta"] = {
+		"result_id": result_id,
+		"company": company,
+		"month": month or "",
+		"year": year or "",
+		"currency": currency or company_currency,
+		"total_earnings": total_earnings,
+		"total_deductions": total_deductions,
+		"net_pay": net_pay,
+		"earnings": [{"name": k, "amount": v} for k, v in earnings_sorted.items()],
+		"deductions": [{"name": k, "amount": v} for k, v in deductions_sorted.items()],
+	}
+
+	frappe.cache.set_value(f"{RESULT_CACHE_KEY}:{result_id}", rows, user=True, expires_in_sec=RESULT_TTL)
 
 	columns = get_columns()
 	return columns, rows
 
 
 @frappe.whitelist()
-def get_print_format_html(report_name, filters=None, data=None):
-	"""Server-side method to render Jinja print format for reports"""
-	from frappe.utils.jinja import render_template
-	
-	# Get the Print Format
-	print_format = frappe.get_doc("Print Format", "Consolidated Salary Report")
-	
-	if print_format.print_format_type != "Jinja":
-		frappe.throw(_("Print Format must be of type Jinja"))
-	
-	# Parse filters if string
-	if isinstance(filters, str):
-		import json
-		filters = json.loads(filters)
-	
-	# Parse data if string
-	if isinstance(data, str):
-		import json
-		data = json.loads(data)
-	
+def get_print_format_html(report_name, filters=None, data=None, result_id=None):
+	"""Server-side method to render Jinja print format for reports
+
+	Pass the `result_id` from the `_meta` of the first report row to print a cached run
+	of the current user; once it expired the report has to be run again. `data` is
+	still accepted from older clients.
+	"""
+	template, css = get_print_template()
+
+	filters = frappe.parse_json(filters) or {}
+
+	if result_id:
+		data = frappe.cache.get_value(f"{RESULT_CACHE_KEY}:{result_id}", user=True)
+		if data is None:
+			frappe.throw(_("The report result has expired. Run the report again to print it"))
+	else:
+		data = frappe.parse_json(data)
+
 	# Prepare context
 	context = {
 		"data": data or [],
-		"filters": filters or {},
+		"filters": filters,
 		"frappe": frappe,
 	}
-	
+
 	# Render the template
-	html = render_template(print_format.html, context)
-	css = print_format.css or ""
-	
+	html = template.render(context)
+
 	return f"<style>{css}</style>{html}"
 
 
-def get_salary_slips(filters):
-	query = (
-		frappe.qb.from_(salary_slip)
-		.select(salary_slip.name, salary_slip.company, salary_slip.start_date, salary_slip.end_date)
-		.where(salary_slip.docstatus == 1)
+def get_print_template():
+	"""(compiled Jinja template, css) of the print format, compiled again only when it is modified."""
+	from frappe.utils.jinja import get_jenv
+
+	print_format = frappe.db.get_value(
+		"Print Format", PRINT_FORMAT, ["modified", "print_format_type"], as_dict=1
 	)
+	if not print_format:
+		frappe.throw(_("Print Format {0} not found").format(PRINT_FORMAT))
+
+	if print_format.print_format_type != "Jinja":
+		frappe.throw(_("Print Format must be of type Jinja"))
+
+	key = (frappe.local.site, PRINT_FORMAT)
+	cached = _print_templates.get(key)
+	if not cached or cached[0] != print_format.modified:
+		html, css = frappe.db.get_value("Print Format", PRINT_FORMAT, ["html", "css"])
+		# same guard as frappe.render_template
+		if ".__" in (html or ""):
+			frappe.throw(_("Illegal template"))
+		cached = (print_format.modified, get_jenv().from_string(html or ""), css or "")
+		_print_templates[key] = cached
+
+	return cached[1], cached[2]
+
+
+def get_salary_slip_query(filters):
+	query = frappe.qb.from_(salary_slip).where(salary_slip.docstatus == 1)
 
 	if filters.get("company"):
 		query = query.where(salary_slip.company == filters["company"])
@@ -165,39 +215,57 @@ def get_salary_slips(filters):
 	if filters.get("branch"):
 		query = query.where(salary_slip.branch == filters["branch"])
 
-	return query.run(as_dict=1) or []
+	return apply_shard(query, filters)
+
+
+def get_component_totals(filters, currency, company_currency):
+	"""Earning and deduction totals of one shard of employees, run by a shard worker."""
+	query = get_salary_slip_query(filters)
+	return (
+		aggregate_components(query, "earnings", currency, company_currency),
+		aggregate_components(query, "deductions", currency, company_currency),
+	)
+
 
+def merge_component_totals(shards):
+	"""Add up the (earnings, deductions) totals of the shards, in shard order."""
+	earnings, deductions = {}, {}
+	for shard_earnings, shard_deductions in shards:
+		for component, amount in shard_earnings.items():
+			earnings[component] = earnings.get(component, 0.0) + amount
+		for component, amount in shard_deductions.items():
+			deductions[component] = deductions.get(component, 0.0) + amount
+	return earnings, deductions
 
-def aggregate_components(salary_slips, component_type, currency, company_currency):
-	"""Aggregate salary components across all salary slips"""
-	salary_slip_names = [ss.name for ss in salary_slips]
 
-	result = (
-		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
+def aggregate_components(query, component_type, currency, company_currency):
+	"""Aggregate salary components across all salary slips of the query.
+
+	Salary Details are streamed in batches and added to the totals as they arrive.
+	"""
+	details = (
+		query.join(salary_detail)
 		.on(salary_slip.name == salary_detail.parent)
-		.where(
-			(salary_detail.parent.isin(salary_slip_names))
-			& (salary_detail.parentfield == component_type)
-		)
+		.where(salary_detail.parentfield == component_type)
 		.select(
 			salary_detail.salary_component,
 			salary_detail.amount,
 			salary_slip.exchange_rate,
 		)
-	).run(as_dict=1)
+	)
 
 	component_map = {}
-	for d in result:
-		component_name = d.salary_component
-		amount = flt(d.amount)
-		
-		# Handle currency conversion
-		if currency == company_currency:
-			amount = amount * flt(d.exchange_rate if d.exchange_rate else 1)
-		
-		component_map.setdefault(component_name, 0.0)
-		component_map[component_name] += amount
+	for batch in iter_batches(details):
+		for d in batch:
+			component_name = d.salary_component
+			amount = flt(d.amount)
+
+			# Handle currency conversion
+			if currency == company_currency:
+				amount = amount * flt(d.exchange_rate if d.exchange_rate else 1)
+
+			component_map.setdefault(component_name, 0.0)
+			component_map[component_name] += amount
 
 	return component_map
 
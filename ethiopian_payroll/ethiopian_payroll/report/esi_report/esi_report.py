@@ -2,10 +2,28 @@ import frappe
 from frappe import _
 from frappe.utils import flt, getdate, formatdate
 
-salary_slip = frappe.qb.DocType("Salary Slip")
-salary_detail = frappe.qb.DocType("Salary Detail")
-
-
+from ethiopian_payroll.ethiopian_payroll.report.coalesce import coalesce_report
+from ethiopian_payroll.ethiopian_payroll.report.profiler import profile_report, set_phase
+from ethiopian_payroll.ethiopian_payroll.report.utils import (
+	get_salary_slip_details,
+	get_salary_slip_query,
+	get_salary_slips,
+)
+
+SALARY_SLIP_FIELDS = (
+	"name",
+	"employee",
+	"employee_name",
+)
+
+# Salary Components (exact names)
+BASIC_COMPONENT = "Basic Salary"
+ESI_EMPLOYEE_COMPONENT = "ESI - Employee Contribution"
+ESI_EMPLOYER_COMPONENT = "ESI-Employer Contribution"
+
+
+@coalesce_report("ESI Report")
+@profile_report("ESI Report")
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -14,19 +32,20 @@ def execute(filters=None):
 	if not company:
 		frappe.throw(_("Company is required"))
 
-	salary_slips = get_salary_slips(filters)
+	set_phase("fetch")
+	query = get_salary_slip_query(filters)
+	salary_slips = get_salary_slips(query, SALARY_SLIP_FIELDS)
 	if not salary_slips:
 		return [], []
 
-	# Fetch earnings and deductions separately
-	ss_earning_map = get_salary_slip_details(salary_slips, "earnings")
-	ss_ded_map = get_salary_slip_details(salary_slips, "deductions")
-
-	# Salary Components (exact names)
-	BASIC_COMPONENT = "Basic Salary"
-	ESI_EMPLOYEE_COMPONENT = "ESI - Employee Contribution"
-	ESI_EMPLOYER_COMPONENT = "ESI-Employer Contribution"
+	set_phase("pivot")
+	# Fetch only the ESI components, earnings and deductions separately
+	ss_earning_map = get_salary_slip_details(
+		query, "earnings", components=(BASIC_COMPONENT, ESI_EMPLOYER_COMPONENT)
+	)
+	ss_ded_map = get_salary_slip_details(query, "deductions", components=(ESI_EMPLOYEE_COMPONENT,))
 
+	set_phase("row_build")
 	columns = get_columns()
 
 	data = []
@@ -103,66 +122,3 @@ def get_columns():
 		{"label": _("Employer Contribution"), "fieldname": "esi_employer_contribution", "fieldtype": "Currency", "width": 150},
 		{"label": _("Total"), "fieldname": "total", "fieldtype": "Currency", "width": 120},
 	]
-
-
-def get_salary_slips(filters):
-	doc_status = {"Draft": 0, "Submitted": 1, "Cancelled": 2}
-
-	query = frappe.qb.from_(salary_slip).select(salary_slip.star)
-
-	if filters.get("docstatus"):
-		query = query.where(salary_slip.docstatus == doc_status[filters.get("docstatus")])
-	else:
-		query = query.where(salary_slip.docstatus == 1)
-
-	if filters.get("from_date"):
-		query = query.where(salary_slip.start_date >= filters.get("from_date"))
-
-	if filters.get("to_date"):
-		query = query.where(salary_slip.end_date <= filters.get("to_date"))
-
-	if filters.get("company"):
-		query = query.where(salary_slip.company == filters.get("company"))
-
-	if filters.get("employee"):
-		query = query.where(salary_slip.employee == filters.get("employee"))
-
-	if filters.get("department"):
-		query = query.where(salary_slip.department == filters["department"])
-
-	if filters.get("designation"):
-		query = query.where(salary_slip.designation == filters["designation"])
-
-	if filters.get("branch"):
-		query = query.where(salary_slip.branch == filters["branch"])
-
-	return query.run(as_dict=1) or []
-
-
-def get_salary_slip_details(salary_slips, component_type):
-	salary_slips = [ss.name for ss in salary_slips]
-
-	result = (
-		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
-		.on(salary_slip.name == salary_detail.parent)
-		.where(
-			(salary_detail.parent.isin(salary_slips))
-			& (salary_detail.parentfield == component_type)
-		)
-		.select(
-			salary_detail.parent,
-			salary_detail.salary_component,
-			salary_detail.amount,
-		)
-	).run(as_dict=1)
-
-	ss_map = {}
-	for d in result:
-		ss_map.setdefault(d.parent, frappe._dict()).setdefault(d.salary_component, 0.0)
-		ss_map[d.parent][d.salary_component] += flt(d.amount)
-
-	return ss_map
-
-
-
@@ -1,12 +1,29 @@
+from bisect import bisect_right
+
 import frappe
 from frappe import _
 from frappe.utils import flt, getdate, formatdate
 
-salary_slip = frappe.qb.DocType("Salary Slip")
-salary_detail = frappe.qb.DocType("Salary Detail")
+from ethiopian_payroll.ethiopian_payroll.report.profiler import profile_report, set_phase
+from ethiopian_payroll.ethiopian_payroll.report.utils import (
+	get_salary_slip_details,
+	get_salary_slip_query,
+	get_salary_slips,
+)
+
 salary_structure_assignment = frappe.qb.DocType("Salary Structure Assignment")
 
+SALARY_SLIP_FIELDS = (
+	"name",
+	"employee",
+	"employee_name",
+	"start_date",
+)
+
+GROUP_INSURANCE_COMPONENT = "Group Insurance"
+
 
+@profile_report("Group Insurance Scheme")
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -15,16 +32,23 @@ def execute(filters=None):
 	if not company:
 		frappe.throw(_("Company is required"))
 
-	salary_slips = get_salary_slips(filters)
+	set_phase("fetch")
+	query = get_salary_slip_query(filters)
+	salary_slips = get_salary_slips(query, SALARY_SLIP_FIELDS)
 	if not salary_slips:
 		return [], []
 
-	# Get salary slip details for deductions
-	ss_ded_map = get_salary_slip_details(salary_slips, "deductions")
+	set_phase("pivot")
+	# Get the Group Insurance deduction of the salary slips
+	ss_ded_map = get_salary_slip_details(query, "deductions", components=(GROUP_INSURANCE_COMPONENT,))
 
-	# Component name
-	group_insurance_component = "Group Insurance"
+	# Only employees who have Group Insurance component are listed
+	salary_slips = [
+		ss for ss in salary_slips if flt(ss_ded_map.get(ss.name, {}).get(GROUP_INSURANCE_COMPONENT)) > 0
+	]
+	policy_amounts = get_policy_amounts(salary_slips)
 
+	set_phase("row_build")
 	columns = get_columns()
 
 	data = []
@@ -33,15 +57,13 @@ def execute(filters=None):
 	idx = 0
 	for ss in salary_slips:
 		# Get Group Insurance amount from salary slip deductions
-		group_insurance_amount = 0.0
-		if group_insurance_component:
-			group_insurance_amount = flt(ss_ded_map.get(ss.name, {}).get(group_insurance_component, 0))
+		group_insurance_amount = flt(ss_ded_map.get(ss.name, {}).get(GROUP_INSURANCE_COMPONENT, 0))
 
 		# Only include employees who have Group Insurance component
 		if group_insurance_amount > 0:
 			idx += 1
 			# Get Policy amount from Salary Structure Assignment
-			policy_amount = get_policy_amount(ss.employee, ss.start_date)
+			policy_amount = get_policy_amount(policy_amounts, ss.employee, ss.start_date)
 
 			row = frappe._dict({
 				"idx": idx,
@@ -86,84 +108,43 @@ def get_columns():
 	]
 
 
-def get_salary_slips(filters):
-	doc_status = {"Draft": 0, "Submitted": 1, "Cancelled": 2}
-
-	query = frappe.qb.from_(salary_slip).select(salary_slip.star)
-
-	if filters.get("docstatus"):
-		query = query.where(salary_slip.docstatus == doc_status[filters.get("docstatus")])
-	else:
-		query = query.where(salary_slip.docstatus == 1)
-
-	if filters.get("from_date"):
-		query = query.where(salary_slip.start_date >= filters.get("from_date"))
-
-	if filters.get("to_date"):
-		query = query.where(salary_slip.end_date <= filters.get("to_date"))
-
-	if filters.get("company"):
-		query = query.where(salary_slip.company == filters.get("company"))
-
-	if filters.get("employee"):
-		query = query.where(salary_slip.employee == filters.get("employee"))
-
-	if filters.get("department"):
-		query = query.where(salary_slip.department == filters["department"])
-
-	if filters.get("designation"):
-		query = query.where(salary_slip.designation == filters["designation"])
+def get_policy_amounts(salary_slips):
+	"""{employee: ([from_date, ...], [custom_group_insurance_amount, ...])} of submitted assignments, oldest first.
 
-	if filters.get("branch"):
-		query = query.where(salary_slip.branch == filters["branch"])
+	One query for all employees of the report instead of one per slip.
+	"""
+	employees = list({ss.employee for ss in salary_slips if ss.employee})
+	if not employees or not frappe.db.has_column("Salary Structure Assignment", "custom_group_insurance_amount"):
+		return {}
 
-	return query.run(as_dict=1) or []
-
-
-def get_salary_slip_details(salary_slips, component_type):
-	salary_slips = [ss.name for ss in salary_slips]
-
-	result = (
-		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
-		.on(salary_slip.name == salary_detail.parent)
-		.where(
-			(salary_detail.parent.isin(salary_slips))
-			& (salary_detail.parentfield == component_type)
-		)
+	rows = (
+		frappe.qb.from_(salary_structure_assignment)
 		.select(
-			salary_detail.parent,
-			salary_detail.salary_component,
-			salary_detail.amount,
+			salary_structure_assignment.employee,
+			salary_structure_assignment.from_date,
+			salary_structure_assignment.custom_group_insurance_amount,
 		)
+		.where(salary_structure_assignment.employee.isin(employees))
+		.where(salary_structure_assignment.docstatus == 1)
+		.where(salary_structure_assignment.from_date <= max(getdate(ss.start_date) for ss in salary_slips))
+		.orderby(salary_structure_assignment.employee)
+		.orderby(salary_structure_assignment.from_date)
 	).run(as_dict=1)
 
-	ss_map = {}
-	for d in result:
-		ss_map.setdefault(d.parent, frappe._dict()).setdefault(d.salary_component, 0.0)
-		ss_map[d.parent][d.salary_component] += flt(d.amount)
+	policy_amounts = {}
+	for d in rows:
+		dates, amounts = policy_amounts.setdefault(d.employee, ([], []))
+		dates.append(getdate(d.from_date))
+		amounts.append(flt(d.custom_group_insurance_amount))
 
-	return ss_map
+	return policy_amounts
 
 
-def get_policy_amount(employee, on_date):
-	"""Get custom_group_insurance_amount from Salary Structure Assignment for the employee on the given date"""
-	if not employee or not on_date:
+def get_policy_amount(policy_amounts, employee, on_date):
+	"""custom_group_insurance_amount of the employee's most recent assignment on or before the given date"""
+	if not employee or not on_date or employee not in policy_amounts:
 		return 0.0
 
-	# Get the most recent Salary Structure Assignment for this employee on or before the given date
-	assignment = (
-		frappe.qb.from_(salary_structure_assignment)
-		.select(salary_structure_assignment.custom_group_insurance_amount)
-		.where(salary_structure_assignment.employee == employee)
-		.where(salary_structure_assignment.docstatus == 1)
-		.where(salary_structure_assignment.from_date <= on_date)
-		.orderby(salary_structure_assignment.from_date, order=frappe.qb.desc)
-		.limit(1)
-	).run(as_dict=1)
-
-	if assignment and assignment[0].get("custom_group_insurance_amount"):
-		return flt(assignment[0].get("custom_group_insurance_amount"))
-
-	return 0.0
-
+	dates, amounts = policy_amounts[employee]
+	idx = bisect_right(dates, getdate(on_date)) - 1
+	return amounts[idx] if idx >= 0 else 0.0
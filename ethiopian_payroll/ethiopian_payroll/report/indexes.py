@@ -0,0 +1,138 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Composite indexes for the access paths of the payroll reports.
+
+The reports filter Salary Slip by company, status and period (or by employee), read
+Salary Detail by (parent, parentfield, salary_component) and look up Salary Structure
+Assignments by (employee, docstatus, from_date). The missing indexes are created on
+install and on every migrate; `explain_reports` runs EXPLAIN on every query of every
+report and warns about full table scans (`bench explain-payroll-reports`).
+"""
+
+import frappe
+from frappe.utils import add_months, cint, get_first_day, getdate, nowdate
+
+from ethiopian_payroll.ethiopian_payroll.report.profiler import SQLCounter
+from ethiopian_payroll.ethiopian_payroll.report.utils import REPORTS, get_report_filters, get_report_module
+
+# (doctype, index name, columns)
+REPORT_INDEXES = (
+	(
+		"Salary Slip",
+		"payroll_report_company_period_index",
+		("company", "docstatus", "start_date", "end_date"),
+	),
+	(
+		"Salary Slip",
+		"payroll_report_employee_period_index",
+		("employee", "docstatus", "start_date"),
+	),
+	(
+		# amount makes it a covering index for the Salary Detail pivots
+		"Salary Detail",
+		"payroll_report_component_index",
+		("parent", "parentfield", "salary_component", "amount"),
+	),
+	(
+		"Salary Structure Assignment",
+		"payroll_report_assignment_index",
+		("employee", "docstatus", "from_date"),
+	),
+)
+
+# full scans of smaller tables are cheaper than an index lookup and are not reported
+FULL_SCAN_ROWS = 10000
+
+
+def add_report_indexes():
+	"""Create the missing report indexes."""
+	for doctype, index_name, columns in REPORT_INDEXES:
+		frappe.db.add_index(doctype, list(columns), index_name)
+
+
+def get_missing_indexes():
+	return [
+		(doctype, index_name)
+		for doctype, index_name, _columns in REPORT_INDEXES
+		if not frappe.db.has_index(f"tab{doctype}", index_name)
+	]
+
+
+def get_report_statements(report_name, filters):
+	"""Distinct SELECT statements a report runs for the given filters, as (query, values)."""
+	# bypass warm and coalesced results, which run no queries
+	frappe.flags.in_report_explain = True
+	try:
+		with SQLCounter(capture=True) as counter:
+			get_report_module(report_name).execute(frappe._dict(filters))
+	finally:
+		frappe.flags.in_report_explain = False
+
+	statements = {}
+	for query, values in counter.statements:
+		query = str(query)
+		if query.lstrip().lower().startswith("select"):
+			statements.setdefault((query, repr(values)), (query, values))
+
+	return list(statements.values())
+
+
+def get_full_scans(query, values, min_rows=FULL_SCAN_ROWS):
+	plan = frappe.db.sql(f"EXPLAIN {query}", values, as_dict=1)
+	return [row for row in plan if row.get("type") == "ALL" and cint(row.get("rows")) >= min_rows]
+
+
+def get_fiscal_year(on_date, company):
+	from erpnext.accounts.utils import FiscalYearError, get_fiscal_year
+
+	try:
+		return get_fiscal_year(on_date, company=company)[0]
+	except FiscalYearError:
+		return None
+
+
+def explain_reports(company=None, from_date=None, to_date=None, min_rows=FULL_SCAN_ROWS, reports=None):
+	"""Run every report for a company and period and EXPLAIN its queries.
+
+	Prints missing indexes and every full scan of at least `min_rows` estimated rows.
+	Returns the full scans found as a list of dicts.
+	"""
+	if frappe.db.db_type != "mariadb":
+		print("EXPLAIN diagnostics are only available on MariaDB")
+		return []
+
+	company = company or frappe.defaults.get_global_default("company")
+	to_date = getdate(to_date or nowdate())
+	from_date = getdate(from_date or get_first_day(add_months(to_date, -11)))
+	fiscal_year = get_fiscal_year(to_date, company)
+
+	for doctype, index_name in get_missing_indexes():
+		print(f"Missing index {index_name} on {doctype}, run bench migrate to create it")
+
+	full_scans = []
+	try:
+		for report_name in reports or REPORTS:
+			filters = get_report_filters(report_name, company, from_date, to_date, fiscal_year)
+			statements = get_report_statements(report_name, filters)
+
+			scans = [
+				{
+					"report": report_name,
+					"table": row.get("table"),
+					"rows": cint(row.get("rows")),
+					"query": query,
+				}
+				for query, values in statements
+				for row in get_full_scans(query, values, min_rows)
+			]
+			full_scans.extend(scans)
+
+			print(f"{report_name:<24} {len(statements):>3} queries  {len(scans)} full scans")
+			for scan in scans:
+				print(f"  WARNING full scan of {scan['table']} (~{scan['rows']} rows): {scan['query'][:200]}")
+	finally:
+		frappe.db.rollback()
+
+	return full_scans
@@ -0,0 +1,78 @@
+frappe.query_reports["Payroll Variance"] = {
+	filters: [
+		{
+			fieldname: "company",
+			label: __("Company"),
+			fieldtype: "Link",
+			options: "Company",
+			reqd: 1,
+			default: frappe.defaults.get_user_default("Company"),
+		},
+		{
+			fieldname: "from_date",
+			label: __("From Date"),
+			fieldtype: "Date",
+			reqd: 1,
+			default: frappe.datetime.month_start(),
+		},
+		{
+			fieldname: "to_date",
+			label: __("To Date"),
+			fieldtype: "Date",
+			reqd: 1,
+			default: frappe.datetime.month_end(),
+		},
+		{
+			fieldname: "previous_from_date",
+			label: __("Compare From Date"),
+			fieldtype: "Date",
+			description: __("Defaults to the month before From Date"),
+		},
+		{
+			fieldname: "previous_to_date",
+			label: __("Compare To Date"),
+			fieldtype: "Date",
+		},
+		{
+			fieldname: "department",
+			label: __("Department"),
+			fieldtype: "Link",
+			options: "Department",
+		},
+		{
+			fieldname: "designation",
+			label: __("Designation"),
+			fieldtype: "Link",
+			options: "Designation",
+		},
+		{
+			fieldname: "branch",
+			label: __("Branch"),
+			fieldtype: "Link",
+			options: "Branch",
+		},
+		{
+			fieldname: "docstatus",
+			label: __("Document Status"),
+			fieldtype: "Select",
+			options: ["Draft", "Submitted", "Cancelled"],
+			default: "Submitted",
+		},
+		{
+			fieldname: "min_change",
+			label: __("Minimum Change"),
+			fieldtype: "Currency",
+		},
+		{
+			fieldname: "min_change_percent",
+			label: __("Minimum Change %"),
+			fieldtype: "Percent",
+		},
+		{
+			fieldname: "show",
+			label: __("Show"),
+			fieldtype: "Select",
+			options: ["", "Changes", "Joiners and Leavers"],
+		},
+	],
+};
@@ -0,0 +1,217 @@
+import frappe
+from frappe import _
+from frappe.query_builder import Case
+from frappe.query_builder.functions import Abs, Coalesce, Max, Sum
+from frappe.utils import add_days, add_months, flt, getdate
+
+from ethiopian_payroll.ethiopian_payroll.report.coalesce import coalesce_report
+from ethiopian_payroll.ethiopian_payroll.report.profiler import profile_report, set_phase
+from ethiopian_payroll.ethiopian_payroll.report.utils import DOC_STATUS, get_salary_slip_query, iter_batches
+
+salary_slip = frappe.qb.DocType("Salary Slip")
+salary_detail = frappe.qb.DocType("Salary Detail")
+
+COMPONENT_TYPES = {"earnings": "Earning", "deductions": "Deduction"}
+
+# smallest change reported when no Minimum Change is set, to skip rounding noise
+MIN_CHANGE = 0.005
+
+
+@coalesce_report("Payroll Variance")
+@profile_report("Payroll Variance")
+def execute(filters=None):
+	if not filters:
+		filters = {}
+
+	if not filters.get("company"):
+		frappe.throw(_("Company is required"))
+	if not (filters.get("from_date") and filters.get("to_date")):
+		frappe.throw(_("From Date and To Date are required"))
+
+	from_date = getdate(filters.get("from_date"))
+	to_date = getdate(filters.get("to_date"))
+	# the period is compared with the month before it unless a comparison period is set
+	previous_from_date = getdate(filters.get("previous_from_date") or add_months(from_date, -1))
+	previous_to_date = getdate(filters.get("previous_to_date") or add_days(from_date, -1))
+	if previous_to_date >= from_date:
+		frappe.throw(_("The comparison period must end before From Date"))
+
+	# the Status filter selects the payroll under review; it is compared with the submitted one
+	docstatus = DOC_STATUS[filters.get("docstatus") or "Submitted"]
+	is_current = (salary_slip.start_date >= from_date) & (salary_slip.docstatus == docstatus)
+	is_previous = (salary_slip.end_date <= previous_to_date) & (salary_slip.docstatus == 1)
+	query = get_salary_slip_query(
+		{**filters, "docstatus": None}, previous_from_date, to_date, default_docstatus=None
+	).where(is_current | is_previous)
+
+	set_phase("fetch")
+	employees = get_employee_periods(query, is_current)
+	if not employees:
+		return get_columns(), []
+
+	changes = get_component_changes(query, is_current, max(flt(filters.get("min_change")), MIN_CHANGE))
+
+	set_phase("row_build")
+	min_change_percent = flt(filters.get("min_change_percent"))
+	show = filters.get("show")
+	data = []
+	for emp in employees.values():
+		if emp.current_slips and emp.previous_slips:
+			if show == "Joiners and Leavers":
+				continue
+			for d in changes.get(emp.employee, ()):
+				change_percent = flt(d.change / d.previous * 100, 2) if d.previous else None
+				if change_percent is not None and abs(change_percent) < min_change_percent:
+					continue
+				data.append(
+					{
+						**get_employee_fields(emp),
+						"status": _("Changed"),
+						"salary_component": d.salary_component,
+						"component_type": _(COMPONENT_TYPES[d.parentfield]),
+						"previous": d.previous,
+						"current": d.current,
+						"change": d.change,
+						"change_percent": change_percent,
+					}
+				)
+		elif show != "Changes":
+			# joiners and leavers are listed with their gross pay instead of every component
+			data.append(
+				{
+					**get_employee_fields(emp),
+					"status": _("New Joiner") if emp.current_slips else _("Leaver"),
+					"previous": emp.previous_gross_pay,
+					"current": emp.current_gross_pay,
+					"change": flt(emp.current_gross_pay - emp.previous_gross_pay, 2),
+				}
+			)
+
+	return get_columns(), data
+
+
+def get_employee_periods(query, is_current):
+	"""{employee: slip counts and gross pay in each period}, in employee order, from one grouped query."""
+	gross_pay = salary_slip.base_gross_pay
+	rows = (
+		query.groupby(salary_slip.employee)
+		.select(
+			salary_slip.employee,
+			Max(salary_slip.employee_name).as_("employee_name"),
+			Max(salary_slip.department).as_("department"),
+			Sum(Case().when(is_current, 1).else_(0)).as_("current_slips"),
+			Sum(Case().when(is_current, 0).else_(1)).as_("previous_slips"),
+			Sum(Case().when(is_current, gross_pay).else_(0)).as_("current_gross_pay"),
+			Sum(Case().when(is_current, 0).else_(gross_pay)).as_("previous_gross_pay"),
+		)
+		.orderby(salary_slip.employee)
+	).run(as_dict=1)
+	return {d.employee: d for d in rows}
+
+
+def get_component_changes(query, is_current, min_change):
+	"""{employee: [changed components]} of every component that differs by more than `min_change`.
+
+	Both periods are aligned by employee and component in one grouped query; only the
+	changed cells are returned by the database.
+	"""
+	amount = salary_detail.amount * Coalesce(salary_slip.exchange_rate, 1)
+	current = Sum(Case().when(is_current, amount).else_(0))
+	previous = Sum(Case().when(is_current, 0).else_(amount))
+	rows = (
+		query.join(salary_detail)
+		.on(salary_detail.parent == salary_slip.name)
+		.where(salary_detail.parentfield.isin(list(COMPONENT_TYPES)))
+		.groupby(salary_slip.employee, salary_detail.parentfield, salary_detail.salary_component)
+		.having(Abs(current - previous) > min_change)
+		.select(
+			salary_slip.employee,
+			salary_detail.parentfield,
+			salary_detail.salary_component,
+			current.as_("current"),
+			previous.as_("previous"),
+		)
+		.orderby(salary_slip.employee)
+		.orderby(salary_detail.parentfield, order=frappe.qb.desc)
+		.orderby(salary_detail.salary_component)
+	)
+
+	changes = {}
+	for batch in iter_batches(rows):
+		for d in batch:
+			d.current, d.previous = flt(d.current, 2), flt(d.previous, 2)
+			d.change = flt(d.current - d.previous, 2)
+			changes.setdefault(d.employee, []).append(d)
+	return changes
+
+
+def get_employee_fields(emp):
+	return {"employee": emp.employee, "employee_name": emp.employee_name, "department": emp.department}
+
+
+def get_columns():
+	return [
+		{
+			"label": _("Employee"),
+			"fieldname": "employee",
+			"fieldtype": "Link",
+			"options": "Employee",
+			"width": 120,
+		},
+		{
+			"label": _("Employee Name"),
+			"fieldname": "employee_name",
+			"fieldtype": "Data",
+			"width": 180,
+		},
+		{
+			"label": _("Department"),
+			"fieldname": "department",
+			"fieldtype": "Link",
+			"options": "Department",
+			"width": 140,
+		},
+		{
+			"label": _("Status"),
+			"fieldname": "status",
+			"fieldtype": "Data",
+			"width": 100,
+		},
+		{
+			"label": _("Salary Component"),
+			"fieldname": "salary_component",
+			"fieldtype": "Link",
+			"options": "Salary Component",
+			"width": 160,
+		},
+		{
+			"label": _("Type"),
+			"fieldname": "component_type",
+			"fieldtype": "Data",
+			"width": 90,
+		},
+		{
+			"label": _("Previous Period"),
+			"fieldname": "previous",
+			"fieldtype": "Currency",
+			"width": 130,
+		},
+		{
+			"label": _("Current Period"),
+			"fieldname": "current",
+			"fieldtype": "Currency",
+			"width": 130,
+		},
+		{
+			"label": _("Change"),
+			"fieldname": "change",
+			"fieldtype": "Currency",
+			"width": 120,
+		},
+		{
+			"label": _("Change %"),
+			"fieldname": "change_percent",
+			"fieldtype": "Percent",
+			"width": 90,
+		},
+	]
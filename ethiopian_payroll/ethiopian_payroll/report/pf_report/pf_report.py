@@ -1,11 +1,70 @@
+from bisect import bisect_right
+
 import frappe
 from frappe import _
-from frappe.utils import flt
-
-salary_slip = frappe.qb.DocType("Salary Slip")
-salary_detail = frappe.qb.DocType("Salary Detail")
+from frappe.utils import flt, getdate, nowdate
+
+from ethiopian_payroll.ethiopian_payroll.report.coalesce import coalesce_report
+from ethiopian_payroll.ethiopian_payroll.report.profiler import profile_report, set_phase
+from ethiopian_payroll.ethiopian_payroll.report.utils import (
+	get_salary_slip_details,
+	get_salary_slip_query,
+	get_salary_slips,
+)
+
+SALARY_SLIP_FIELDS = (
+	"name",
+	"employee",
+	"employee_name",
+	"start_date",
+	"gross_pay",
+)
+
+# (effective from, settings), oldest first; rates in %. Sites add rows through
+# "ethiopian_payroll_pf_settings": [["2026-01-01", {"wage_ceiling": 21000}], ...], each
+# applied over the settings in effect from its date on
+PF_SETTINGS = (
+	("2001-06-01", {"wage_ceiling": 6500, "employer_eps_rate": 8.33, "employer_pf_rate": 3.67}),
+	("2014-09-01", {"wage_ceiling": 15000, "employer_eps_rate": 8.33, "employer_pf_rate": 3.67}),
+)
+
+
+def is_basic(name):
+	return name.startswith("basic") and len(name) < 20
+
+
+def is_da(name):
+	# "allowence" is the spelling used by the salary components
+	return (
+		("dearness" in name and "allowence" in name)
+		or name in ("da", "d.a.")
+		or ("dearness" in name and len(name) < 20)
+	)
+
+
+# (role, parentfield, exact component names in order of preference, fallback match on the lowercase name)
+COMPONENT_ROLES = (
+	("basic", "earnings", ("Basic Salary", "Basic", "BASIC"), is_basic),
+	("da", "earnings", ("Dearness Allowences", "Dearness Allowence", "DA", "D.A.", "Dearness"), is_da),
+	("eps", "earnings", ("Employee Pension Scheme", "EPS", "Employee Pension"), None),
+	("edli", "earnings", ("EDLI", "Employee Deposit Linked Insurance"), None),
+	(
+		"pf_employee",
+		"deductions",
+		(
+			"Provident Fund - Employee Contribution",
+			"PF - Employee Contribution",
+			"PF Employee Contribution",
+			"Provident Fund Employee",
+		),
+		None,
+	),
+)
+ROLES = tuple(role for role, *_rest in COMPONENT_ROLES)
 
 
+@coalesce_report("PF Report")
+@profile_report("PF Report")
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -14,129 +73,126 @@ def execute(filters=None):
 	if not company:
 		frappe.throw(_("Company is required"))
 
-	salary_slips = get_salary_slips(filters)
+	set_phase("fetch")
+	query = get_salary_slip_query(filters)
+	salary_slips = get_salary_slips(query, SALARY_SLIP_FIELDS)
 	if not salary_slips:
 		return [], []
 
+	set_phase("pivot")
 	# Get salary slip details for earnings and deductions
-	ss_earning_map = get_salary_slip_details(salary_slips, "earnings")
-	ss_ded_map = get_salary_slip_details(salary_slips, "deductions")
+	ss_earning_map = get_salary_slip_details(query, "earnings")
+	ss_ded_map = get_salary_slip_details(query, "deductions")
+	amounts = get_role_amounts(salary_slips, ss_earning_map, ss_ded_map)
+
+	set_phase("row_build")
+	columns = get_columns(get_pf_settings(filters.get("to_date") or nowdate()))
+
+	settings = get_slip_settings(salary_slips)
+	# PF wages = Basic + DA, capped at the wage ceiling
+	pf_wages = [
+		min(flt(basic + da, 2), flt(s.wage_ceiling))
+		for basic, da, s in zip(amounts["basic"], amounts["da"], settings, strict=True)
+	]
+	employer_to_eps = [
+		flt(w * flt(s.employer_eps_rate) / 100, 2) for w, s in zip(pf_wages, settings, strict=True)
+	]
+	employer_to_pf = [
+		flt(w * flt(s.employer_pf_rate) / 100, 2) for w, s in zip(pf_wages, settings, strict=True)
+	]
+
+	data = [
+		{
+			"uan": ss.employee,
+			"name": ss.employee_name,
+			"gross_salary": flt(ss.gross_pay),
+			"pf_wages": pf_wages[i],
+			"eps_wages": amounts["eps"][i],
+			"edli_wages": amounts["edli"][i],
+			"employee_cont": amounts["pf_employee"][i],
+			"employer_to_eps": employer_to_eps[i],
+			"employer_to_pf": employer_to_pf[i],
+		}
+		for i, ss in enumerate(salary_slips)
+	]
+
+	return columns, data
+
+
+def get_pf_settings(on_date, overrides=None):
+	"""PF wage ceiling and employer rates in effect on `on_date`, with the site overrides in effect then."""
+	on_date = getdate(on_date)
+	dates = [getdate(effective_from) for effective_from, _settings in PF_SETTINGS]
+	i = max(bisect_right(dates, on_date) - 1, 0)
+	settings = frappe._dict(PF_SETTINGS[i][1])
 
-	columns = get_columns()
+	if overrides is None:
+		overrides = frappe.conf.get("ethiopian_payroll_pf_settings") or []
+	for effective_from, override in sorted(((getdate(d), s) for d, s in overrides), key=lambda o: o[0]):
+		if effective_from <= on_date:
+			settings.update(override)
+	return settings
 
-	data = []
 
+def get_slip_settings(salary_slips):
+	"""PF settings of every slip, resolved once per distinct slip start date."""
+	settings = {}
 	for ss in salary_slips:
-		# UAN (Employee ID)
-		uan = ss.employee
-		
-		# Name
-		name = ss.employee_name
-		
-		# Gross Salary
-		gross_salary = flt(ss.gross_pay)
-		
-		# Get earnings map for this salary slip
-		earnings_map = ss_earning_map.get(ss.name, {})
-		
-		# Get Basic Salary
-		basic_amount = 0.0
-		basic_components = ["Basic Salary", "Basic", "BASIC"]
-		
-		# First try exact matches
-		for comp in basic_components:
-			if comp in earnings_map:
-				basic_amount = flt(earnings_map[comp])
-				break
-		
-		# If not found, try case-insensitive match
-		if basic_amount == 0:
-			for key in earnings_map.keys():
-				key_lower = key.lower().strip()
-				if key_lower in [c.lower() for c in basic_components] or \
-				   (key_lower.startswith("basic") and len(key_lower) < 20):
-					basic_amount = flt(earnings_map[key])
-					break
-		
-		# Get Dearness Allowances (DA) - search with case-insensitive and partial matching
-		da_amount = 0.0
-		da_components = ["Dearness Allowences", "Dearness Allowence", "DA", "D.A.", "Dearness"]
-		
-		# First try exact matches
-		for comp in da_components:
-			if comp in earnings_map:
-				da_amount = flt(earnings_map[comp])
-				break
-		
-		# If not found, try case-insensitive and partial matches
-		if da_amount == 0:
-			for key in earnings_map.keys():
-				key_lower = key.lower().strip()
-				# Check for "dearness" or "allowence" (with typo) or standalone "da"
-				if ("dearness" in key_lower and "allowence" in key_lower) or \
-				   (key_lower == "da" or key_lower == "d.a.") or \
-				   ("dearness" in key_lower and len(key_lower) < 20):
-					da_amount = flt(earnings_map[key])
-					break
-		
-		# PF wages = Basic + DA (capped at 15000)
-		pf_wages = flt(basic_amount + da_amount, 2)
-		if pf_wages > 15000:
-			pf_wages = 15000.0
-		
-		# EPS wages = Employee Pension Scheme
-		eps_wages = 0.0
-		eps_components = ["Employee Pension Scheme", "EPS", "Employee Pension"]
-		for comp in eps_components:
-			if comp in ss_earning_map.get(ss.name, {}):
-				eps_wages = flt(ss_earning_map[ss.name][comp])
-				break
-		
-		# EDLI wages = EDLI
-		edli_wages = 0.0
-		edli_components = ["EDLI", "Employee Deposit Linked Insurance"]
-		for comp in edli_components:
-			if comp in ss_earning_map.get(ss.name, {}):
-				edli_wages = flt(ss_earning_map[ss.name][comp])
-				break
-		
-		# Employee cont.12% + VPF = Provident Fund - Employee Contribution
-		pf_employee_cont = 0.0
-		pf_employee_components = [
-			"Provident Fund - Employee Contribution",
-			"PF - Employee Contribution",
-			"PF Employee Contribution",
-			"Provident Fund Employee",
-		]
-		for comp in pf_employee_components:
-			if comp in ss_ded_map.get(ss.name, {}):
-				pf_employee_cont = flt(ss_ded_map[ss.name][comp])
-				break
-		
-		# Employer to EPS = 8.33% of PF wages (capped at 15000)
-		employer_to_eps = flt(pf_wages * 0.0833, 2)
-		
-		# Employer to PF = 3.67% of PF wages (capped at 15000)
-		employer_to_pf = flt(pf_wages * 0.0367, 2)
-
-		row = {
-			"uan": uan,
-			"name": name,
-			"gross_salary": gross_salary,
-			"pf_wages": pf_wages,
-			"eps_wages": eps_wages,
-			"edli_wages": edli_wages,
-			"employee_cont": pf_employee_cont,
-			"employer_to_eps": employer_to_eps,
-			"employer_to_pf": employer_to_pf,
-		}
+		if ss.start_date not in settings:
+			settings[ss.start_date] = get_pf_settings(ss.start_date)
+	return [settings[ss.start_date] for ss in salary_slips]
+
+
+def resolve_role(parentfield, component):
+	"""(role, preference) of a salary component, lower preference wins; None if it has no PF role."""
+	name = component.lower().strip()
+	for role, role_parentfield, names, match in COMPONENT_ROLES:
+		if role_parentfield != parentfield:
+			continue
+		if component in names:
+			return role, names.index(component)
+		if name in (n.lower() for n in names) or (match and match(name)):
+			return role, len(names)
+	return None
+
+
+def get_component_roles(ss_earning_map, ss_ded_map):
+	"""{(parentfield, component): (role, preference)} for every component used in the run."""
+	index = {}
+	for parentfield, ss_map in (("earnings", ss_earning_map), ("deductions", ss_ded_map)):
+		for component in {c for components in ss_map.values() for c in components}:
+			role = resolve_role(parentfield, component)
+			if role:
+				index[(parentfield, component)] = role
+	return index
+
+
+def get_role_amounts(salary_slips, ss_earning_map, ss_ded_map):
+	"""{role: [amount of every slip]}, in the order of `salary_slips`.
+
+	Every slip takes the non-zero amount of its most preferred component for a role.
+	"""
+	roles = get_component_roles(ss_earning_map, ss_ded_map)
+	amounts = {role: [] for role in ROLES}
 
-		data.append(row)
+	for ss in salary_slips:
+		found = {}
+		for parentfield, components in (
+			("earnings", ss_earning_map.get(ss.name, {})),
+			("deductions", ss_ded_map.get(ss.name, {})),
+		):
+			for component, amount in components.items():
+				role = roles.get((parentfield, component))
+				if role and flt(amount) and (role[0] not in found or role[1] < found[role[0]][0]):
+					found[role[0]] = (role[1], flt(amount))
 
-	return columns, data
+		for role in ROLES:
+			amounts[role].append(found[role][1] if role in found else 0.0)
+
+	return amounts
 
 
-def get_columns():
+def get_columns(settings):
 	return [
 		{
 			"label": _("UAN"),
@@ -182,76 +238,15 @@ def get_columns():
 			"width": 180,
 		},
 		{
-			"label": _("Employer to EPS (8.33%)"),
+			"label": _("Employer to EPS ({0}%)").format(settings.employer_eps_rate),
 			"fieldname": "employer_to_eps",
 			"fieldtype": "Currency",
 			"width": 180,
 		},
 		{
-			"label": _("Employer to PF (3.67%)"),
+			"label": _("Employer to PF ({0}%)").format(settings.employer_pf_rate),
 			"fieldname": "employer_to_pf",
 			"fieldtype": "Currency",
 			"width": 180,
 		},
 	]
-
-
-def get_salary_slips(filters):
-	doc_status = {"Draft": 0, "Submitted": 1, "Cancelled": 2}
-
-	query = frappe.qb.from_(salary_slip).select(salary_slip.star)
-
-	if filters.get("docstatus"):
-		query = query.where(salary_slip.docstatus == doc_status[filters.get("docstatus")])
-	else:
-		query = query.where(salary_slip.docstatus == 1)
-
-	if filters.get("from_date"):
-		query = query.where(salary_slip.start_date >= filters.get("from_date"))
-
-	if filters.get("to_date"):
-		query = query.where(salary_slip.end_date <= filters.get("to_date"))
-
-	if filters.get("company"):
-		query = query.where(salary_slip.company == filters.get("company"))
-
-	if filters.get("employee"):
-		query = query.where(salary_slip.employee == filters.get("employee"))
-
-	if filters.get("department"):
-		query = query.where(salary_slip.department == filters["department"])
-
-	if filters.get("designation"):
-		query = query.where(salary_slip.designation == filters["designation"])
-
-	if filters.get("branch"):
-		query = query.where(salary_slip.branch == filters["branch"])
-
-	return query.run(as_dict=1) or []
-
-
-def get_salary_slip_details(salary_slips, component_type):
-	salary_slips = [ss.name for ss in salary_slips]
-
-	result = (
-		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
-		.on(salary_slip.name == salary_detail.parent)
-		.where(
-			(salary_detail.parent.isin(salary_slips))
-			& (salary_detail.parentfield == component_type)
-		)
-		.select(
-			salary_detail.parent,
-			salary_detail.salary_component,
-			salary_detail.amount,
-		)
-	).run(as_dict=1)
-
-	ss_map = {}
-	for d in result:
-		ss_map.setdefault(d.parent, frappe._dict()).setdefault(d.salary_component, 0.0)
-		ss_map[d.parent][d.salary_component] += flt(d.amount)
-
-	return ss_map
-
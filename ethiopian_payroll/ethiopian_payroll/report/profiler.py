@@ -0,0 +1,270 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Lightweight profiling for the script reports of this app.
+
+Decorate a report's `execute` with `@profile_report("Report Name")` and mark its
+phases with `set_phase("fetch")`, `set_phase("pivot")`, `set_phase("row_build")`.
+For a profiled run every SQL statement is counted against the current phase together
+with its DB time and the rows it returned; the remaining time is Python time.
+
+Profiling is off unless sampled in through site config:
+
+	"ethiopian_payroll_report_profile_sample_rate": 0.05   # profile 5% of runs
+	"ethiopian_payroll_report_profile_in_message": 1       # also show it in the report message
+	"ethiopian_payroll_report_profile_memory": 1           # also track peak Python memory (slower)
+
+Recent profiles are kept in redis and can be read with `get_report_profiles`.
+"""
+
+import functools
+import random
+import time
+import tracemalloc
+
+import frappe
+from frappe.utils import cint, flt, now_datetime
+
+PROFILES_CACHE_KEY = "ethiopian_payroll:report_profiles"
+MAX_PROFILES = 200
+
+
+class SQLCounter:
+	"""Count the SQL statements, rows returned and DB time spent inside the block.
+
+	Every query, including query builder `.run()` and `frappe.db.get_value`, goes
+	through `frappe.db.sql`, which is swapped for a counting wrapper on enter and
+	put back on exit. `on_query(duration, rows, queries)` is called after each
+	statement and with `capture` the (query, values) of every statement are kept in
+	`statements`.
+
+	A streamed result (`as_iterator=True`) is wrapped so that its rows and the time
+	spent fetching them are counted as they are consumed; they are reported with
+	`queries=0` once the result is exhausted or closed.
+	"""
+
+	def __init__(self, on_query=None, capture=False):
+		self.on_query = on_query
+		self.capture = capture
+
+	def __enter__(self):
+		self.queries = 0
+		self.rows = 0
+		self.db_time = 0.0
+		self.statements = []
+		self._sql = frappe.db.sql
+
+		def sql(*args, **kwargs):
+			start = time.perf_counter()
+			result = self._sql(*args, **kwargs)
+			duration = time.perf_counter() - start
+			rows = len(result) if isinstance(result, list | tuple) else 0
+			self.record(duration, rows)
+			if self.capture:
+				self.statements.append(
+					(
+						args[0] if args else kwargs.get("query"),
+						args[1] if len(args) > 1 else kwargs.get("values"),
+					)
+				)
+			if kwargs.get("as_iterator") and not isinstance(result, list | tuple):
+				return self.iter_rows(result)
+			return result
+
+		frappe.db.sql = sql
+		return self
+
+	def record(self, duration, rows, queries=1):
+		self.db_time += duration
+		self.queries += queries
+		self.rows += rows
+		if self.on_query:
+			self.on_query(duration, rows, queries)
+
+	def iter_rows(self, result):
+		"""Yield the rows of a streamed result, timing every fetch but not the caller's work."""
+		rows = 0
+		fetch_time = 0.0
+		result = iter(result)
+		try:
+			while True:
+				start = time.perf_counter()
+				try:
+					row = next(result)
+				except StopIteration:
+					break
+				finally:
+					fetch_time += time.perf_counter() - start
+				rows += 1
+				yield row
+		finally:
+			self.record(fetch_time, rows, queries=0)
+
+	def __exit__(self, *exc):
+		frappe.db.sql = self._sql
+		return False
+
+
+class ReportProfile:
+	def __init__(self, report_name, filters=None):
+		self.report_name = report_name
+		self.filters = dict(filters or {})
+		self.phases = {}
+		self.current_phase = None
+		self.phase_start = None
+		self.info = {}
+		self.peak_memory = None
+		self.trace_memory = cint(frappe.conf.get("ethiopian_payroll_report_profile_memory"))
+
+	def start(self):
+		if self.trace_memory:
+			# an outer tracer (e.g. the benchmark) is left running
+			self.started_tracing = not tracemalloc.is_tracing()
+			if self.started_tracing:
+				tracemalloc.start()
+			else:
+				tracemalloc.reset_peak()
+
+		self.started = now_datetime()
+		self.start_time = time.perf_counter()
+		self.counter = SQLCounter(on_query=self.record_query)
+		self.counter.__enter__()
+		self.set_phase("setup")
+
+	def stop(self):
+		self.set_phase(None)
+		self.counter.__exit__(None, None, None)
+		self.wall_time = time.perf_counter() - self.start_time
+
+		if self.trace_memory:
+			self.peak_memory = tracemalloc.get_traced_memory()[1]
+			if self.started_tracing:
+				tracemalloc.stop()
+
+	def get_phase(self, name):
+		return self.phases.setdefault(name, {"queries": 0, "rows": 0, "db_time": 0.0, "wall_time": 0.0})
+
+	def set_phase(self, name):
+		now = time.perf_counter()
+		if self.current_phase:
+			self.get_phase(self.current_phase)["wall_time"] += now - self.phase_start
+		self.current_phase = name
+		self.phase_start = now
+
+	def record_query(self, duration, rows, queries=1):
+		phase = self.get_phase(self.current_phase or "setup")
+		phase["queries"] += queries
+		phase["rows"] += rows
+		phase["db_time"] += duration
+
+	def as_dict(self):
+		phases = {
+			name: {
+				"queries": p["queries"],
+				"rows": p["rows"],
+				"db_time": flt(p["db_time"], 4),
+				"python_time": flt(max(p["wall_time"] - p["db_time"], 0), 4),
+			}
+			for name, p in self.phases.items()
+		}
+		return {
+			"report": self.report_name,
+			"user": frappe.session.user,
+			"started": str(self.started),
+			"filters": self.filters,
+			"wall_time": flt(self.wall_time, 4),
+			"queries": self.counter.queries,
+			"rows": self.counter.rows,
+			"db_time": flt(self.counter.db_time, 4),
+			"phases": phases,
+			"peak_memory_kb": flt(self.peak_memory / 1024, 1) if self.peak_memory is not None else None,
+			**self.info,
+		}
+
+	def save(self):
+		frappe.cache.lpush(PROFILES_CACHE_KEY, frappe.as_json(self.as_dict(), indent=None))
+		frappe.cache.ltrim(PROFILES_CACHE_KEY, 0, MAX_PROFILES - 1)
+
+	def get_message(self):
+		profile = self.as_dict()
+		phases = ", ".join(
+			f"{name}: {p['queries']} queries / {p['db_time']:.3f}s db / {p['python_time']:.3f}s python"
+			for name, p in profile["phases"].items()
+		)
+		memory = f", {profile['peak_memory_kb']:.0f} KB peak" if self.peak_memory is not None else ""
+		return (
+			f"Profile: {profile['wall_time']:.3f}s, {profile['queries']} queries, "
+			f"{profile['rows']} rows{memory} ({phases})"
+		)
+
+
+def should_profile():
+	if frappe.flags.profile_reports:
+		return True
+	sample_rate = flt(frappe.conf.get("ethiopian_payroll_report_profile_sample_rate"))
+	return sample_rate > 0 and random.random() < sample_rate
+
+
+def set_phase(name):
+	"""Start a new phase of the report being profiled; a no-op when the run is not profiled."""
+	profile = getattr(frappe.local, "report_profile", None)
+	if profile:
+		profile.set_phase(name)
+
+
+def set_profile_info(**info):
+	"""Attach extra values (e.g. the estimated size) to the profile of the current run."""
+	profile = getattr(frappe.local, "report_profile", None)
+	if profile:
+		profile.info.update(info)
+
+
+def get_current_profile():
+	return getattr(frappe.local, "report_profile", None)
+
+
+def profile_report(report_name):
+	"""Decorator for a script report `execute(filters)`."""
+
+	def decorator(execute):
+		@functools.wraps(execute)
+		def wrapper(filters=None):
+			# nested runs (e.g. a report calling another) are profiled by the outer run only
+			if get_current_profile() or not should_profile():
+				return execute(filters)
+
+			profile = ReportProfile(report_name, filters)
+			frappe.local.report_profile = profile
+			profile.start()
+			try:
+				result = execute(filters)
+			finally:
+				profile.stop()
+				frappe.local.report_profile = None
+
+			profile.save()
+
+			if cint(frappe.conf.get("ethiopian_payroll_report_profile_in_message")) and result:
+				result = list(result)
+				if len(result) < 3:
+					result.append(None)
+				result[2] = "<br>".join(m for m in (result[2], profile.get_message()) if m)
+
+			return result
+
+		return wrapper
+
+	return decorator
+
+
+@frappe.whitelist()
+def get_report_profiles(report_name: str | None = None, limit: int = 50):
+	"""Most recent report profiles, newest first."""
+	frappe.only_for("System Manager")
+
+	profiles = [frappe.parse_json(p) for p in frappe.cache.lrange(PROFILES_CACHE_KEY, 0, MAX_PROFILES - 1)]
+	if report_name:
+		profiles = [p for p in profiles if p["report"] == report_name]
+
+	return profiles[: cint(limit)]
@@ -1,14 +1,52 @@
+from itertools import chain
+
 import frappe
 from frappe import _
 from frappe.utils import flt
 
 import erpnext
 
+from ethiopian_payroll.ethiopian_payroll.report.coalesce import coalesce_report
+from ethiopian_payroll.ethiopian_payroll.report.profiler import profile_report, set_phase
+from ethiopian_payroll.ethiopian_payroll.report.utils import (
+	enqueue_prepared_report,
+	get_execution_mode,
+	get_salary_slip_details,
+	get_salary_slip_query,
+	get_salary_slips,
+	get_slip_batches,
+)
+from ethiopian_payroll.ethiopian_payroll.report.sharding import run_sharded
+
 
 salary_slip = frappe.qb.DocType("Salary Slip")
 salary_detail = frappe.qb.DocType("Salary Detail")
-
-
+salary_component = frappe.qb.DocType("Salary Component")
+
+SALARY_SLIP_FIELDS = (
+	"name",
+	"employee",
+	"employee_name",
+	"designation",
+	"branch",
+	"department",
+	"company",
+	"start_date",
+	"end_date",
+	"total_working_days",
+	"leave_without_pay",
+	"absent_days",
+	"payment_days",
+	"exchange_rate",
+	"gross_pay",
+	"total_deduction",
+	"total_loan_repayment",
+	"net_pay",
+)
+
+
+@coalesce_report("Salary Summary")
+@profile_report("Salary Summary")
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -20,76 +58,123 @@ def execute(filters=None):
 	currency = filters.get("currency")
 	company_currency = erpnext.get_company_currency(company)
 
-	salary_slips = get_salary_slips(filters, company_currency)
+	set_phase("fetch")
+	query = get_report_query(filters, currency, company_currency)
+	mode = get_execution_mode(query)
+	if mode == "background":
+		return [], [], enqueue_prepared_report("Salary Summary", filters)
+
+	if mode == "sharded":
+		earning_types, ded_types = get_earning_and_deduction_types(query)
+		columns = get_columns(earning_types, ded_types)
+		shards = run_sharded(
+			"ethiopian_payroll.ethiopian_payroll.report.salary_summary.salary_summary.get_shard_rows",
+			filters,
+			query,
+			earning_types,
+			ded_types,
+			currency,
+			company_currency,
+		)
+		data = list(chain.from_iterable(shards))
+		if not data:
+			return [], []
+		return columns, data
+
+	salary_slips = get_salary_slips(query, SALARY_SLIP_FIELDS)
 	if not salary_slips:
 		return [], []
 
-	earning_types, ded_types = get_earning_and_deduction_types(salary_slips)
+	earning_types, ded_types = get_earning_and_deduction_types(query)
 	columns = get_columns(earning_types, ded_types)
+	data = get_rows(query, salary_slips, mode, earning_types, ded_types, currency, company_currency)
+
+	return columns, data
+
+
+def get_report_query(filters, currency, company_currency):
+	query = get_salary_slip_query(filters, default_docstatus=None)
+	if currency and currency != company_currency:
+		query = query.where(salary_slip.currency == currency)
+	return query
+
 
-	ss_earning_map = get_salary_slip_details(salary_slips, currency, company_currency, "earnings")
-	ss_ded_map = get_salary_slip_details(salary_slips, currency, company_currency, "deductions")
+def get_shard_rows(filters, earning_types, ded_types, currency, company_currency):
+	"""Rows of one shard of employees, run by a shard worker."""
+	query = get_report_query(filters, currency, company_currency)
+	mode = get_execution_mode(query)
+	salary_slips = get_salary_slips(query, SALARY_SLIP_FIELDS)
+	return get_rows(query, salary_slips, mode, earning_types, ded_types, currency, company_currency)
 
+
+def get_rows(query, salary_slips, mode, earning_types, ded_types, currency, company_currency):
 	doj_map = get_employee_doj_map()
 
 	data = []
-	for ss in salary_slips:
-		row = {
-			"salary_slip_id": ss.name,
-			"employee": ss.employee,
-			"employee_name": ss.employee_name,
-			"designation": ss.designation,
-			"total_working_days": ss.get("total_working_days") or 0,
-			"date_of_joining": doj_map.get(ss.employee),
-			"branch": ss.branch,
-			"department": ss.department,
-			"company": ss.company,
-			"start_date": ss.start_date,
-			"end_date": ss.end_date,
-			"leave_without_pay": ss.leave_without_pay,
-			"absent_days": ss.absent_days,
-			"payment_days": ss.payment_days,
-			"currency": currency or company_currency,
-			"total_loan_repayment": ss.total_loan_repayment,
-		}
+	for batch in get_slip_batches(salary_slips, mode):
+		set_phase("pivot")
+		batch_query = (
+			query if mode == "direct" else query.where(salary_slip.name.isin([ss.name for ss in batch]))
+		)
+		convert = currency == company_currency
+		ss_earning_map = get_salary_slip_details(batch_query, "earnings", exchange_rate=convert)
+		ss_ded_map = get_salary_slip_details(batch_query, "deductions", exchange_rate=convert)
+
+		set_phase("row_build")
+		for ss in batch:
+			row = {
+				"salary_slip_id": ss.name,
+				"employee": ss.employee,
+				"employee_name": ss.employee_name,
+				"designation": ss.designation,
+				"total_working_days": ss.get("total_working_days") or 0,
+				"date_of_joining": doj_map.get(ss.employee),
+				"branch": ss.branch,
+				"department": ss.department,
+				"company": ss.company,
+				"start_date": ss.start_date,
+				"end_date": ss.end_date,
+				"leave_without_pay": ss.leave_without_pay,
+				"absent_days": ss.absent_days,
+				"payment_days": ss.payment_days,
+				"currency": currency or company_currency,
+				"total_loan_repayment": ss.total_loan_repayment,
+			}
 
-		update_column_width(ss, columns)
-
-		for e in earning_types:
-			row.update({frappe.scrub(e): ss_earning_map.get(ss.name, {}).get(e)})
-
-		for d in ded_types:
-			row.update({frappe.scrub(d): ss_ded_map.get(ss.name, {}).get(d)})
-
-		if currency == company_currency:
-			row.update(
-				{
-					"gross_pay": flt(ss.gross_pay) * flt(ss.exchange_rate),
-					"total_deduction": (flt(ss.total_deduction) + flt(ss.total_loan_repayment))
-					* flt(ss.exchange_rate),
-					"net_pay": flt(ss.net_pay) * flt(ss.exchange_rate),
-				}
-			)
-		else:
-			row.update(
-				{
-					"gross_pay": ss.gross_pay,
-					"total_deduction": flt(ss.total_deduction) + flt(ss.total_loan_repayment),
-					"net_pay": ss.net_pay,
-				}
-			)
-
-		data.append(row)
+			for e in earning_types:
+				row.update({frappe.scrub(e): ss_earning_map.get(ss.name, {}).get(e)})
 
-	return columns, data
+			for d in ded_types:
+				row.update({frappe.scrub(d): ss_ded_map.get(ss.name, {}).get(d)})
 
+			if currency == company_currency:
+				row.update(
+					{
+						"gross_pay": flt(ss.gross_pay) * flt(ss.exchange_rate),
+						"total_deduction": (flt(ss.total_deduction) + flt(ss.total_loan_repayment))
+						* flt(ss.exchange_rate),
+						"net_pay": flt(ss.net_pay) * flt(ss.exchange_rate),
+					}
+				)
+			else:
+				row.update(
+					{
+						"gross_pay": ss.gross_pay,
+						"total_deduction": flt(ss.total_deduction) + flt(ss.total_loan_repayment),
+						"net_pay": ss.net_pay,
+					}
+				)
 
-def get_earning_and_deduction_types(salary_slips):
-	salary_component_and_type = {_("Earning"): [], _("Deduction"): []}
+			data.append(row)
 
-	for salary_component in get_salary_components(salary_slips):
-		component_type = get_salary_component_type(salary_component)
-		salary_component_and_type[_(component_type)].append(salary_component)
+	return data
+
+
+def get_earning_and_deduction_types(query):
+	salary_component_and_type = {_("Earning"): set(), _("Deduction"): set()}
+
+	for component, component_type in get_salary_components(query):
+		salary_component_and_type[_(component_type)].add(component)
 
 	return sorted(salary_component_and_type[_("Earning")]), sorted(salary_component_and_type[_("Deduction")])
 
@@ -242,52 +327,17 @@ def get_columns(earning_types, ded_types):
 	return columns
 
 
-def get_salary_components(salary_slips):
+def get_salary_components(query):
+	"""Distinct (salary_component, type) pairs used by the slips of the query, resolved in one query."""
 	return (
-		frappe.qb.from_(salary_detail)
-		.where((salary_detail.amount != 0) & (salary_detail.parent.isin([d.name for d in salary_slips])))
-		.select(salary_detail.salary_component)
+		query.join(salary_detail)
+		.on(salary_detail.parent == salary_slip.name)
+		.join(salary_component)
+		.on(salary_component.name == salary_detail.salary_component)
+		.where(salary_detail.amount != 0)
+		.select(salary_detail.salary_component, salary_component.type)
 		.distinct()
-	).run(pluck=True)
-
-
-def get_salary_component_type(salary_component):
-	return frappe.db.get_value("Salary Component", salary_component, "type", cache=True)
-
-
-def get_salary_slips(filters, company_currency):
-	doc_status = {"Draft": 0, "Submitted": 1, "Cancelled": 2}
-
-	query = frappe.qb.from_(salary_slip).select(salary_slip.star)
-
-	if filters.get("docstatus"):
-		query = query.where(salary_slip.docstatus == doc_status[filters.get("docstatus")])
-
-	if filters.get("from_date"):
-		query = query.where(salary_slip.start_date >= filters.get("from_date"))
-
-	if filters.get("to_date"):
-		query = query.where(salary_slip.end_date <= filters.get("to_date"))
-
-	if filters.get("company"):
-		query = query.where(salary_slip.company == filters.get("company"))
-
-	if filters.get("employee"):
-		query = query.where(salary_slip.employee == filters.get("employee"))
-
-	if filters.get("currency") and filters.get("currency") != company_currency:
-		query = query.where(salary_slip.currency == filters.get("currency"))
-
-	if filters.get("department"):
-		query = query.where(salary_slip.department == filters["department"])
-
-	if filters.get("designation"):
-		query = query.where(salary_slip.designation == filters["designation"])
-
-	if filters.get("branch"):
-		query = query.where(salary_slip.branch == filters["branch"])
-
-	return query.run(as_dict=1) or []
+	).run()
 
 
 def get_employee_doj_map():
@@ -296,34 +346,3 @@ def get_employee_doj_map():
 	result = (frappe.qb.from_(employee).select(employee.name, employee.date_of_joining)).run()
 
 	return frappe._dict(result)
-
-
-def get_salary_slip_details(salary_slips, currency, company_currency, component_type):
-	salary_slips = [ss.name for ss in salary_slips]
-
-	result = (
-		frappe.qb.from_(salary_slip)
-		.join(salary_detail)
-		.on(salary_slip.name == salary_detail.parent)
-		.where((salary_detail.parent.isin(salary_slips)) & (salary_detail.parentfield == component_type))
-		.select(
-			salary_detail.parent,
-			salary_detail.salary_component,
-			salary_detail.amount,
-			salary_slip.exchange_rate,
-		)
-	).run(as_dict=1)
-
-	ss_map = {}
-
-	for d in result:
-		ss_map.setdefault(d.parent, frappe._dict()).setdefault(d.salary_component, 0.0)
-		if currency == company_currency:
-			ss_map[d.parent][d.salary_component] += flt(d.amount) * flt(
-				d.exchange_rate if d.exchange_rate else 1
-			)
-		else:
-			ss_map[d.parent][d.salary_component] += flt(d.amount)
-
-	return ss_map
-
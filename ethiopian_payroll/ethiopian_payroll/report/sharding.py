@@ -0,0 +1,88 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Sharded execution of the heaviest reports.
+
+Annual Statement, Salary Summary and Consolidated Salary run in "sharded" mode (see
+report.utils) when they are large, run outside a web request (Prepared Reports,
+background jobs, console) and shard workers are configured:
+
+	"ethiopian_payroll_report_shard_workers": 8
+	"ethiopian_payroll_report_shard_field": "department"   # or "branch"
+
+The employees of the report are split by their department or branch. Every shard is
+fetched and pivoted by a worker process with its own DB connection, and the partial
+results are returned in shard order so the report can merge them deterministically.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+from ethiopian_payroll.ethiopian_payroll.report.profiler import set_profile_info
+
+salary_slip = frappe.qb.DocType("Salary Slip")
+employee = frappe.qb.DocType("Employee")
+
+SHARD_FIELDS = ("department", "branch")
+
+
+def get_shard_field():
+	field = frappe.conf.get("ethiopian_payroll_report_shard_field") or "department"
+	if field not in SHARD_FIELDS:
+		frappe.throw(_("Report shard field must be one of {0}").format(", ".join(SHARD_FIELDS)))
+	return field
+
+
+def get_shards(query, field):
+	"""Distinct Employee `field` values of the employees of a filtered Salary Slip query, in a stable order."""
+	values = (
+		query.join(employee).on(employee.name == salary_slip.employee).select(employee[field]).distinct()
+	).run(pluck=True)
+	return sorted(values, key=lambda value: (value is not None, value or ""))
+
+
+def run_sharded(method, filters, query, *args):
+	"""Run `method(filters, *args)` for every shard of the query and return the results in shard order.
+
+	`method` is the dotted path of a module level function; it receives the report
+	filters with the shard added and must build its Salary Slip query with
+	`get_salary_slip_query` (or `apply_shard`) so that it only reads its shard.
+	"""
+	field = get_shard_field()
+	shard_filters = [{**filters, "_shard": (field, value)} for value in get_shards(query, field)]
+	workers = min(cint(frappe.conf.get("ethiopian_payroll_report_shard_workers")), len(shard_filters))
+	set_profile_info(shard_field=field, shards=len(shard_filters), shard_workers=workers)
+
+	if workers < 2:
+		frappe.flags.in_report_shard = True
+		try:
+			return [run_shard(method, f, args) for f in shard_filters]
+		finally:
+			frappe.flags.in_report_shard = False
+
+	# spawn, not fork: a forked worker would share the parent's DB connection
+	with ProcessPoolExecutor(
+		max_workers=workers,
+		mp_context=multiprocessing.get_context("spawn"),
+		initializer=init_worker,
+		initargs=(frappe.local.site, frappe.local.sites_path, frappe.session.user),
+	) as pool:
+		return list(
+			pool.map(run_shard, [method] * len(shard_filters), shard_filters, [args] * len(shard_filters))
+		)
+
+
+def init_worker(site, sites_path, user):
+	frappe.init(site=site, sites_path=sites_path)
+	frappe.connect()
+	frappe.set_user(user)
+	frappe.flags.in_report_shard = True
+
+
+def run_shard(method, filters, args):
+	return frappe.get_attr(method)(frappe._dict(filters), *args)
@@ -0,0 +1,131 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Earnings and deductions breakdown of many Salary Slips, for production support.
+
+`iter_slip_breakdowns` reads the slips matching the report filters (company,
+employee, period, status) or a list of slip names together with their Salary
+Details in one streamed query, optionally only the components matching
+shell-style patterns such as "*rent*". `bench inspect-salary-slips` writes the
+breakdowns as JSON or as CSV with one row per component.
+"""
+
+import csv
+import json
+from datetime import date
+from itertools import groupby
+
+import frappe
+from frappe.utils import flt
+
+from ethiopian_payroll.ethiopian_payroll.report.utils import get_salary_slip_query, iter_batches
+
+SLIP_FIELDS = (
+	"name",
+	"employee",
+	"employee_name",
+	"company",
+	"start_date",
+	"end_date",
+	"docstatus",
+	"gross_pay",
+	"total_deduction",
+	"net_pay",
+)
+CSV_FIELDS = (
+	"salary_slip",
+	"employee",
+	"employee_name",
+	"start_date",
+	"end_date",
+	"parentfield",
+	"salary_component",
+	"abbr",
+	"amount",
+)
+
+salary_slip = frappe.qb.DocType("Salary Slip")
+salary_detail = frappe.qb.DocType("Salary Detail")
+
+
+def get_like_pattern(pattern):
+	"""SQL LIKE pattern of a shell-style pattern; a pattern without wildcards matches anywhere."""
+	pattern = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+	if "*" not in pattern and "?" not in pattern:
+		return f"%{pattern}%"
+	return pattern.replace("*", "%").replace("?", "_")
+
+
+def iter_slip_breakdowns(filters, slips=None, components=None):
+	"""Yield every matching slip with its `earnings` and `deductions` lists, in slip order.
+
+	`filters` are the standard report filters; `slips` restricts to those slip names and
+	`components` to the Salary Details matching any of the patterns. Slips without a
+	matching component are still yielded, with empty lists.
+	"""
+	query = get_salary_slip_query(filters, default_docstatus=None)
+	if slips:
+		query = query.where(salary_slip.name.isin(list(slips)))
+
+	on = (salary_detail.parent == salary_slip.name) & (salary_detail.parenttype == "Salary Slip")
+	if components:
+		patterns = [salary_detail.salary_component.like(get_like_pattern(p)) for p in components]
+		match = patterns[0]
+		for pattern in patterns[1:]:
+			match |= pattern
+		on &= match
+
+	rows = (
+		query.left_join(salary_detail)
+		.on(on)
+		.select(
+			*(salary_slip[f] for f in SLIP_FIELDS),
+			salary_detail.parentfield,
+			salary_detail.salary_component,
+			salary_detail.abbr,
+			salary_detail.amount,
+		)
+		.orderby(salary_slip.name)
+		.orderby(salary_detail.parentfield, order=frappe.qb.desc)
+		.orderby(salary_detail.idx)
+	)
+	stream = (d for batch in iter_batches(rows) for d in batch)
+	for _name, details in groupby(stream, key=lambda d: d.name):
+		slip = None
+		for d in details:
+			if not slip:
+				slip = frappe._dict({f: d[f] for f in SLIP_FIELDS}, earnings=[], deductions=[])
+			if d.parentfield in ("earnings", "deductions"):
+				slip[d.parentfield].append(
+					{"salary_component": d.salary_component, "abbr": d.abbr, "amount": flt(d.amount)}
+				)
+		yield slip
+
+
+def write_json(breakdowns, out):
+	"""Write the breakdowns as a JSON array, one slip at a time."""
+	out.write("[")
+	for i, slip in enumerate(breakdowns):
+		out.write(",\n" if i else "\n")
+		out.write(json.dumps(slip, default=json_default))
+	out.write("\n]\n")
+
+
+def write_csv(breakdowns, out):
+	"""Write one CSV row per component of every slip; slips without one get a single empty row."""
+	writer = csv.DictWriter(out, CSV_FIELDS, extrasaction="ignore")
+	writer.writeheader()
+	for slip in breakdowns:
+		row = {"salary_slip": slip.name, **slip}
+		details = [(pf, d) for pf in ("earnings", "deductions") for d in slip[pf]]
+		if not details:
+			writer.writerow(row)
+		for parentfield, d in details:
+			writer.writerow({**row, "parentfield": parentfield, **d})
+
+
+def json_default(value):
+	if isinstance(value, date):
+		return value.isoformat()
+	return str(value)
@@ -0,0 +1,96 @@
+import frappe
+from frappe import _
+from frappe.utils import getdate, nowdate
+
+from ethiopian_payroll.ethiopian_payroll.api.statutory import get_statutory_schedule
+from ethiopian_payroll.ethiopian_payroll.report.coalesce import coalesce_report
+from ethiopian_payroll.ethiopian_payroll.report.profiler import profile_report, set_phase
+from ethiopian_payroll.ethiopian_payroll.report.utils import get_salary_slip_query
+
+# schedule: columns it adds to the employee columns
+SCHEDULE_COLUMNS = {
+	"Pension": ("basic", "pension_employee", "pension_employer", "total_pension"),
+	"Income Tax": ("gross_pay", "taxable_income", "income_tax"),
+	"Cost Sharing": ("gross_pay", "cost_sharing"),
+}
+
+
+@coalesce_report("Statutory Schedule")
+@profile_report("Statutory Schedule")
+def execute(filters=None):
+	if not filters:
+		filters = {}
+
+	company = filters.get("company")
+	if not company:
+		frappe.throw(_("Company is required"))
+
+	set_phase("fetch")
+	query = get_salary_slip_query(filters)
+	schedule = get_statutory_schedule(query, getdate(filters.get("to_date") or nowdate()), company)
+	if not schedule.slips:
+		return [], []
+
+	set_phase("row_build")
+	data = []
+	for slip in schedule.slips:
+		if filters.get("schedule") == "Cost Sharing" and not slip.cost_sharing_applicable:
+			continue
+		slip.total_pension = slip.pension_employee + slip.pension_employer
+		data.append(slip)
+
+	return get_columns(filters.get("schedule"), schedule.rates), data
+
+
+def get_columns(schedule, rates):
+	columns = {
+		"basic": {"label": _("Basic Salary"), "fieldtype": "Currency", "width": 120},
+		"gross_pay": {"label": _("Gross Pay"), "fieldtype": "Currency", "width": 120},
+		"taxable_income": {"label": _("Taxable Income"), "fieldtype": "Currency", "width": 120},
+		"pension_employee": {
+			"label": _("Employee Pension ({0}%)").format(rates.pension_employee),
+			"fieldtype": "Currency",
+			"width": 150,
+		},
+		"pension_employer": {
+			"label": _("Employer Pension ({0}%)").format(rates.pension_employer),
+			"fieldtype": "Currency",
+			"width": 150,
+		},
+		"total_pension": {"label": _("Total Pension"), "fieldtype": "Currency", "width": 120},
+		"income_tax": {"label": _("Income Tax"), "fieldtype": "Currency", "width": 120},
+		"cost_sharing": {
+			"label": _("Cost Sharing ({0}%)").format(rates.cost_sharing),
+			"fieldtype": "Currency",
+			"width": 150,
+		},
+	}
+
+	if schedule:
+		fieldnames = SCHEDULE_COLUMNS[schedule]
+	else:
+		fieldnames = list(dict.fromkeys(f for fields in SCHEDULE_COLUMNS.values() for f in fields))
+
+	return [
+		{
+			"label": _("Employee"),
+			"fieldname": "employee",
+			"fieldtype": "Link",
+			"options": "Employee",
+			"width": 120,
+		},
+		{
+			"label": _("Employee Name"),
+			"fieldname": "employee_name",
+			"fieldtype": "Data",
+			"width": 180,
+		},
+		{
+			"label": _("Salary Slip"),
+			"fieldname": "salary_slip",
+			"fieldtype": "Link",
+			"options": "Salary Slip",
+			"width": 150,
+		},
+		*({"fieldname": fieldname, **columns[fieldname]} for fieldname in fieldnames),
+	]
@@ -0,0 +1,261 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Helpers shared by the script reports of this app.
+
+Every report builds its Salary Slip query with `get_salary_slip_query` and fetches
+only the fields it declares (its SALARY_SLIP_FIELDS) with `get_salary_slips`. Salary
+Details of the same query are read with `get_salary_slip_details`, which streams them
+from a server-side cursor and sums them per slip as they arrive.
+
+Large reports estimate their size with a COUNT over the same filtered Salary Slip
+query before fetching anything. Depending on the estimate a run is executed:
+
+	direct      everything in one batch (the common case)
+	chunked     Salary Details fetched and aggregated per batch of slips, so only
+	            one batch of details is in memory at a time
+	sharded     outside web requests, when shard workers are configured: the slips
+	            are split by department or branch and processed in parallel worker
+	            processes (see report.sharding)
+	background  too large for a web request; a Prepared Report is queued instead
+
+The limits can be tuned per site:
+
+	"ethiopian_payroll_report_chunk_threshold": 20000
+	"ethiopian_payroll_report_background_threshold": 150000
+	"ethiopian_payroll_report_chunk_size": 5000
+	"ethiopian_payroll_report_shard_workers": 0
+"""
+
+import importlib
+from itertools import islice
+
+import frappe
+from frappe import _
+from frappe.query_builder.functions import Count, Sum
+from frappe.utils import cint, flt, get_link_to_form
+
+from ethiopian_payroll.ethiopian_payroll.report.profiler import set_profile_info
+
+salary_slip = frappe.qb.DocType("Salary Slip")
+salary_detail = frappe.qb.DocType("Salary Detail")
+employee = frappe.qb.DocType("Employee")
+
+DOC_STATUS = {"Draft": 0, "Submitted": 1, "Cancelled": 2}
+
+# report name: module name of every script report of the app
+REPORTS = {
+	"Annual Statement": "annual_statement",
+	"Bank Cover Letter": "bank_cover_letter",
+	"Bank Payment Sheet": "bank_payment_sheet",
+	"Bank Statement": "bank_statement",
+	"Consolidated Salary": "consolidated_salary",
+	"Deduction Summary": "deduction_summary",
+	"ESI Report": "esi_report",
+	"Group Insurance Scheme": "group_insurance_scheme",
+	"Payroll Variance": "payroll_variance",
+	"PF Report": "pf_report",
+	"Salary Summary": "salary_summary",
+	"Statutory Schedule": "statutory_schedule",
+}
+
+CHUNK_THRESHOLD = 20000
+BACKGROUND_THRESHOLD = 150000
+CHUNK_SIZE = 5000
+DETAIL_BATCH_SIZE = 10000
+
+
+def get_report_module(report_name):
+	module_name = REPORTS[report_name]
+	return importlib.import_module(f"ethiopian_payroll.ethiopian_payroll.report.{module_name}.{module_name}")
+
+
+def get_report_filters(report_name, company, from_date, to_date, fiscal_year=None):
+	"""Filters that run `report_name` for all submitted slips of a company in a period."""
+	filters = frappe._dict(
+		{
+			"company": company,
+			"from_date": from_date,
+			"to_date": to_date,
+			"docstatus": "Submitted",
+		}
+	)
+	if report_name == "Annual Statement":
+		filters.fiscal_year = fiscal_year
+	if report_name == "Salary Summary":
+		filters.currency = frappe.get_cached_value("Company", company, "default_currency")
+	return filters
+
+
+def get_salary_slip_query(filters, from_date=None, to_date=None, default_docstatus=1):
+	"""Salary Slip query with the standard report filters applied and nothing selected yet.
+
+	`from_date` and `to_date` override the filter values, `default_docstatus` applies
+	when no Status filter is set (None for all statuses).
+	"""
+	query = frappe.qb.from_(salary_slip)
+
+	if filters.get("docstatus"):
+		query = query.where(salary_slip.docstatus == DOC_STATUS[filters.get("docstatus")])
+	elif default_docstatus is not None:
+		query = query.where(salary_slip.docstatus == default_docstatus)
+
+	from_date = from_date or filters.get("from_date")
+	to_date = to_date or filters.get("to_date")
+	if from_date:
+		query = query.where(salary_slip.start_date >= from_date)
+	if to_date:
+		query = query.where(salary_slip.end_date <= to_date)
+
+	for fieldname in ("company", "employee", "department", "designation", "branch"):
+		if filters.get(fieldname):
+			query = query.where(salary_slip[fieldname] == filters.get(fieldname))
+
+	return apply_shard(query, filters)
+
+
+def apply_shard(query, filters):
+	"""Restrict a Salary Slip query to the employees of the shard in `filters._shard`, if any.
+
+	A shard is a (field, value) pair of the Employee, e.g. ("department", "Finance").
+	Shards are taken from the Employee rather than the slip so that an employee who
+	moved during the period is in exactly one shard.
+	"""
+	if not filters.get("_shard"):
+		return query
+
+	field, value = filters.get("_shard")
+	condition = employee[field].isnull() if value is None else employee[field] == value
+	return query.where(
+		salary_slip.employee.isin(frappe.qb.from_(employee).select(employee.name).where(condition))
+	)
+
+
+def get_salary_slips(query, fields):
+	"""Fetch only `fields` of the slips matched by a filtered Salary Slip query.
+
+	Fields that do not exist on this site (optional custom fields) are not selected
+	and read as None from the returned dicts.
+	"""
+	columns = set(frappe.db.get_table_columns("Salary Slip"))
+	return query.select(*(salary_slip[f] for f in fields if f in columns)).run(as_dict=1) or []
+
+
+def iter_batches(query, batch_size=DETAIL_BATCH_SIZE):
+	"""Yield the rows of a query in lists of `batch_size`, read from an unbuffered cursor.
+
+	The result set is streamed from the server instead of being loaded at once. No
+	other query may run on the connection until the generator is exhausted.
+	"""
+	with frappe.db.unbuffered_cursor():
+		rows = query.run(as_dict=1, as_iterator=True)
+		while batch := list(islice(rows, batch_size)):
+			yield batch
+
+
+def get_salary_slip_details(query, parentfield, exchange_rate=False, components=None):
+	"""{salary slip: {component: amount}} of the slips matched by a filtered Salary Slip query.
+
+	With `exchange_rate` the amounts are converted with the exchange rate of their slip.
+	With `components` only the Salary Details of those salary components are read,
+	summed per slip and component in SQL.
+	"""
+	query = (
+		query.join(salary_detail)
+		.on(salary_detail.parent == salary_slip.name)
+		.where(salary_detail.parentfield == parentfield)
+	)
+	if components:
+		query = (
+			query.where(salary_detail.salary_component.isin(list(components)))
+			.groupby(salary_detail.parent, salary_detail.salary_component, salary_slip.exchange_rate)
+			.select(
+				salary_detail.parent,
+				salary_detail.salary_component,
+				Sum(salary_detail.amount).as_("amount"),
+				salary_slip.exchange_rate,
+			)
+		)
+	else:
+		query = query.select(
+			salary_detail.parent,
+			salary_detail.salary_component,
+			salary_detail.amount,
+			salary_slip.exchange_rate,
+		)
+
+	ss_map = {}
+	for batch in iter_batches(query):
+		for d in batch:
+			amount = flt(d.amount) * flt(d.exchange_rate or 1) if exchange_rate else flt(d.amount)
+			components = ss_map.setdefault(d.parent, frappe._dict())
+			components[d.salary_component] = components.get(d.salary_component, 0.0) + amount
+
+	return ss_map
+
+
+def get_report_limits():
+	conf = frappe.conf
+	return frappe._dict(
+		{
+			"chunk_threshold": cint(conf.get("ethiopian_payroll_report_chunk_threshold")) or CHUNK_THRESHOLD,
+			"background_threshold": cint(conf.get("ethiopian_payroll_report_background_threshold"))
+			or BACKGROUND_THRESHOLD,
+			"chunk_size": cint(conf.get("ethiopian_payroll_report_chunk_size")) or CHUNK_SIZE,
+			"shard_workers": cint(conf.get("ethiopian_payroll_report_shard_workers")),
+		}
+	)
+
+
+def count_rows(query):
+	"""Row count of a filtered query builder query without fetching the rows."""
+	return query.select(Count("*")).run()[0][0]
+
+
+def get_execution_mode(query):
+	"""direct, chunked, sharded or background for a filtered Salary Slip query (see module docstring)."""
+	slips = count_rows(query)
+	limits = get_report_limits()
+	in_request = getattr(frappe.local, "request", None)
+
+	if slips > limits.background_threshold and in_request:
+		# background jobs and console runs have no request and fall through to sharded or chunked
+		mode = "background"
+	elif (
+		slips > limits.chunk_threshold
+		and limits.shard_workers > 1
+		and not in_request
+		and not frappe.flags.in_report_shard
+	):
+		mode = "sharded"
+	elif slips > limits.chunk_threshold:
+		mode = "chunked"
+	else:
+		mode = "direct"
+
+	set_profile_info(estimated_slips=slips, mode=mode)
+	return mode
+
+
+def enqueue_prepared_report(report_name, filters):
+	"""Queue the report as a Prepared Report and return the message to show instead of the data."""
+	from frappe.core.doctype.prepared_report.prepared_report import make_prepared_report
+
+	prepared_report = make_prepared_report(report_name, filters)
+	return _(
+		"This report is too large to run interactively and is being prepared in the background. "
+		"Open {0} once it is completed."
+	).format(get_link_to_form("Prepared Report", prepared_report["name"]))
+
+
+def chunks(items, size):
+	for i in range(0, len(items), size):
+		yield items[i : i + size]
+
+
+def get_slip_batches(salary_slips, mode):
+	"""The slips in one batch, or in batches of the configured chunk size when chunked."""
+	if mode != "chunked":
+		return [salary_slips]
+	return chunks(salary_slips, get_report_limits().chunk_size)
@@ -0,0 +1,122 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Precomputed results of the standard payroll reports after a payroll run.
+
+Submitting or cancelling a Salary Slip invalidates the warm results of its company and
+marks its period as pending. Changes to the other documents the reports read (draft
+slips, Employees, Salary Structure Assignments, Income Tax Slabs) invalidate them too. Once no slip of the period has changed for
+"ethiopian_payroll_report_warm_delay" seconds (default 300), so that a payroll run
+being submitted is warmed once, the scheduler queues one background job per period
+that runs WARM_REPORTS one after another with the standard period filters. Their
+results are kept for "ethiopian_payroll_report_warm_ttl" seconds (default 12 hours) and
+returned by `coalesce_report` to the first users opening the reports.
+
+`bench warm-payroll-reports` warms a period by hand.
+"""
+
+import json
+import time
+
+import frappe
+from frappe.utils import cint
+
+from ethiopian_payroll.ethiopian_payroll.report.utils import get_report_filters, get_report_module
+
+WARM_REPORTS = (
+	"Salary Summary",
+	"Bank Payment Sheet",
+	"Deduction Summary",
+	"Statutory Schedule",
+	"PF Report",
+	"ESI Report",
+	"Payroll Variance",
+)
+WARM_TTL = 12 * 3600
+WARM_DELAY = 300
+PENDING_KEY = "ethiopian_payroll:report_warm_pending"
+
+
+def get_generation_key(company):
+	return frappe.cache.make_key(f"ethiopian_payroll:report_generation:{company}")
+
+
+def get_warm_key(run_key, filters):
+	"""Cache key of the warm result of a run, changed by every slip submitted in its company."""
+	generation = cint(frappe.cache.get(get_generation_key((filters or {}).get("company"))))
+	return f"{run_key}:warm:{generation}"
+
+
+def set_warm_result(warm_key, result):
+	ttl = cint(frappe.conf.get("ethiopian_payroll_report_warm_ttl")) or WARM_TTL
+	frappe.cache.set_value(warm_key, result, expires_in_sec=ttl)
+
+
+def on_salary_slip_change(doc, method=None):
+	"""Salary Slip doc event: drop the company's warm results and queue its period for warming."""
+	period = frappe.as_json([doc.company, doc.start_date, doc.end_date], indent=None)
+
+	def mark_changed():
+		frappe.cache.incr(get_generation_key(doc.company))
+		frappe.cache.hset(PENDING_KEY, period, time.time())
+
+	# after commit, or a warm run could still read the period without this slip
+	frappe.db.after_commit.add(mark_changed)
+
+
+def on_payroll_data_change(doc, method=None):
+	"""Doc event of the other documents the reports read: drop the warm results of their company.
+
+	A document without a company, such as a company-less Income Tax Slab, affects all companies.
+	"""
+	company = doc.get("company")
+
+	def mark_changed():
+		for name in [company] if company else frappe.get_all("Company", pluck="name"):
+			frappe.cache.incr(get_generation_key(name))
+
+	frappe.db.after_commit.add(mark_changed)
+
+
+def enqueue_pending_warms():
+	"""Scheduler event: queue the warming of every period no slip has changed in for a while."""
+	delay = cint(frappe.conf.get("ethiopian_payroll_report_warm_delay")) or WARM_DELAY
+	now = time.time()
+	for period, changed_at in (frappe.cache.hgetall(PENDING_KEY) or {}).items():
+		if now - changed_at < delay:
+			continue
+		frappe.cache.hdel(PENDING_KEY, period)
+		enqueue_warm(*json.loads(period))
+
+
+def enqueue_warm(company, from_date, to_date, reports=None):
+	frappe.enqueue(
+		"ethiopian_payroll.ethiopian_payroll.report.warm.warm_reports",
+		queue="long",
+		job_id=f"ethiopian_payroll_report_warm:{company}:{from_date}:{to_date}",
+		deduplicate=True,
+		company=company,
+		from_date=from_date,
+		to_date=to_date,
+		reports=reports,
+	)
+
+
+def warm_reports(company, from_date, to_date, reports=None):
+	"""Run the reports for a period and keep their results; returns the reports warmed."""
+	warmed = []
+	frappe.flags.in_report_warm = True
+	try:
+		for report_name in reports or WARM_REPORTS:
+			filters = get_report_filters(report_name, company, str(from_date), str(to_date))
+			try:
+				get_report_module(report_name).execute(filters)
+			except Exception:
+				frappe.log_error(f"Could not warm {report_name} for {company}")
+				continue
+			warmed.append(report_name)
+	finally:
+		frappe.flags.in_report_warm = False
+
+	return warmed
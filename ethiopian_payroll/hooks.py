@@ -88,11 +88,18 @@ app_license = "mit"
 # before_install = "ethiopian_payroll.install.before_install"
 # after_install = "ethiopian_payroll.install.after_install"
 
-# After Install hook to create pay matrices
-after_install = "ethiopian_payroll.ethiopian_payroll.api.create_matrices.after_install"
+# After Install hook to create pay matrices and the fields and indexes patched into existing sites
+after_install = [
+	"ethiopian_payroll.ethiopian_payroll.api.create_matrices.after_install",
+	"ethiopian_payroll.ethiopian_payroll.api.statutory.create_cost_sharing_field",
+	"ethiopian_payroll.ethiopian_payroll.report.indexes.add_report_indexes",
+]
 
-# After Migrate hook to ensure matrices exist after updates
-after_migrate = "ethiopian_payroll.ethiopian_payroll.api.create_matrices.after_migrate"
+# After Migrate hook to ensure matrices and report indexes exist after updates
+after_migrate = [
+	"ethiopian_payroll.ethiopian_payroll.api.create_matrices.after_migrate",
+	"ethiopian_payroll.ethiopian_payroll.report.indexes.add_report_indexes",
+]
 
 
 # Uninstallation
@@ -147,6 +154,66 @@ after_migrate = "ethiopian_payroll.ethiopian_payroll.api.create_matrices.after_m
 # 	}
 # }
 
+doc_events = {
+	"Salary Slip": {
+		"before_submit": "ethiopian_payroll.ethiopian_payroll.api.snapshot.validate_period_open",
+		"before_cancel": "ethiopian_payroll.ethiopian_payroll.api.snapshot.validate_period_open",
+		"on_submit": "ethiopian_payroll.ethiopian_payroll.report.warm.on_salary_slip_change",
+		"on_cancel": "ethiopian_payroll.ethiopian_payroll.report.warm.on_salary_slip_change",
+		# draft slips are read by Payroll Variance
+		"on_update": "ethiopian_payroll.ethiopian_payroll.report.warm.on_payroll_data_change",
+		"on_trash": "ethiopian_payroll.ethiopian_payroll.report.warm.on_payroll_data_change",
+	},
+	"Income Tax Slab": {
+		"on_submit": [
+			"ethiopian_payroll.ethiopian_payroll.api.income_tax.clear_tax_table_cache",
+			"ethiopian_payroll.ethiopian_payroll.report.warm.on_payroll_data_change",
+		],
+		"on_cancel": [
+			"ethiopian_payroll.ethiopian_payroll.api.income_tax.clear_tax_table_cache",
+			"ethiopian_payroll.ethiopian_payroll.report.warm.on_payroll_data_change",
+		],
+		"on_update_after_submit": [
+			"ethiopian_payroll.ethiopian_payroll.api.income_tax.clear_tax_table_cache",
+			"ethiopian_payroll.ethiopian_payroll.report.warm.on_payroll_data_change",
+		],
+		"on_trash": [
+			"ethiopian_payroll.ethiopian_payroll.api.income_tax.clear_tax_table_cache",
+			"ethiopian_payroll.ethiopian_payroll.report.warm.on_payroll_data_change",
+		],
+	},
+	"Employee": {
+		"on_update": "ethiopian_payroll.ethiopian_payroll.report.warm.on_payroll_data_change",
+		"on_trash": "ethiopian_payroll.ethiopian_payroll.report.warm.on_payroll_data_change",
+	},
+	"Salary Structure Assignment": {
+		"on_submit": "ethiopian_payroll.ethiopian_payroll.report.warm.on_payroll_data_change",
+		"on_cancel": "ethiopian_payroll.ethiopian_payroll.report.warm.on_payroll_data_change",
+		"on_update_after_submit": "ethiopian_payroll.ethiopian_payroll.report.warm.on_payroll_data_change",
+	},
+	"Designation": {
+		"on_update": "ethiopian_payroll.ethiopian_payroll.api.designation_matrix.clear_designation_index",
+		"on_trash": "ethiopian_payroll.ethiopian_payroll.api.designation_matrix.clear_designation_index",
+	},
+	"Pay Matrix": {
+		"on_update": "ethiopian_payroll.ethiopian_payroll.api.matrix_utils.clear_matrix_cache",
+		"on_trash": [
+			"ethiopian_payroll.ethiopian_payroll.api.matrix_utils.clear_matrix_cache",
+			"ethiopian_payroll.ethiopian_payroll.api.designation_matrix.clear_designation_index",
+		],
+	},
+	"Pay Matrix Level": {
+		"on_update": [
+			"ethiopian_payroll.ethiopian_payroll.api.matrix_utils.clear_matrix_cache",
+			"ethiopian_payroll.ethiopian_payroll.api.designation_matrix.clear_designation_index",
+		],
+		"on_trash": [
+			"ethiopian_payroll.ethiopian_payroll.api.matrix_utils.clear_matrix_cache",
+			"ethiopian_payroll.ethiopian_payroll.api.designation_matrix.clear_designation_index",
+		],
+	},
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -168,6 +235,14 @@ after_migrate = "ethiopian_payroll.ethiopian_payroll.api.create_matrices.after_m
 # 	],
 # }
 
+scheduler_events = {
+	"cron": {
+		"*/5 * * * *": [
+			"ethiopian_payroll.ethiopian_payroll.report.warm.enqueue_pending_warms",
+		],
+	},
+}
+
 # Testing
 # -------
 
@@ -0,0 +1,8 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+from ethiopian_payroll.ethiopian_payroll.api.statutory import create_cost_sharing_field
+
+
+def execute():
+	create_cost_sharing_field()
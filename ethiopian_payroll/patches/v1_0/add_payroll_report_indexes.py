@@ -0,0 +1,8 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+from ethiopian_payroll.ethiopian_payroll.report.indexes import add_report_indexes
+
+
+def execute():
+	add_report_indexes()
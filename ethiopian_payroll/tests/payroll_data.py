@@ -0,0 +1,316 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Deterministic synthetic payroll data for benchmarks and query budget tests.
+
+Creates N employees x M months of submitted Salary Slips with their Salary Detail
+rows, one Salary Structure Assignment per employee and a Pay Matrix, all written
+with `frappe.db.bulk_insert` (no controllers run) in the caller's transaction, which
+rolls them back. Every generated record name starts with BENCH_PREFIX.
+"""
+
+import random
+
+import frappe
+from frappe.utils import add_months, flt, get_first_day, get_last_day, getdate, now_datetime
+
+from ethiopian_payroll.ethiopian_payroll.api.matrix_utils import bulk_insert_matrix_levels
+from ethiopian_payroll.ethiopian_payroll.doctype.pay_matrix.pay_matrix import load_matrix_data
+
+BENCH_PREFIX = "_BENCH-"
+BENCH_PAY_MATRIX = f"{BENCH_PREFIX}Matrix"
+
+# (component, abbreviation, share of basic or fixed amount)
+EARNINGS = (
+	("Basic Salary", "BS", None),
+	("Dearness Allowences", "DA", 0.10),
+	("Travel Allowences", "TA", 600),
+	("House Rent Allowance", "HRA", 0.15),
+	("ESI-Employer Contribution", "ESIER", 0.0325),
+	("Employee Pension Scheme", "EPS", 0.11),
+)
+DEDUCTIONS = (
+	("Provident Fund - Employee Contribution", "PFEE", 0.07),
+	("ESI - Employee Contribution", "ESIEE", 0.0075),
+	("Group Insurance", "GI", 120),
+	("LIC", "LIC", 250),
+	("House Rent", "HR", 0.05),
+	("Water Charges", "WC", 40),
+	("Income Tax", "IT", 0.15),
+)
+
+DEPARTMENTS = ("Finance", "Operations", "Engineering", "Human Resources", "Sales")
+BRANCHES = ("Addis Ababa", "Adama", "Bahir Dar", "Hawassa", "Mekelle", "Dire Dawa")
+DESIGNATIONS = ("Officer", "Senior Officer", "Engineer", "Technician", "Manager", "Clerk")
+
+SALARY_SLIP_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"employee",
+	"employee_name",
+	"company",
+	"department",
+	"designation",
+	"branch",
+	"posting_date",
+	"start_date",
+	"end_date",
+	"payroll_frequency",
+	"currency",
+	"exchange_rate",
+	"total_working_days",
+	"payment_days",
+	"gross_pay",
+	"total_deduction",
+	"total_loan_repayment",
+	"net_pay",
+	"rounded_total",
+	"current_month_income_tax",
+	"bank_name",
+	"bank_account_no",
+)
+SALARY_DETAIL_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"parent",
+	"parentfield",
+	"parenttype",
+	"idx",
+	"salary_component",
+	"abbr",
+	"amount",
+)
+EMPLOYEE_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"first_name",
+	"employee_name",
+	"company",
+	"status",
+	"gender",
+	"date_of_birth",
+	"date_of_joining",
+	"department",
+	"designation",
+	"branch",
+	"grade",
+)
+ASSIGNMENT_FIELDS = (
+	"name",
+	"creation",
+	"modified",
+	"owner",
+	"modified_by",
+	"docstatus",
+	"employee",
+	"employee_name",
+	"company",
+	"salary_structure",
+	"currency",
+	"from_date",
+	"base",
+)
+
+
+def ensure_salary_components():
+	for components, component_type in ((EARNINGS, "Earning"), (DEDUCTIONS, "Deduction")):
+		for component, abbr, _rate in components:
+			if not frappe.db.exists("Salary Component", component):
+				frappe.get_doc(
+					{
+						"doctype": "Salary Component",
+						"salary_component": component,
+						"salary_component_abbr": abbr,
+						"type": component_type,
+					}
+				).insert(ignore_permissions=True)
+
+
+def component_amount(rate, basic):
+	if rate is None:
+		return basic
+	return flt(basic * rate, 2) if rate < 1 else flt(rate)
+
+
+def make_payroll_data(company, start_date, employees=100, months=12, seed=42):
+	"""Create `employees` x `months` submitted Salary Slips starting at `start_date`.
+
+	The same seed always produces the same employees, amounts and names.
+	"""
+	rng = random.Random(seed)
+	matrix = load_matrix_data()
+	grades = sorted(matrix, key=int)
+	currency = frappe.get_cached_value("Company", company, "default_currency")
+	now = now_datetime()
+	user = frappe.session.user
+	start_date = get_first_day(start_date)
+
+	ensure_salary_components()
+
+	employee_values, assignment_values, placements = [], [], []
+	for i in range(1, employees + 1):
+		name = f"{BENCH_PREFIX}EMP-{i:06d}"
+		employee_name = f"Bench Employee {i:06d}"
+		grade = rng.choice(grades)
+		scale = rng.randint(1, len(matrix[grade]))
+		basic = flt(matrix[grade][scale - 1])
+		attributes = {
+			"department": rng.choice(DEPARTMENTS),
+			"designation": rng.choice(DESIGNATIONS),
+			"branch": rng.choice(BRANCHES),
+			"bank_account_no": f"{rng.randint(10**12, 10**13 - 1)}",
+		}
+		placements.append((name, employee_name, basic, attributes))
+		employee_values.append(
+			(
+				name,
+				now,
+				now,
+				user,
+				user,
+				employee_name,
+				employee_name,
+				company,
+				"Active",
+				rng.choice(("Male", "Female")),
+				getdate(f"{rng.randint(1965, 2000)}-01-01"),
+				add_months(start_date, -rng.randint(13, 240)),
+				attributes["department"],
+				attributes["designation"],
+				attributes["branch"],
+				grade,
+			)
+		)
+		assignment_values.append(
+			(
+				f"{BENCH_PREFIX}SSA-{i:06d}",
+				now,
+				now,
+				user,
+				user,
+				1,
+				name,
+				employee_name,
+				company,
+				f"{BENCH_PREFIX}Structure",
+				currency,
+				add_months(start_date, -12),
+				basic,
+			)
+		)
+
+	slip_values, detail_values = [], []
+	for month in range(months):
+		period_start = get_first_day(add_months(start_date, month))
+		period_end = get_last_day(period_start)
+		working_days = (period_end - period_start).days + 1
+
+		for name, employee_name, basic, attributes in placements:
+			slip_name = f"{BENCH_PREFIX}SS-{name[len(BENCH_PREFIX) :]}-{month + 1:02d}"
+			gross = total_deduction = 0.0
+			idx = 0
+			for parentfield, components in (("earnings", EARNINGS), ("deductions", DEDUCTIONS)):
+				for component, abbr, rate in components:
+					amount = component_amount(rate, basic)
+					idx += 1
+					detail_values.append(
+						(
+							f"{slip_name}-{idx:02d}",
+							now,
+							now,
+							user,
+							user,
+							1,
+							slip_name,
+							parentfield,
+							"Salary Slip",
+							idx,
+							component,
+							abbr,
+							amount,
+						)
+					)
+					if parentfield == "earnings":
+						gross += amount
+					else:
+						total_deduction += amount
+
+			income_tax = component_amount(0.15, basic)
+			net_pay = flt(gross - total_deduction, 2)
+			slip_values.append(
+				(
+					slip_name,
+					now,
+					now,
+					user,
+					user,
+					1,
+					name,
+					employee_name,
+					company,
+					attributes["department"],
+					attributes["designation"],
+					attributes["branch"],
+					period_end,
+					period_start,
+					period_end,
+					"Monthly",
+					currency,
+					1,
+					working_days,
+					working_days,
+					flt(gross, 2),
+					flt(total_deduction, 2),
+					0,
+					net_pay,
+					round(net_pay),
+					income_tax,
+					"Commercial Bank of Ethiopia",
+					attributes["bank_account_no"],
+				)
+			)
+
+	frappe.db.bulk_insert("Employee", EMPLOYEE_FIELDS, employee_values)
+	frappe.db.bulk_insert("Salary Structure Assignment", ASSIGNMENT_FIELDS, assignment_values)
+	frappe.db.bulk_insert("Salary Slip", SALARY_SLIP_FIELDS, slip_values)
+	frappe.db.bulk_insert("Salary Detail", SALARY_DETAIL_FIELDS, detail_values)
+	make_pay_matrix(matrix)
+
+	return frappe._dict(
+		{
+			"company": company,
+			"employees": employees,
+			"months": months,
+			"slips": len(slip_values),
+			"details": len(detail_values),
+			"from_date": start_date,
+			"to_date": get_last_day(add_months(start_date, months - 1)),
+			"pay_matrix": BENCH_PAY_MATRIX,
+		}
+	)
+
+
+def make_pay_matrix(matrix):
+	if frappe.db.exists("Pay Matrix", BENCH_PAY_MATRIX):
+		return
+
+	now = now_datetime()
+	frappe.db.bulk_insert(
+		"Pay Matrix",
+		("name", "creation", "modified", "owner", "modified_by", "docstatus", "pm"),
+		[(BENCH_PAY_MATRIX, now, now, frappe.session.user, frappe.session.user, 0, BENCH_PAY_MATRIX)],
+	)
+	grid = {grade: list(enumerate((flt(a) for a in amounts), start=1)) for grade, amounts in matrix.items()}
+	bulk_insert_matrix_levels(BENCH_PAY_MATRIX, grid)
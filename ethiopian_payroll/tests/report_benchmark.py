@@ -0,0 +1,143 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Benchmark every script report of the app against generated payroll data.
+
+Run on a development site, never on production data:
+
+	bench --site [site-name] execute ethiopian_payroll.tests.report_benchmark.run
+	bench --site [site-name] execute ethiopian_payroll.tests.report_benchmark.run --kwargs "{'sizes': [1000]}"
+
+For each dataset size (number of Salary Slips) and report, the wall time, SQL query
+count, DB time, rows fetched and peak Python memory of `execute()` are recorded and
+written to a JSON file. Use `compare` to diff two result files between releases.
+Generated data is rolled back at the end of the run.
+"""
+
+import json
+import math
+import os
+import time
+import tracemalloc
+
+import frappe
+from frappe.utils import flt, now_datetime
+
+import ethiopian_payroll
+from ethiopian_payroll.ethiopian_payroll.report.profiler import SQLCounter
+from ethiopian_payroll.ethiopian_payroll.report.utils import REPORTS, get_report_filters, get_report_module
+from ethiopian_payroll.tests.payroll_data import make_payroll_data
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+BENCHMARK_MONTHS = 12
+
+
+def get_benchmark_fiscal_year():
+	fiscal_years = frappe.get_all(
+		"Fiscal Year",
+		filters={"disabled": 0},
+		fields=["name", "year_start_date"],
+		order_by="year_start_date desc",
+		limit=1,
+	)
+	if not fiscal_years:
+		frappe.throw("Create a Fiscal Year before running the report benchmark")
+	return fiscal_years[0]
+
+
+def measure(report_name, filters):
+	"""Run a report twice: once timed with query counting, once under tracemalloc."""
+	execute = get_report_module(report_name).execute
+
+	with SQLCounter() as counter:
+		start = time.perf_counter()
+		result = execute(frappe._dict(filters))
+		wall_time = time.perf_counter() - start
+
+	tracemalloc.start()
+	try:
+		execute(frappe._dict(filters))
+		_current, peak = tracemalloc.get_traced_memory()
+	finally:
+		tracemalloc.stop()
+
+	return {
+		"report": report_name,
+		"wall_time": flt(wall_time, 4),
+		"db_time": flt(counter.db_time, 4),
+		"queries": counter.queries,
+		"rows_fetched": counter.rows,
+		"rows_returned": len(result[1]) if result and len(result) > 1 else 0,
+		"peak_memory_kb": flt(peak / 1024, 1),
+	}
+
+
+def run(sizes=DEFAULT_SIZES, company=None, reports=None, output=None):
+	"""Generate data for each size, benchmark the reports and write the results as JSON."""
+	company = (
+		company or frappe.defaults.get_global_default("company") or frappe.get_all("Company", limit=1)[0].name
+	)
+	fiscal_year = get_benchmark_fiscal_year()
+	reports = reports or list(REPORTS)
+
+	results = []
+	try:
+		for size in sizes:
+			employees = math.ceil(size / BENCHMARK_MONTHS)
+			dataset = make_payroll_data(company, fiscal_year.year_start_date, employees, BENCHMARK_MONTHS)
+			print(f"\n{dataset.slips} slips / {dataset.details} salary detail rows")
+
+			for report_name in reports:
+				filters = get_report_filters(
+					report_name, dataset.company, dataset.from_date, dataset.to_date, fiscal_year.name
+				)
+				result = measure(report_name, filters)
+				result["slips"] = dataset.slips
+				results.append(result)
+				print(
+					f"  {report_name:<24} {result['wall_time']:>9.3f}s {result['queries']:>6} queries "
+					f"{result['rows_fetched']:>9} rows {result['peak_memory_kb']:>11.1f} KB"
+				)
+
+			# each size starts from an empty dataset
+			frappe.db.rollback()
+	finally:
+		frappe.db.rollback()
+
+	output = output or frappe.get_site_path(
+		"benchmarks", f"report-benchmark-{now_datetime().strftime('%Y%m%d-%H%M%S')}.json"
+	)
+	os.makedirs(os.path.dirname(output), exist_ok=True)
+	with open(output, "w") as f:
+		json.dump(
+			{
+				"app_version": ethiopian_payroll.__version__,
+				"frappe_version": frappe.__version__,
+				"created": str(now_datetime()),
+				"results": results,
+			},
+			f,
+			indent=1,
+		)
+
+	print(f"\nResults written to {output}")
+	return output
+
+
+def compare(baseline, current):
+	"""Print the change in wall time and query count between two benchmark result files."""
+	with open(baseline) as f:
+		before = {(r["report"], r["slips"]): r for r in json.load(f)["results"]}
+	with open(current) as f:
+		after = json.load(f)["results"]
+
+	for r in after:
+		old = before.get((r["report"], r["slips"]))
+		if not old:
+			continue
+		speedup = old["wall_time"] / r["wall_time"] if r["wall_time"] else 0
+		print(
+			f"{r['report']:<24} {r['slips']:>7} slips  {old['wall_time']:>8.3f}s -> {r['wall_time']:>8.3f}s "
+			f"({speedup:.1f}x)  queries {old['queries']} -> {r['queries']}"
+		)
@@ -0,0 +1,60 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import getdate
+
+from ethiopian_payroll.ethiopian_payroll.api.income_tax import (
+	compile_slabs,
+	compile_tax_table,
+	compute_tax,
+	get_statutory_table,
+)
+
+
+class TestIncomeTax(FrappeTestCase):
+	def test_statutory_schedule(self):
+		# monthly income: tax per the rate and deduction of Proclamation 979/2016
+		monthly_cases = {
+			-100: 0,
+			600: 0,
+			1650: 1650 * 0.10 - 60,
+			3200: 3200 * 0.15 - 142.5,
+			5000: 5000 * 0.20 - 302.5,
+			7800: 7800 * 0.25 - 565,
+			10900: 10900 * 0.30 - 955,
+			20000: 20000 * 0.35 - 1500,
+		}
+		taxes = compute_tax([income * 12 for income in monthly_cases], get_statutory_table())
+		for (income, expected), tax in zip(monthly_cases.items(), taxes, strict=True):
+			self.assertAlmostEqual(tax, expected * 12, places=2, msg=income)
+
+	def test_compile_adds_untaxed_first_bracket(self):
+		table = compile_tax_table("2026-01-01", [(20000, 10), (10000, 5)], standard_exemption=1000)
+		self.assertEqual(table.floors, [0.0, 10000.0, 20000.0])
+		self.assertEqual(table.base_tax, [0.0, 0.0, 500.0])
+		self.assertEqual(table.standard_exemption, 1000.0)
+		self.assertEqual(compute_tax([5000, 15000, 30000], table), [0.0, 250.0, 1500.0])
+
+	def test_slab_with_a_conditional_bracket_is_skipped(self):
+		def bracket(name, effective_from, from_amount, rate, condition=None):
+			return frappe._dict(
+				name=name,
+				company="_Test Company",
+				effective_from=effective_from,
+				standard_tax_exemption_amount=0,
+				from_amount=from_amount,
+				percent_deduction=rate,
+				condition=condition,
+			)
+
+		tables = compile_slabs(
+			[
+				bracket("Slab 2025", "2025-01-01", 10000, 5),
+				bracket("Slab 2026", "2026-01-01", 10000, 10),
+				bracket("Slab 2026", "2026-01-01", 20000, 20, "employee.grade == '1'"),
+			]
+		)
+
+		self.assertEqual([table.effective_from for table in tables["_Test Company"]], [getdate("2025-01-01")])
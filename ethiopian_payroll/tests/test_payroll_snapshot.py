@@ -0,0 +1,119 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+import os
+import tempfile
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from ethiopian_payroll.ethiopian_payroll.api.snapshot import (
+	MISSING,
+	NUMERIC_FIELDS,
+	TEXT_FIELDS,
+	PayrollSnapshot,
+	build_snapshot,
+	get_periods,
+	write_snapshot,
+)
+from ethiopian_payroll.ethiopian_payroll.report.utils import get_salary_slip_details, get_salary_slip_query
+from ethiopian_payroll.tests.payroll_data import BENCH_PREFIX, make_payroll_data
+
+
+class TestPayrollSnapshot(FrappeTestCase):
+	def setUp(self):
+		self.path = os.path.join(tempfile.mkdtemp(), "2026-01.snap")
+		text = {field: [None, None] for field in TEXT_FIELDS}
+		text.update(
+			name=["SS-1", "SS-2"],
+			employee=["EMP-1", "EMP-2"],
+			department=["Finance", "Operations"],
+			start_date=["2026-01-01", "2026-01-10"],
+			end_date=["2026-01-31", "2026-01-31"],
+		)
+		columns = {field: [0.0, 0.0] for field in NUMERIC_FIELDS}
+		columns.update(
+			{
+				"gross_pay": [5000.0, 7250.5],
+				"earnings:Basic Salary": [5000.0, 7000.0],
+				"earnings:Transport Allowance": [MISSING, 250.5],
+				"deductions:Income Tax": [0.0, 1447.68],
+			}
+		)
+		header = {
+			"period": "2026-01",
+			"rows": 2,
+			"text": text,
+			"earnings": ["Basic Salary", "Transport Allowance"],
+			"deductions": ["Income Tax"],
+		}
+		write_snapshot(self.path, header, columns)
+
+	def test_reads_back_columns_and_slips(self):
+		snapshot = PayrollSnapshot(self.path)
+		self.assertEqual(list(snapshot.column("gross_pay")), [5000.0, 7250.5])
+
+		slips = list(snapshot.slips({"department": "Operations"}))
+		self.assertEqual(len(slips), 1)
+		self.assertEqual(slips[0].name, "SS-2")
+		self.assertEqual(slips[0].earnings, {"Basic Salary": 7000.0, "Transport Allowance": 250.5})
+		self.assertEqual(slips[0].deductions, {"Income Tax": 1447.68})
+
+		# components a slip does not have are left out of its maps, zero amounts are kept
+		slips = list(snapshot.slips(from_date="2026-01-01", to_date="2026-01-31"))
+		self.assertEqual(slips[0].earnings, {"Basic Salary": 5000.0})
+		self.assertEqual(slips[0].deductions, {"Income Tax": 0.0})
+
+		# slips are bounded by their dates like the live query
+		slips = list(snapshot.slips(from_date="2026-01-05"))
+		self.assertEqual([ss.name for ss in slips], ["SS-2"])
+
+	def test_rejects_modified_file(self):
+		os.chmod(self.path, 0o644)
+		with open(self.path, "r+b") as f:
+			f.seek(-40, os.SEEK_END)
+			f.write(b"\x01")
+
+		with self.assertRaises(frappe.ValidationError):
+			PayrollSnapshot(self.path)
+
+	def test_periods_overlap_range(self):
+		self.assertEqual(get_periods("2025-07-08", "2025-09-07"), ["2025-07", "2025-08", "2025-09"])
+		self.assertEqual(get_periods("2025-07-01", "2025-07-31"), ["2025-07"])
+
+
+class TestSnapshotMatchesLiveData(FrappeTestCase):
+	def setUp(self):
+		company = frappe.db.get_value("Company", {}, "name")
+		if not company:
+			self.skipTest("A Company is required")
+
+		self.dataset = make_payroll_data(company, "2026-01-01", employees=2, months=1)
+		self.path = os.path.join(tempfile.mkdtemp(), "2026-01.snap")
+		self.zero_slip = f"{BENCH_PREFIX}SS-EMP-000001-01"
+		salary_detail = frappe.qb.DocType("Salary Detail")
+		frappe.qb.update(salary_detail).set(salary_detail.amount, 0).where(
+			(salary_detail.parent == self.zero_slip) & (salary_detail.salary_component == "Travel Allowences")
+		).run()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def test_snapshot_slips_match_live_components(self):
+		write_snapshot(self.path, *build_snapshot(self.dataset.company, "2026-01"))
+		snapshot = PayrollSnapshot(self.path)
+
+		query = get_salary_slip_query(frappe._dict(company=self.dataset.company), "2026-01-01", "2026-01-31")
+		live = {
+			parentfield: get_salary_slip_details(query, parentfield)
+			for parentfield in ("earnings", "deductions")
+		}
+		slips = [ss for ss in snapshot.slips() if ss.name.startswith(BENCH_PREFIX)]
+		self.assertEqual(len(slips), 2)
+		for ss in slips:
+			with self.subTest(salary_slip=ss.name):
+				self.assertEqual(ss.earnings, live["earnings"][ss.name])
+				self.assertEqual(ss.deductions, live["deductions"][ss.name])
+
+		zero_slip = next(ss for ss in slips if ss.name == self.zero_slip)
+		self.assertEqual(zero_slip.earnings["Travel Allowences"], 0.0)
@@ -0,0 +1,62 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_months, get_last_day
+
+from ethiopian_payroll.ethiopian_payroll.report.payroll_variance.payroll_variance import execute
+from ethiopian_payroll.tests.payroll_data import BENCH_PREFIX, make_payroll_data
+
+
+class TestPayrollVariance(FrappeTestCase):
+	def setUp(self):
+		company = frappe.db.get_value("Company", {}, "name")
+		if not company:
+			self.skipTest("A Company is required")
+
+		self.dataset = make_payroll_data(company, "2026-01-01", employees=3, months=2)
+		self.from_date = add_months(self.dataset.from_date, 1)
+		self.to_date = get_last_day(self.from_date)
+
+		# the second month is the payroll under review: still draft, one component changed
+		salary_slip = frappe.qb.DocType("Salary Slip")
+		salary_detail = frappe.qb.DocType("Salary Detail")
+		frappe.qb.update(salary_slip).set(salary_slip.docstatus, 0).where(
+			(salary_slip.name.like(f"{BENCH_PREFIX}%")) & (salary_slip.start_date >= self.from_date)
+		).run()
+		self.changed_slip = f"{BENCH_PREFIX}SS-EMP-000001-02"
+		frappe.qb.update(salary_detail).set(salary_detail.amount, salary_detail.amount + 500).where(
+			(salary_detail.parent == self.changed_slip)
+			& (salary_detail.salary_component == "Travel Allowences")
+		).run()
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def run_report(self, **filters):
+		return execute(
+			frappe._dict(
+				company=self.dataset.company,
+				from_date=self.from_date,
+				to_date=self.to_date,
+				**filters,
+			)
+		)[1]
+
+	def test_draft_payroll_is_compared_with_submitted_month(self):
+		data = [row for row in self.run_report(docstatus="Draft") if row["employee"].startswith(BENCH_PREFIX)]
+
+		self.assertEqual([row["status"] for row in data], ["Changed"])
+		self.assertEqual(data[0]["employee"], f"{BENCH_PREFIX}EMP-000001")
+		self.assertEqual(data[0]["salary_component"], "Travel Allowences")
+		self.assertEqual(data[0]["change"], 500)
+
+	def test_submitted_filter_does_not_see_the_draft_payroll(self):
+		data = [
+			row for row in self.run_report(docstatus="Submitted") if row["employee"].startswith(BENCH_PREFIX)
+		]
+
+		# nothing submitted in the current month: everyone left, no component changes
+		self.assertEqual({row["status"] for row in data}, {"Leaver"})
+		self.assertEqual(len(data), 3)
@@ -0,0 +1,21 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from ethiopian_payroll.ethiopian_payroll.report.pf_report.pf_report import get_pf_settings
+
+
+class TestPFSettings(FrappeTestCase):
+	def test_settings_are_effective_dated(self):
+		self.assertEqual(get_pf_settings("2010-01-01", []).wage_ceiling, 6500)
+		self.assertEqual(get_pf_settings("2026-01-01", []).wage_ceiling, 15000)
+
+	def test_site_overrides_apply_from_their_date(self):
+		overrides = [["2026-01-01", {"wage_ceiling": 21000}], ["2025-01-01", {"employer_pf_rate": 4}]]
+
+		self.assertEqual(get_pf_settings("2010-01-01", overrides).wage_ceiling, 6500)
+		self.assertEqual(get_pf_settings("2025-06-01", overrides).wage_ceiling, 15000)
+		self.assertEqual(get_pf_settings("2025-06-01", overrides).employer_pf_rate, 4)
+		settings = get_pf_settings("2026-01-01", overrides)
+		self.assertEqual((settings.wage_ceiling, settings.employer_pf_rate), (21000, 4))
@@ -0,0 +1,82 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from ethiopian_payroll.ethiopian_payroll.report.coalesce import (
+	coalesce_report,
+	get_result_key,
+	get_run_key,
+)
+from ethiopian_payroll.ethiopian_payroll.report.warm import get_generation_key, get_warm_key
+
+REPORT_NAME = "Coalescing Test Report"
+FILTERS = {"company": "_Test Company", "from_date": "2026-01-01", "to_date": "2026-01-31"}
+
+
+class TestReportCoalescing(FrappeTestCase):
+	def setUp(self):
+		self.runs = []
+
+		@coalesce_report(REPORT_NAME)
+		def execute(filters=None):
+			self.runs.append(filters)
+			return [{"fieldname": "employee"}], [{"employee": "EMP-1"}]
+
+		self.execute = execute
+		self.run_key = get_run_key(REPORT_NAME, FILTERS)
+		self.lock_key = frappe.cache.make_key(f"{self.run_key}:lock")
+
+	def tearDown(self):
+		frappe.cache.delete(self.lock_key)
+		frappe.cache.delete_value(get_warm_key(self.run_key, FILTERS))
+		frappe.flags.in_report_warm = False
+		frappe.flags.in_report_explain = False
+
+	def test_run_key_ignores_empty_filters_and_order(self):
+		self.assertEqual(
+			get_run_key(REPORT_NAME, {**FILTERS, "employee": None, "branch": ""}),
+			get_run_key(REPORT_NAME, dict(reversed(FILTERS.items()))),
+		)
+		self.assertNotEqual(get_run_key(REPORT_NAME, {**FILTERS, "to_date": "2026-02-28"}), self.run_key)
+
+	def test_runs_and_releases_lock_when_nothing_in_flight(self):
+		self.assertEqual(self.execute(FILTERS), ([{"fieldname": "employee"}], [{"employee": "EMP-1"}]))
+		self.execute(FILTERS)
+
+		# sequential runs never share a result
+		self.assertEqual(len(self.runs), 2)
+		self.assertFalse(frappe.cache.get(self.lock_key))
+
+	def test_waits_for_run_in_flight(self):
+		shared = ([], [{"employee": "EMP-2"}])
+		frappe.cache.set(self.lock_key, "inflight", ex=10)
+		frappe.cache.set_value(get_result_key(self.run_key, "inflight"), shared, expires_in_sec=10)
+
+		self.assertEqual(self.execute(FILTERS), shared)
+		self.assertEqual(self.runs, [])
+
+	def test_returns_warm_result_until_a_slip_changes(self):
+		frappe.flags.in_report_warm = True
+		self.execute(FILTERS)
+		frappe.flags.in_report_warm = False
+
+		self.execute(FILTERS)
+		self.assertEqual(len(self.runs), 1)
+
+		# what on_salary_slip_change does once the slip is committed
+		frappe.cache.incr(get_generation_key(FILTERS["company"]))
+		self.execute(FILTERS)
+		self.assertEqual(len(self.runs), 2)
+
+	def test_explain_runs_the_report_past_warm_and_in_flight_results(self):
+		frappe.flags.in_report_warm = True
+		self.execute(FILTERS)
+		frappe.flags.in_report_warm = False
+		frappe.cache.set(self.lock_key, "inflight", ex=10)
+		frappe.cache.set_value(get_result_key(self.run_key, "inflight"), ([], []), expires_in_sec=10)
+
+		frappe.flags.in_report_explain = True
+		self.assertEqual(self.execute(FILTERS), ([{"fieldname": "employee"}], [{"employee": "EMP-1"}]))
+		self.assertEqual(len(self.runs), 2)
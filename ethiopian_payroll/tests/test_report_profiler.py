@@ -0,0 +1,25 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from ethiopian_payroll.ethiopian_payroll.report.profiler import SQLCounter
+
+
+class TestSQLCounter(FrappeTestCase):
+	def test_counts_streamed_rows_as_they_are_consumed(self):
+		with SQLCounter() as counter:
+			rows = frappe.db.sql("select name from `tabDocType` limit 5", as_iterator=True)
+			self.assertEqual((counter.queries, counter.rows), (1, 0))
+
+			self.assertEqual(len(list(rows)), 5)
+			self.assertEqual((counter.queries, counter.rows), (1, 5))
+
+	def test_counts_rows_of_a_stream_closed_early(self):
+		with SQLCounter() as counter:
+			rows = frappe.db.sql("select name from `tabDocType` limit 5", as_iterator=True)
+			next(rows)
+			rows.close()
+
+		self.assertEqual((counter.queries, counter.rows), (1, 1))
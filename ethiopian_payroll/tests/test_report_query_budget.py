@@ -0,0 +1,97 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+"""
+Query count and latency budgets for every script report.
+
+Each report runs against a small and a larger generated dataset. The number of SQL
+queries must stay within the report's budget and must be the same for both sizes,
+so a per-slip or per-employee query fails here before it reaches a large site.
+"""
+
+import time
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from ethiopian_payroll.ethiopian_payroll.report.profiler import SQLCounter
+from ethiopian_payroll.ethiopian_payroll.report.utils import REPORTS, get_report_filters, get_report_module
+from ethiopian_payroll.tests.payroll_data import make_payroll_data
+
+# (employees, months) of the two datasets
+SMALL_DATASET = (5, 2)
+LARGE_DATASET = (40, 3)
+
+# ceilings with some headroom, not exact counts
+QUERY_BUDGETS = {
+	"Annual Statement": 8,
+	"Bank Cover Letter": 3,
+	"Bank Payment Sheet": 6,
+	"Bank Statement": 3,
+	"Consolidated Salary": 5,
+	"Deduction Summary": 6,
+	"ESI Report": 5,
+	"Group Insurance Scheme": 6,
+	"Payroll Variance": 2,
+	"PF Report": 5,
+	"Salary Summary": 7,
+	"Statutory Schedule": 3,
+}
+
+# seconds for the large dataset (120 slips)
+LATENCY_BUDGET = 2.0
+
+
+class TestReportQueryBudget(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.company = frappe.db.get_value("Company", {}, "name")
+		cls.fiscal_year = frappe.db.get_value(
+			"Fiscal Year",
+			{"disabled": 0},
+			["name", "year_start_date"],
+			as_dict=1,
+			order_by="year_start_date desc",
+		)
+
+	def setUp(self):
+		if not self.company or not self.fiscal_year:
+			self.skipTest("A Company and a Fiscal Year are required")
+
+	def run_reports(self, employees, months):
+		dataset = make_payroll_data(self.company, self.fiscal_year.year_start_date, employees, months)
+
+		results = {}
+		for report_name in REPORTS:
+			execute = get_report_module(report_name).execute
+			filters = get_report_filters(
+				report_name, dataset.company, dataset.from_date, dataset.to_date, self.fiscal_year.name
+			)
+
+			# warm up document and metadata caches so only the report's own queries are counted
+			execute(frappe._dict(filters))
+
+			with SQLCounter() as counter:
+				start = time.perf_counter()
+				execute(frappe._dict(filters))
+				results[report_name] = (counter.queries, time.perf_counter() - start)
+
+		frappe.db.rollback()
+		return results
+
+	def test_query_budget(self):
+		self.assertEqual(set(QUERY_BUDGETS), set(REPORTS))
+
+		small = self.run_reports(*SMALL_DATASET)
+		large = self.run_reports(*LARGE_DATASET)
+
+		for report_name, (queries, duration) in large.items():
+			with self.subTest(report=report_name):
+				self.assertLessEqual(queries, QUERY_BUDGETS[report_name])
+				self.assertEqual(
+					queries,
+					small[report_name][0],
+					f"{report_name} runs more queries as the number of slips grows",
+				)
+				self.assertLess(duration, LATENCY_BUDGET)
@@ -0,0 +1,67 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+import csv
+import io
+import json
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from ethiopian_payroll.ethiopian_payroll.report.slip_inspection import (
+	get_like_pattern,
+	write_csv,
+	write_json,
+)
+
+
+def make_breakdowns():
+	return [
+		frappe._dict(
+			name="Sal Slip/HR-EMP-00020/00003",
+			employee="HR-EMP-00020",
+			employee_name="Abebe Kebede",
+			earnings=[{"salary_component": "Basic Salary", "abbr": "BS", "amount": 9000.0}],
+			deductions=[{"salary_component": "House Rent", "abbr": "HR", "amount": 1200.0}],
+		),
+		frappe._dict(
+			name="Sal Slip/HR-EMP-00021/00003",
+			employee="HR-EMP-00021",
+			employee_name="Sara Tesfaye",
+			earnings=[],
+			deductions=[],
+		),
+	]
+
+
+class TestSlipInspection(FrappeTestCase):
+	def test_like_pattern(self):
+		self.assertEqual(get_like_pattern("rent"), "%rent%")
+		self.assertEqual(get_like_pattern("House*"), "House%")
+		self.assertEqual(get_like_pattern("*_10%?"), "%\\_10\\%_")
+
+	def test_csv_has_a_row_per_component(self):
+		out = io.StringIO()
+		write_csv(make_breakdowns(), out)
+		rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+
+		self.assertEqual(
+			[(r["salary_slip"], r["parentfield"], r["salary_component"]) for r in rows],
+			[
+				("Sal Slip/HR-EMP-00020/00003", "earnings", "Basic Salary"),
+				("Sal Slip/HR-EMP-00020/00003", "deductions", "House Rent"),
+				("Sal Slip/HR-EMP-00021/00003", "", ""),
+			],
+		)
+
+	def test_json_is_an_array_of_slips(self):
+		out = io.StringIO()
+		write_json(make_breakdowns(), out)
+		slips = json.loads(out.getvalue())
+
+		self.assertEqual(len(slips), 2)
+		self.assertEqual(slips[0]["deductions"][0]["amount"], 1200.0)
+
+		out = io.StringIO()
+		write_json([], out)
+		self.assertEqual(json.loads(out.getvalue()), [])
@@ -0,0 +1,110 @@
+# Copyright (c) 2026, Friends ERP and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt, get_last_day
+
+from ethiopian_payroll.ethiopian_payroll.api.statutory import (
+	COST_SHARING_FIELD,
+	create_cost_sharing_field,
+	get_statutory_rates,
+	get_statutory_schedule,
+)
+from ethiopian_payroll.ethiopian_payroll.report.utils import get_salary_slip_query
+from ethiopian_payroll.tests.payroll_data import BENCH_PREFIX, make_payroll_data
+
+RATES_CONF = "ethiopian_payroll_statutory_rates"
+
+
+class TestStatutoryRates(FrappeTestCase):
+	def setUp(self):
+		self.site_rates = frappe.conf.pop(RATES_CONF, None)
+
+	def tearDown(self):
+		frappe.conf.pop(RATES_CONF, None)
+		if self.site_rates is not None:
+			frappe.conf[RATES_CONF] = self.site_rates
+
+	def test_rates_are_effective_dated(self):
+		self.assertEqual(get_statutory_rates("2015-07-08").pension_employee, 7)
+		self.assertEqual(get_statutory_rates("2026-01-01").pension_employer, 11)
+		# the yearly phase-in of Proclamation 715/2011 is not supported
+		with self.assertRaises(frappe.ValidationError):
+			get_statutory_rates("2014-01-01")
+
+	def test_site_override(self):
+		frappe.conf[RATES_CONF] = {"pension_employer": 12}
+
+		rates = get_statutory_rates("2026-01-01")
+		self.assertEqual(rates.pension_employer, 12)
+		self.assertEqual(rates.pension_employee, 7)
+		self.assertEqual(rates.cost_sharing, 10)
+
+
+class TestStatutorySchedule(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		create_cost_sharing_field()
+
+	def setUp(self):
+		company = frappe.db.get_value("Company", {}, "name")
+		if not company:
+			self.skipTest("A Company is required")
+
+		self.site_rates = frappe.conf.pop(RATES_CONF, None)
+		self.dataset = make_payroll_data(company, "2026-01-01", employees=3, months=1)
+		self.cost_sharing_employee = f"{BENCH_PREFIX}EMP-000001"
+		employee = frappe.qb.DocType("Employee")
+		frappe.qb.update(employee).set(employee[COST_SHARING_FIELD], 1).where(
+			employee.name == self.cost_sharing_employee
+		).run()
+
+	def tearDown(self):
+		frappe.db.rollback()
+		if self.site_rates is not None:
+			frappe.conf[RATES_CONF] = self.site_rates
+
+	def get_schedule(self):
+		salary_slip = frappe.qb.DocType("Salary Slip")
+		query = get_salary_slip_query(
+			{"company": self.dataset.company},
+			self.dataset.from_date,
+			get_last_day(self.dataset.from_date),
+		).where(salary_slip.name.like(f"{BENCH_PREFIX}%"))
+		return get_statutory_schedule(query, self.dataset.from_date, self.dataset.company)
+
+	def get_basic(self, salary_slip, component="Basic Salary"):
+		return flt(
+			frappe.db.get_value(
+				"Salary Detail", {"parent": salary_slip, "salary_component": component}, "amount"
+			)
+		)
+
+	def test_pension_split_and_cost_sharing(self):
+		slips = self.get_schedule().slips
+		self.assertEqual(len(slips), 3)
+
+		for slip in slips:
+			with self.subTest(employee=slip.employee):
+				basic = self.get_basic(slip.salary_slip)
+				self.assertTrue(basic)
+				self.assertEqual(slip.pension_employee, flt(basic * 0.07, 2))
+				self.assertEqual(slip.pension_employer, flt(basic * 0.11, 2))
+				if slip.employee == self.cost_sharing_employee:
+					self.assertTrue(slip.cost_sharing_applicable)
+					self.assertEqual(slip.cost_sharing, flt(slip.gross_pay * 0.10, 2))
+				else:
+					self.assertFalse(slip.cost_sharing_applicable)
+					self.assertEqual(slip.cost_sharing, 0)
+
+	def test_pension_on_a_differently_named_basic(self):
+		salary_detail = frappe.qb.DocType("Salary Detail")
+		salary_slip = f"{BENCH_PREFIX}SS-EMP-000002-01"
+		frappe.qb.update(salary_detail).set(salary_detail.salary_component, "Basic Pay").where(
+			(salary_detail.parent == salary_slip) & (salary_detail.salary_component == "Basic Salary")
+		).run()
+
+		slip = next(slip for slip in self.get_schedule().slips if slip.salary_slip == salary_slip)
+		self.assertEqual(slip.pension_employee, flt(self.get_basic(salary_slip, "Basic Pay") * 0.07, 2))